@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+SPDX-FileCopyrightText: 2025 Michael Czigler
+SPDX-License-Identifier: BSD-3-Clause
+
+Archive upload throughput benchmark against a local archive stub.
+
+    python -m benchmarks.archive --stations 20 --uploads 50 --latency 5
+"""
+
+from argparse import ArgumentParser
+from asyncio import gather
+from asyncio import run
+from asyncio import to_thread
+from json import dump
+from time import perf_counter
+
+from uhtf.models.archive import ArchiveClient
+from uhtf.models.archive import AsyncArchiveClient
+from uhtf.simulator import ArchiveStub
+
+from .fixtures import procedure
+
+
+async def blocking(url: str, args, payload) -> float:
+    """Every station posting with urlopen from its own thread."""
+
+    client = ArchiveClient(url, "token")
+
+    def station() -> None:
+        for _ in range(args.uploads):
+            client.post(payload)
+
+    begin = perf_counter()
+    await gather(*(to_thread(station) for _ in range(args.stations)))
+    return perf_counter() - begin
+
+
+async def pooled(url: str, args, payload) -> float:
+    """Every station posting through one shared async client."""
+
+    client = AsyncArchiveClient(url, "token", args.limit, gzip=args.gzip)
+
+    async def station() -> None:
+        for _ in range(args.uploads):
+            await client.post(payload)
+
+    begin = perf_counter()
+    await gather(*(station() for _ in range(args.stations)))
+    elapsed = perf_counter() - begin
+    await client.close()
+    return elapsed
+
+
+async def benchmark(args) -> dict:
+    payload = procedure(args.phases, args.measurements)
+    uploads = args.stations * args.uploads
+    report = {"uploads": uploads}
+    for name, method in (("urlopen", blocking), ("async", pooled)):
+        stub = ArchiveStub(port=0, latency=args.latency)
+        port = await stub.start()
+        elapsed = await method(f"http://127.0.0.1:{port}/", args, payload)
+        await stub.close()
+        report[f"{name}_uploads_per_s"] = uploads / elapsed
+        report[f"{name}_connections"] = stub.connections
+        report[f"{name}_kib_on_wire"] = stub.received / 1024
+    return report
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stations", type=int, default=20)
+    parser.add_argument("--uploads", type=int, default=50)
+    parser.add_argument("--phases", type=int, default=4)
+    parser.add_argument("--measurements", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=5.0)
+    parser.add_argument("--limit", type=int, default=8)
+    parser.add_argument("--gzip", action="store_true")
+    parser.add_argument("--output", help="Write the report as JSON.")
+    args = parser.parse_args()
+    report = run(benchmark(args))
+    for key, value in report.items():
+        print(f"{key:>24}: {value:.3f}")
+    if args.output:
+        with open(args.output, "w") as file:
+            dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+SPDX-FileCopyrightText: 2025 Michael Czigler
+SPDX-License-Identifier: BSD-3-Clause
+
+End-to-end throughput benchmark against simulated instruments.
+
+    python -m benchmarks.e2e --units 50 --instruments 4 --latency 2
+"""
+
+from argparse import ArgumentParser
+from asyncio import ensure_future
+from asyncio import new_event_loop
+from asyncio import run
+from asyncio import run_coroutine_threadsafe
+from asyncio import sleep
+from json import dump
+from json import loads
+from statistics import quantiles
+from threading import Thread
+from time import perf_counter
+from tracemalloc import get_traced_memory
+from tracemalloc import reset_peak
+from tracemalloc import start
+from tracemalloc import stop
+
+from uhtf.automatic import broker
+from uhtf.simulator import Simulator
+
+from .fixtures import BARCODE
+from .fixtures import create
+from .fixtures import prepare
+
+
+def percentiles(values: list) -> tuple:
+    """Return the (p50, p99) of a sample."""
+
+    if len(values) < 2:
+        return (values or [0.0])[0], (values or [0.0])[0]
+    cuts = quantiles(values, n=100, method="inclusive")
+    return cuts[49], cuts[98]
+
+
+def serve(simulator: Simulator) -> list:
+    """Start the simulator on a dedicated event loop thread."""
+
+    loop = new_event_loop()
+    Thread(target=loop.run_forever, daemon=True).start()
+    return run_coroutine_threadsafe(simulator.start(), loop).result()
+
+
+async def benchmark(args) -> dict:
+    simulator = Simulator(
+        port=0,
+        count=args.instruments,
+        latency=args.latency,
+        jitter=args.jitter,
+        failure=args.failure,
+        seed=0,
+    )
+    ports = serve(simulator)
+    app = create()
+    await prepare(app, ports, phases=args.phases, steps=args.steps)
+
+    # fan-out latency: publish start versus last subscriber receipt
+    published = []
+    receipts = [[] for _ in range(args.subscribers)]
+    publish = broker.publish
+
+    async def timed_publish(message: str) -> None:
+        published.append(perf_counter())
+        await publish(message)
+
+    async def subscriber(receipt: list) -> None:
+        async for _ in broker.subscribe():
+            receipt.append(perf_counter())
+
+    broker.publish = timed_publish
+    tasks = [ensure_future(subscriber(r)) for r in receipts]
+    await sleep(0)
+
+    steps, runs, memory = [], [], []
+    client = app.test_client()
+    start()
+    async with client.websocket("/automatic/ws") as ws:
+        begin = perf_counter()
+        for unit in range(args.units):
+            reset_peak()
+            began = perf_counter()
+            await ws.send(BARCODE.format(unit))
+            while True:
+                procedure, state = loads(await ws.receive())[:2]
+                if state not in ("QUEUED", "RUNNING"):
+                    break
+            runs.append(perf_counter() - began)
+            memory.append(get_traced_memory()[1])
+            for phase in procedure["phases"]:
+                for step in phase["steps"] or []:
+                    steps.append(sum(step["spans"].values()) / 1e6)
+        elapsed = perf_counter() - begin
+    stop()
+    broker.publish = publish
+    for task in tasks:
+        task.cancel()
+
+    fanout = [
+        (max(r[index] for r in receipts) - stamp) * 1000
+        for index, stamp in enumerate(published)
+        if all(len(r) > index for r in receipts)
+    ]
+    step_p50, step_p99 = percentiles(steps)
+    fanout_p50, fanout_p99 = percentiles(fanout)
+    return {
+        "units": args.units,
+        "elapsed_s": elapsed,
+        "units_per_hour": args.units / elapsed * 3600,
+        "run_p50_s": percentiles(runs)[0],
+        "step_p50_ms": step_p50,
+        "step_p99_ms": step_p99,
+        "fanout_p50_ms": fanout_p50,
+        "fanout_p99_ms": fanout_p99,
+        "memory_per_run_kib": sum(memory) / len(memory) / 1024,
+    }
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--units", type=int, default=20)
+    parser.add_argument("--instruments", type=int, default=4)
+    parser.add_argument("--phases", type=int, default=4)
+    parser.add_argument("--steps", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=1.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--failure", type=float, default=0.0)
+    parser.add_argument("--subscribers", type=int, default=4)
+    parser.add_argument("--output", help="Write the report as JSON.")
+    args = parser.parse_args()
+    report = run(benchmark(args))
+    for key, value in report.items():
+        print(f"{key:>20}: {value:.3f}")
+    if args.output:
+        with open(args.output, "w") as file:
+            dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+SPDX-FileCopyrightText: 2025 Michael Czigler
+SPDX-License-Identifier: BSD-3-Clause
+
+Synthetic benchmark fixtures.
+"""
+
+from os.path import join
+from tempfile import mkdtemp
+
+from uhtf import create_app
+from uhtf.database import get_db
+from uhtf.models.base import Measurement
+from uhtf.models.base import MeasurementOutcome
+from uhtf.models.base import Phase
+from uhtf.models.base import PhaseOutcome
+from uhtf.models.base import Procedure
+from uhtf.models.base import Step
+from uhtf.models.base import UnitUnderTest
+
+GTIN = "00012345678905"
+BARCODE = f"01{GTIN}11250101" + "21{:05d}"
+
+
+def create(**kwargs):
+    """Create an application backed by a temporary database."""
+
+    database = join(mkdtemp(), "uhtf.db")
+    return create_app({"DATABASE": database, "TESTING": True, **kwargs})
+
+
+def seed(
+    db,
+    root_path: str,
+    ports: list,
+    phases: int = 4,
+    steps: int = 10,
+) -> None:
+    """
+    Initialize the schema and insert a single part whose protocol has
+    phases x steps rows, alternating settings and measured queries
+    across every simulated instrument port.
+    """
+
+    with open(join(root_path, "schema.sql")) as file:
+        db.executescript(file.read())
+    for index, port in enumerate(ports):
+        db.execute(
+            "INSERT INTO instrument (name, hostname, port) VALUES (?, ?, ?)",
+            (f"SIM{index}", "127.0.0.1", port),
+        )
+    for index in range(steps):
+        db.execute(
+            "INSERT INTO command (name, scpi, delay) VALUES (?, ?, 0)",
+            (f"CONF{index}", f"CONF:VOLT:DC (@{index})"),
+        )
+        db.execute(
+            "INSERT INTO command (name, scpi, delay) VALUES (?, ?, 0)",
+            (f"MEAS{index}", f"MEAS:VOLT:DC? (@{index})"),
+        )
+        db.execute(
+            """
+            INSERT INTO measurement (
+                name, precision, units, lower_limit, upper_limit
+            ) VALUES (?, 3, 'V', 0.5, 1.5)
+            """,
+            (f"VOLT{index}",),
+        )
+    db.execute(
+        """
+        INSERT INTO part (
+            name, global_trade_item_number, number, revision
+        ) VALUES ('Benchmark', ?, 'BENCH-1', 'A')
+        """,
+        (GTIN,),
+    )
+    for phase in range(phases):
+        db.execute("INSERT INTO phase (name) VALUES (?)", (f"P{phase}",))
+        for step in range(steps):
+            instrument = (phase * steps + step) % len(ports) + 1
+            is_query = step % 2
+            db.execute(
+                """
+                INSERT INTO protocol (
+                    command_id, instrument_id, measurement_id,
+                    part_id, phase_id
+                ) VALUES (?, ?, ?, 1, ?)
+                """,
+                (
+                    2 * step + 1 + is_query,
+                    instrument,
+                    step + 1 if is_query else None,
+                    phase + 1,
+                ),
+            )
+    db.commit()
+
+
+async def prepare(app, ports: list, **kwargs) -> None:
+    async with app.app_context():
+        seed(get_db(), app.root_path, ports, **kwargs)
+
+
+def recipes(port: int, phases: int = 4, steps: int = 10) -> list:
+    """Synthetic recipe rows as returned by the recipe select query."""
+
+    rows = []
+    for phase in range(phases):
+        for step in range(steps):
+            is_query = step % 2
+            header = "MEAS:VOLT:DC?" if is_query else "CONF:VOLT:DC"
+            rows.append({
+                "command_name": f"{header.split(':')[0]}{step}",
+                "command_scpi": f"{header} (@{step})",
+                "command_delay": 0,
+                "command_sync": None,
+                "command_sync_timeout": 5000,
+                "command_sync_mask": None,
+                "command_sync_tolerance": None,
+                "instrument_name": "SIM0",
+                "instrument_hostname": "127.0.0.1",
+                "instrument_port": port,
+                "instrument_transport": "tcp",
+                "instrument_connect_timeout": 5000,
+                "instrument_read_timeout": 5000,
+                "instrument_retries": 0,
+                "instrument_failure_threshold": 3,
+                "measurement_name": f"VOLT{step}" if is_query else None,
+                "measurement_precision": 3 if is_query else None,
+                "measurement_units": "V" if is_query else None,
+                "measurement_lower_limit": 0.5 if is_query else None,
+                "measurement_upper_limit": 1.5 if is_query else None,
+                "measurement_aggregate": None,
+                "phase_name": f"P{phase}",
+                "phase_retries": 0,
+                "phase_on_failure": "FAIL_AND_CONTINUE",
+                "phase_prerequisite": None,
+                "phase_setup": 0,
+                "phase_teardown": 0,
+            })
+    return rows
+
+
+def procedure(phases: int = 4, measurements: int = 10) -> Procedure:
+    """Synthetic completed procedure snapshot."""
+
+    result = Procedure(
+        "BENCH01",
+        "Benchmark",
+        unit_under_test=UnitUnderTest("12345", "BENCH-1", "Benchmark", "A"),
+    )
+    for phase in range(phases):
+        result.phases.append(Phase(
+            name=f"P{phase}",
+            outcome=PhaseOutcome.PASS,
+            start_time_millis=1740000000000.0,
+            end_time_millis=1740000001000.0,
+            measurements=[
+                Measurement(
+                    name=f"VOLT{index}",
+                    outcome=MeasurementOutcome.PASS,
+                    measured_value=1.0 + index / 1000,
+                    units="V",
+                    lower_limit=0.5,
+                    upper_limit=1.5,
+                )
+                for index in range(measurements)
+            ],
+            steps=[
+                Step(f"MEAS{index}", "SIM0", {"send": 1000, "wait": 9000})
+                for index in range(measurements)
+            ],
+        ))
+    return result
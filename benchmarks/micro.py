@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+SPDX-FileCopyrightText: 2025 Michael Czigler
+SPDX-License-Identifier: BSD-3-Clause
+
+Micro-benchmarks for recipe engine hot paths.
+
+    python -m benchmarks.micro --size 100 -o benchmarks/results/baseline.json
+    python -m benchmarks.micro --size 100 -o benchmarks/results/current.json
+    python -m pyperf compare_to benchmarks/results/baseline.json \\
+        benchmarks/results/current.json --table
+"""
+
+from asyncio import ensure_future
+from asyncio import sleep
+from dataclasses import asdict
+from importlib.resources import files
+from json import dumps
+from sqlite3 import connect
+
+from pyperf import Runner
+
+from uhtf.automatic import recipe_select_query
+from uhtf.models.base import Procedure
+from uhtf.models.broker import Broker
+from uhtf.models.recipe import builder
+from uhtf.models.recipe import in_range
+from uhtf.models.serialize import dumps as fast_dumps
+from uhtf.models.tcp import TCP
+from uhtf.simulator import Simulator
+
+from .e2e import serve
+from .fixtures import procedure
+from .fixtures import recipes
+from .fixtures import seed
+
+
+def bench_builder(rows: list) -> None:
+    for _ in builder(rows, Procedure("BENCH01", "Benchmark")):
+        pass
+
+
+def bench_in_range(values: list) -> None:
+    for value in values:
+        in_range(value, 0.5, 1.5, 3)
+
+
+def bench_serialize(snapshot: Procedure) -> None:
+    dumps(asdict(snapshot))
+
+
+def bench_fast_serialize(snapshot: Procedure) -> None:
+    fast_dumps(snapshot)
+
+
+def bench_query(port: int, count: int) -> None:
+    with TCP("127.0.0.1", port) as tcp:
+        for _ in range(count):
+            tcp.query(b"READ?\n")
+
+
+async def bench_publish(subscribers: int, messages: int) -> None:
+    broker = Broker()
+
+    async def consume() -> None:
+        async for _ in broker.subscribe():
+            pass
+
+    tasks = [ensure_future(consume()) for _ in range(subscribers)]
+    await sleep(0)
+    for index in range(messages):
+        await broker.publish(str(index))
+    for task in tasks:
+        task.cancel()
+
+
+def bench_select(db) -> None:
+    db.execute(recipe_select_query, (1,)).fetchall()
+
+
+def add_cmdline_args(cmd: list, args) -> None:
+    cmd.extend(("--size", str(args.size)))
+
+
+def main() -> None:
+    runner = Runner(
+        add_cmdline_args=add_cmdline_args,
+        program_args=("-m", "benchmarks.micro"),
+    )
+    runner.argparser.add_argument(
+        "--size",
+        type=int,
+        default=100,
+        help="Fixture scale (protocol rows are size x 100).",
+    )
+    args = runner.parse_args()
+    size = args.size
+
+    # simulated instruments: one fast and one with bulky responses
+    fast = Simulator(port=0, seed=0)
+    bulky = Simulator(port=0, payload=size * 10, seed=0)
+    port, = serve(fast)
+    bulky_port, = serve(bulky)
+
+    db = connect(":memory:")
+    seed(db, str(files("uhtf")), [port], phases=size, steps=100)
+
+    runner.bench_func(
+        f"builder[{size}]",
+        bench_builder,
+        recipes(port, phases=size // 10 or 1, steps=10),
+    )
+    runner.bench_func(
+        f"in_range[{size * 100}]",
+        bench_in_range,
+        [0.5 + index / (size * 100) for index in range(size * 100)],
+    )
+    runner.bench_func(
+        f"dumps_asdict[{size * 10}]",
+        bench_serialize,
+        procedure(phases=size // 10 or 1, measurements=100),
+    )
+    runner.bench_func(
+        f"serialize[{size * 10}]",
+        bench_fast_serialize,
+        procedure(phases=size // 10 or 1, measurements=100),
+    )
+    runner.bench_func(
+        f"tcp_query[{size * 10}x{size}]",
+        bench_query,
+        bulky_port,
+        size,
+    )
+    runner.bench_async_func(
+        f"broker_publish[{size}]",
+        bench_publish,
+        8,
+        size,
+    )
+    runner.bench_func(
+        f"recipe_select_query[{size * 100}]",
+        bench_select,
+        db,
+    )
+
+
+if __name__ == "__main__":
+    main()
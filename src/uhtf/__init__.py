@@ -19,13 +19,18 @@ from .authorize import authorize
 from .automatic import automatic
 from .database import init_database
 from .command import command
+from .datalog import datalog
 from .instrument import instrument
 from .manual import manual
 from .measurement import measurement
+from .metrics import metrics
+from .models.serialize import use_backend
 from .part import part
 from .phase import phase
 from .protocol import protocol
 from .setting import setting
+from .simulator import init_simulator
+from .slot import slot
 from .token import init_token
 
 __version__ = "0.0.4"
@@ -38,6 +43,22 @@ def create_app(test_config: dict = None) -> Quart:
     app.config.from_mapping(
         SECRET_KEY="dev",
         DATABASE=join(app.instance_path, "uhtf.db"),
+        HEALTH_INTERVAL=30,
+        RUN_QUEUE_SIZE=4,
+        ARCHIVE_CONCURRENCY=8,  # uploads in flight
+        ARCHIVE_CONNECT_TIMEOUT=5.0,
+        ARCHIVE_READ_TIMEOUT=30.0,
+        ARCHIVE_GZIP=False,  # the archive must accept gzip bodies
+        ARCHIVE_QUEUE_SIZE=1024,  # procedures queued per sink
+        ARCHIVE_RETRIES=3,  # attempts after a failed write
+        ARCHIVE_BACKOFF=1.0,  # seconds before the first retry, doubling
+        ARCHIVE_SPOOL=join(app.instance_path, "spool"),
+        ARCHIVE_DIRECTORY=join(app.instance_path, "archive"),
+        ARCHIVE_FILE_MAX_BYTES=64 * 1024 * 1024,
+        ARCHIVE_FILE_GZIP=False,
+        DATALOG_CAPACITY=4096,  # samples kept in memory per channel
+        DATALOG_POINTS=240,  # plot points per channel
+        JSON_BACKEND="json",  # or "orjson" (compact, NaN written as null)
     )
     if test_config is None:
         app.config.from_pyfile(
@@ -51,19 +72,24 @@ def create_app(test_config: dict = None) -> Quart:
     except OSError:
         pass
 
+    use_backend(app.config["JSON_BACKEND"])
     init_database(app)
     init_token(app)
+    init_simulator(app)
     app.register_blueprint(api)
     app.register_blueprint(authorize)
     app.register_blueprint(automatic)
     app.register_blueprint(command)
+    app.register_blueprint(datalog)
     app.register_blueprint(instrument)
     app.register_blueprint(manual)
     app.register_blueprint(measurement)
+    app.register_blueprint(metrics)
     app.register_blueprint(part)
     app.register_blueprint(phase)
     app.register_blueprint(protocol)
     app.register_blueprint(setting)
+    app.register_blueprint(slot)
     
     @app.get("/")
     async def home():
@@ -11,6 +11,21 @@ Command endpoints.
 from quart import Blueprint
 from quart import request
 
+from ..automatic import recipes
+from ..command import sync_defaults
+from ..models.analyze import analyze
+from ..models.analyze import history
+from ..models.gs1 import validate
+from ..models.sink import fanout
+from ..models.timing import metrics
+from ..models.tuning import tuner
+from ..instrument import policy_defaults
+from ..measurement import aggregate_defaults
+from ..part import get_directory
+from ..part import mode_defaults
+from ..part import refresh
+from ..phase import result_defaults
+from ..slot import slot_defaults
 from ..token import token_required
 from ..database import get_db
 
@@ -53,6 +68,22 @@ async def list_parts() -> tuple:
     return list(map(dict, rows)), 201
 
 
+@api.get("/archive/sinks")
+@token_required
+async def read_archive_sinks() -> tuple:
+    """Read archive sink queue statistics."""
+
+    return fanout.status(), 200
+
+
+@api.get("/part/directory")
+@token_required
+async def read_part_directory() -> tuple:
+    """Read in-memory part directory lookup statistics."""
+
+    return get_directory().stats(), 200
+
+
 @api.get("/phase")
 @token_required
 async def list_phases() -> tuple:
@@ -69,6 +100,14 @@ async def list_protocols() -> tuple:
     return list(map(dict, rows)), 201
 
 
+@api.get("/slot")
+@token_required
+async def list_slots() -> tuple:
+    query = "SELECT * FROM slot"
+    rows = get_db().execute(query).fetchall()
+    return list(map(dict, rows)), 201
+
+
 @api.get("/command/<int:id>")
 @token_required
 async def read_command(id: int) -> tuple:
@@ -109,6 +148,36 @@ async def read_part(id: int) -> tuple:
     return dict(row), 201
 
 
+@api.get("/part/<int:id>/analyze")
+@token_required
+async def analyze_part(id: int) -> tuple:
+    """
+    Dry run a part's protocol: validate every step and estimate its
+    cycle time from command delays and this station's step latency.
+    """
+
+    if get_directory().get_id(id) is None:
+        return "Part does not exist.", 404
+    rows, slots = recipes(id)
+    return analyze(rows, history(metrics), slots), 200
+
+
+@api.get("/part/<int:id>/tuning")
+@token_required
+async def read_part_tuning(id: int) -> tuple:
+    """
+    Observed response and settling percentiles of the part's delayed
+    commands with the proposed minimal safe delay of each.
+    """
+
+    if get_directory().get_id(id) is None:
+        return "Part does not exist.", 404
+    rows, _ = recipes(id)
+    commands = tuner.report(rows)
+    saving = sum(row["saving"] or 0.0 for row in commands)
+    return {"commands": commands, "saving": saving}, 200
+
+
 @api.get("/phase/<int:id>")
 @token_required
 async def read_phase(id: int) -> tuple:
@@ -129,6 +198,16 @@ async def read_protocol(id: int) -> tuple:
     return dict(row), 201
 
 
+@api.get("/slot/<int:id>")
+@token_required
+async def read_slot(id: int) -> tuple:
+    query = "SELECT * FROM slot WHERE id = ?"
+    row = get_db().execute(query, (id,)).fetchone()
+    if not row:
+        return "Slot does not exist.", 404
+    return dict(row), 201
+
+
 @api.delete("/command/<int:id>")
 @token_required
 async def delete_command(id: int) -> tuple:
@@ -154,7 +233,11 @@ async def delete_measurement(id: int) -> tuple:
 @token_required
 async def delete_part(id: int) -> tuple:
     query = "DELETE FROM part WHERE id = ?"
-    get_db().execute(query, (id,)).commit()
+    db = get_db()
+    db.execute(query, (id,))
+    db.commit()
+    refresh(db, id)
+    return "Part successfully deleted.", 200
 
 
 @api.delete("/phase/<int:id>")
@@ -171,10 +254,23 @@ async def delete_protocol(id: int) -> tuple:
     get_db().execute(query, (id,)).commit()
 
 
+@api.delete("/slot/<int:id>")
+@token_required
+async def delete_slot(id: int) -> tuple:
+    query = "DELETE FROM slot WHERE id = ?"
+    db = get_db()
+    db.execute(query, (id,))
+    db.commit()
+    return "Slot successfully deleted.", 200
+
+
 @api.post("/command")
 @token_required
 async def create_command() -> tuple:
-    form = (await request.form).copy().to_dict()
+    try:
+        form = sync_defaults((await request.form).copy().to_dict())
+    except ValueError:
+        return "Invalid parameter(s).", 400
     try:
         db = get_db()
         db.execute("PRAGMA foreign_keys = ON")
@@ -183,11 +279,19 @@ async def create_command() -> tuple:
             INSERT INTO command (
                 name,
                 scpi,
-                delay
+                delay,
+                sync,
+                sync_timeout,
+                sync_mask,
+                sync_tolerance
             ) VALUES (
                 :name,
                 :scpi,
-                :delay
+                :delay,
+                :sync,
+                :sync_timeout,
+                :sync_mask,
+                :sync_tolerance
             )
             """,
             form,
@@ -203,7 +307,7 @@ async def create_command() -> tuple:
 @api.post("/instrument")
 @token_required
 async def create_instrument() -> tuple:
-    form = (await request.form).copy().to_dict()
+    form = policy_defaults((await request.form).copy().to_dict())
     try:
         db = get_db()
         db.execute("PRAGMA foreign_keys = ON")
@@ -212,11 +316,21 @@ async def create_instrument() -> tuple:
             INSERT INTO instrument (
                 name,
                 hostname,
-                port
+                port,
+                transport,
+                connect_timeout,
+                read_timeout,
+                retries,
+                failure_threshold
             ) VALUES (
                 :name,
                 :hostname,
-                :port
+                :port,
+                :transport,
+                :connect_timeout,
+                :read_timeout,
+                :retries,
+                :failure_threshold
             )
             """,
             form,
@@ -232,7 +346,7 @@ async def create_instrument() -> tuple:
 @api.post("/measurement")
 @token_required
 async def create_measurement() -> tuple:
-    form = (await request.form).copy().to_dict()
+    form = aggregate_defaults((await request.form).copy().to_dict())
     try:
         db = get_db()
         db.execute("PRAGMA foreign_keys = ON")
@@ -243,14 +357,15 @@ async def create_measurement() -> tuple:
                 precision,
                 units,
                 lower_limit,
-                upper_limit
-                
+                upper_limit,
+                aggregate
             ) VALUES (
                 :name,
                 :precision,
                 :units,
                 :lower_limit,
-                :upper_limit
+                :upper_limit,
+                :aggregate
             )
             """,
             form,
@@ -266,27 +381,30 @@ async def create_measurement() -> tuple:
 @api.post("/part")
 @token_required
 async def create_part() -> tuple:
-    form = (await request.form).copy().to_dict()
+    form = mode_defaults((await request.form).copy().to_dict())
     try:
         db = get_db()
         db.execute("PRAGMA foreign_keys = ON")
-        db.execute(
+        cursor = db.execute(
             """
             INSERT INTO part (
                 name,
                 global_trade_item_number,
                 number,
-                revision
+                revision,
+                run_mode
             ) VALUES (
                 :name,
                 :global_trade_item_number,
                 :number,
-                :revision
+                :revision,
+                :run_mode
             )
             """,
             form,
         )
         db.commit()
+        refresh(db, cursor.lastrowid)
     except db.ProgrammingError:
         return "Missing parameter(s).", 400
     except db.IntegrityError:
@@ -297,16 +415,29 @@ async def create_part() -> tuple:
 @api.post("/phase")
 @token_required
 async def create_phase() -> tuple:
-    form = (await request.form).copy().to_dict()
+    try:
+        form = result_defaults((await request.form).copy().to_dict())
+    except ValueError:
+        return "Invalid parameter(s).", 400
     try:
         db = get_db()
         db.execute("PRAGMA foreign_keys = ON")
         db.execute(
             """
             INSERT INTO phase (
-                name
+                name,
+                retries,
+                on_failure,
+                prerequisite_id,
+                setup,
+                teardown
             ) VALUES (
-                :name
+                :name,
+                :retries,
+                :on_failure,
+                :prerequisite_id,
+                :setup,
+                :teardown
             )
             """,
             form,
@@ -351,3 +482,56 @@ async def create_protocol() -> tuple:
     except db.IntegrityError:
         return "Invalid parameter(s).", 400
     return "Phase successfully created.", 201
+
+
+@api.post("/slot")
+@token_required
+async def create_slot() -> tuple:
+    form = slot_defaults((await request.form).copy().to_dict())
+    try:
+        db = get_db()
+        db.execute("PRAGMA foreign_keys = ON")
+        db.execute(
+            """
+            INSERT INTO slot (
+                part_id,
+                position,
+                instrument_id,
+                mapped_instrument_id,
+                channel
+            ) VALUES (
+                :part_id,
+                :position,
+                :instrument_id,
+                :mapped_instrument_id,
+                :channel
+            )
+            """,
+            form,
+        )
+        db.commit()
+    except db.ProgrammingError:
+        return "Missing parameter(s).", 400
+    except db.IntegrityError:
+        return "Invalid parameter(s).", 400
+    return "Slot successfully created.", 201
+
+
+@api.post("/label/validate")
+@token_required
+async def validate_labels() -> tuple:
+    """
+    Validate a batch of scanned GS1 labels (a JSON list, or repeated
+    label form fields) against the known parts before testing.
+    """
+
+    labels = await request.get_json(silent=True)
+    if labels is None:
+        labels = (await request.form).getlist("label")
+    if not isinstance(labels, list) or not labels:
+        return "Missing parameter(s).", 400
+    if not all(isinstance(label, str) for label in labels):
+        return "Invalid parameter(s).", 400
+    results = validate(labels, get_directory())
+    valid = all(result["valid"] for result in results)
+    return {"valid": valid, "results": results}, 200
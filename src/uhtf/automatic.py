@@ -9,40 +9,74 @@ Test endpoints.
 """
 
 from asyncio import ensure_future
-from dataclasses import asdict
-from json import dumps
-from re import Match
-from re import search
+from asyncio import gather
+from datetime import datetime
+from os.path import join
 
 from quart import Blueprint
+from quart import current_app
 from quart import Quart
 from quart import render_template
 from quart import websocket
 
 from .database import get_db
-from .models.archive import ArchiveClient
 from .models.base import Procedure
 from .models.base import UnitUnderTest
 from .models.broker import Broker
+from .models.compact import compact
+from .models.directory import directory
+from .models.gs1 import GS1Error
+from .models.gs1 import parse
+from .models.panel import lanes
+from .models.panel import positions
+from .models.panel import remap
+from .models.panel import split
+from .models.panel import teardowns
+from .models.panel import unit
 from .models.recipe import builder
+from .models.runqueue import advance
+from .models.runqueue import Entry
+from .models.runqueue import RunQueue
+from .models.serialize import dumps
+from .models.sink import fanout
+from .models.sink import resolve
+from .models.timing import profile
+from .part import get_directory
+from .setting import get_setting
 
 automatic = Blueprint("automatic", __name__)
-broker = Broker()
-gs1_regex = r"(01)(?P<global_trade_item_number>\d{14})" \
-          + r"(11)(?P<manufacture_date>\d{6})" \
-          + r"(21)(?P<serial_number>\d{5})"
+broker = Broker("automatic")
+queue = RunQueue()
 recipe_select_query = """
 SELECT
+    command.name AS command_name,
     command.scpi AS command_scpi,
     command.delay AS command_delay,
+    command.sync AS command_sync,
+    command.sync_timeout AS command_sync_timeout,
+    command.sync_mask AS command_sync_mask,
+    command.sync_tolerance AS command_sync_tolerance,
+    instrument.id AS instrument_id,
+    instrument.name AS instrument_name,
     instrument.hostname AS instrument_hostname,
     instrument.port AS instrument_port,
+    instrument.transport AS instrument_transport,
+    instrument.connect_timeout AS instrument_connect_timeout,
+    instrument.read_timeout AS instrument_read_timeout,
+    instrument.retries AS instrument_retries,
+    instrument.failure_threshold AS instrument_failure_threshold,
     measurement.name AS measurement_name,
     measurement.precision AS measurement_precision,
     measurement.units AS measurement_units,
     measurement.lower_limit AS measurement_lower_limit,
     measurement.upper_limit AS measurement_upper_limit,
-    phase.name AS phase_name
+    measurement.aggregate AS measurement_aggregate,
+    phase.name AS phase_name,
+    phase.retries AS phase_retries,
+    phase.on_failure AS phase_on_failure,
+    phase.setup AS phase_setup,
+    phase.teardown AS phase_teardown,
+    prerequisite.name AS phase_prerequisite
 FROM
     protocol
 INNER JOIN
@@ -55,43 +89,121 @@ INNER JOIN
     part ON part.id = protocol.part_id
 INNER JOIN
     phase ON phase.id = protocol.phase_id
+OUTER LEFT JOIN
+    phase AS prerequisite ON prerequisite.id = phase.prerequisite_id
 WHERE
     part.id = ?
 """
+slot_select_query = """
+SELECT
+    slot.position AS position,
+    slot.instrument_id AS instrument_id,
+    slot.channel AS channel,
+    mapped.name AS instrument_name,
+    mapped.hostname AS instrument_hostname,
+    mapped.port AS instrument_port,
+    mapped.transport AS instrument_transport,
+    mapped.connect_timeout AS instrument_connect_timeout,
+    mapped.read_timeout AS instrument_read_timeout,
+    mapped.retries AS instrument_retries,
+    mapped.failure_threshold AS instrument_failure_threshold
+FROM
+    slot
+OUTER LEFT JOIN
+    instrument AS mapped ON mapped.id = slot.mapped_instrument_id
+WHERE
+    slot.part_id = ?
+"""
+setting_select_query = """
+SELECT
+    key,
+    value
+FROM
+    setting
+WHERE
+    key IN ('run_mode', 'state_cache', 'delay_tuning', 'profile')
+"""
 
 
 def lookup(global_trade_item_number: str) -> dict | None:
-    row = get_db().execute(
-        """
-        SELECT * FROM part WHERE global_trade_item_number = ?
-        """,
-        (global_trade_item_number,),
-    ).fetchone()
-    if not row:
-        return None
-    return dict(row)
+    return get_directory().get(global_trade_item_number)
+
+
+def recipes(part_id: int) -> tuple[list, list]:
+    """Recipe and panel slot rows of a part, cached until a write."""
+
+    cached = directory.get_recipes(part_id)
+    if cached is None:
+        db = get_db()
+        rows = db.execute(recipe_select_query, (part_id,)).fetchall()
+        slots = db.execute(slot_select_query, (part_id,)).fetchall()
+        cached = directory.put_recipes(part_id, (rows, slots))
+    return cached
+
+
+def scan_setting(key: str) -> str | None:
+    """A setting read on every scan, cached until a write."""
+
+    cached = directory.get_settings()
+    if cached is None:
+        rows = get_db().execute(setting_select_query).fetchall()
+        cached = directory.put_settings(
+            {row["key"]: row["value"] for row in rows}
+        )
+    return cached.get(key)
 
 
 def archive(procedure: Procedure) -> None:
-    url = get_db().execute(
-        """
-        SELECT value FROM setting WHERE key = 'archive_url'
-        """
-    ).fetchone()["value"]
-    if not isinstance(url, str) or url == "":
-        return  # not a valid archive URL
-    token = get_db().execute(
-        """
-        SELECT value FROM setting WHERE key = 'archive_access_token'
-        """
-    ).fetchone()["value"]
-    if not isinstance(token, str) or token == "":
-        return  # not a valid archive token
-    try:
-        client = ArchiveClient(url, token)
-        client.post(procedure)
-    except Exception as e:
-        print(e)
+    """
+    Queue a procedure on every sink named by the archive_sinks setting
+    (i.e. "http, file"). Each sink writes from its own queue in the
+    background, so neither the next unit nor the other sinks wait on
+    a slow one.
+    """
+
+    url = get_setting("archive_url")
+    token = get_setting("archive_access_token")
+    config = {
+        **current_app.config,
+        "archive_url": url,
+        "archive_access_token": token,
+    }
+    wanted = {}
+    names = (get_setting("archive_sinks") or "").replace(",", " ").split()
+    for name in names:
+        try:
+            resolve(name)
+        except ValueError as error:
+            current_app.logger.warning(str(error))
+            continue
+        if name != "http":
+            wanted[(name,)] = (name, config)
+        elif isinstance(url, str) and url and isinstance(token, str) \
+                and token:
+            wanted[(name, url, token)] = (name, config)
+    retained = compact(procedure)  # while queued, shared by the sinks
+    for sink in fanout.configure(wanted):
+        sink.put(retained)
+
+
+def profile_path(procedure: Procedure) -> str:
+    """Path prefix for a single run profile capture."""
+
+    path = join(current_app.instance_path, "profile")
+    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
+    serial_number = procedure.unit_under_test.serial_number
+    return join(path, f"{serial_number}-{timestamp}")
+
+
+def consume_profile() -> None:
+    """Reset the one-shot profile setting once a run has taken it."""
+
+    db = get_db()
+    db.execute("UPDATE setting SET value = 'off' WHERE key = 'profile'")
+    db.commit()
+    cached = directory.get_settings()
+    if cached is not None:
+        directory.put_settings({**cached, "profile": "off"})
 
 
 @automatic.get("/automatic")
@@ -101,52 +213,154 @@ async def read():
     return await render_template("automatic.html")
 
 
+async def publish(procedure: Procedure, state: str) -> None:
+    """Publish a procedure snapshot with the run queue status."""
+
+    await broker.publish(dumps([procedure, state, queue.status()]))
+
+
+async def prepare(message: str) -> None:
+    """Parse, validate and resolve the recipes of a scanned unit."""
+
+    unit_under_test = UnitUnderTest(None)
+    procedure = Procedure("FVT01", "Multi-coil Check")
+    procedure.unit_under_test = unit_under_test
+    try:
+        label = parse(message)
+        gtin = label["global_trade_item_number"]
+    except (GS1Error, KeyError):
+        procedure.run_passed = False
+        await publish(procedure, "INVALID")
+        return
+    procedure.unit_under_test.global_trade_item_number = gtin
+    procedure.unit_under_test.manufacture_date = label.get(
+        "manufacture_date"
+    )
+    procedure.unit_under_test.serial_number = label.get("serial_number")
+    procedure.unit_under_test.batch_number = label.get("batch_number")
+    part = lookup(gtin)
+    if not isinstance(part, dict):
+        procedure.run_passed = False
+        await publish(procedure, "UNKNOWN")
+        return
+    procedure.unit_under_test.part_number = part["number"]
+    procedure.unit_under_test.revision = part["revision"]
+    procedure.unit_under_test.part_name = part["name"]
+    rows, slots = recipes(part["id"])
+    entry = Entry(
+        procedure,
+        rows,
+        part["run_mode"] or scan_setting("run_mode"),
+        scan_setting("state_cache") or "off",
+        scan_setting("delay_tuning") or "off",
+        slots,
+        scan_setting("profile") or "off",
+    )
+    if not queue.put(entry):
+        procedure.run_passed = False
+        await publish(procedure, "FULL")
+        return
+    if entry.profile in ("cprofile", "pyinstrument"):
+        consume_profile()
+    await publish(procedure, "QUEUED")
+
+
+async def steps(
+    procedure: Procedure,
+    rows: list,
+    entry: Entry,
+    inline: bool = False,
+) -> Procedure:
+    """Run recipes for a single procedure, publishing each step."""
+
+    generator = builder(
+        rows,
+        procedure,
+        entry.mode,
+        entry.cache,
+        entry.tuning,
+    )
+    async for temp in advance(generator, inline):
+        procedure = temp
+        await publish(procedure, "RUNNING")
+    return procedure
+
+
+async def finalize(procedure: Procedure) -> None:
+    """Publish the final result of a procedure and archive it."""
+
+    if not procedure.run_passed:
+        await publish(procedure, "FAIL")
+    else:
+        await publish(procedure, "PASS")
+    archive(procedure)
+
+
+async def execute(entry: Entry) -> None:
+    """
+    Test a prepared unit and archive its results. Parts with panel
+    slots run the shared setup phases once, then the positions (those
+    sharing an instrument in turn, the others concurrently), archiving
+    one procedure per position.
+    """
+
+    procedure = entry.procedure
+    await publish(procedure, "RUNNING")
+    inline = entry.profile in ("cprofile", "pyinstrument")
+    with profile(profile_path(procedure), entry.profile):
+        if not entry.slots:
+            procedure = await steps(procedure, entry.rows, entry, inline)
+            await finalize(procedure)
+            return
+        shared, rows = split(entry.rows)
+        procedure = await steps(procedure, shared, entry, inline)
+        if not procedure.run_passed:
+            rows = teardowns(rows)  # fixture back to a safe state only
+        units = {
+            position: remap(rows, slots)
+            for position, slots in positions(entry.slots).items()
+        }
+
+        async def lane(order: list) -> None:
+            for position in order:
+                temp = unit(procedure, position)
+                temp = await steps(temp, units[position], entry, inline)
+                await finalize(temp)
+
+        await gather(*(lane(order) for order in lanes(units)))
+
+
+async def work(app: Quart) -> None:
+    """Test queued units one at a time as the fixture frees up."""
+
+    while True:
+        entry = await queue.get()
+        async with app.app_context():
+            try:
+                await execute(entry)
+            except Exception:
+                app.logger.exception("automatic run failed")
+
+
+@automatic.after_app_serving
+async def stop() -> None:
+    """Stop the run queue worker and drain the archive sinks."""
+
+    queue.stop()
+    await fanout.close(current_app.config["ARCHIVE_READ_TIMEOUT"])
+
+
 @automatic.websocket("/automatic/ws")
 async def ws():
     """Automatic test websocket callback."""
 
+    app = current_app._get_current_object()
+    queue.start(app.config["RUN_QUEUE_SIZE"], work, app)
+
     async def _receive() -> None:
         while True:
             message = await websocket.receive()
-            unit_under_test = UnitUnderTest(None)
-            procedure = Procedure("FVT01", "Multi-coil Check")
-            procedure.unit_under_test = unit_under_test
-            await broker.publish(dumps([asdict(procedure),"RUNNING"]))
-            match = search(gs1_regex, message)
-            if isinstance(match, Match):
-                gtin = match.group("global_trade_item_number")
-                manufacture_date = match.group("manufacture_date")
-                serial_number = match.group("serial_number")
-                procedure.unit_under_test.global_trade_item_number = gtin
-                procedure.unit_under_test.manufacture_date = manufacture_date
-                procedure.unit_under_test.serial_number = serial_number
-                await broker.publish(dumps([asdict(procedure),"RUNNING"]))
-            else:
-                procedure.run_passed = False
-                await broker.publish(dumps([asdict(procedure),"INVALID"]))
-                continue  # restart procedure
-            part = lookup(match.group("global_trade_item_number"))
-            if isinstance(part, dict):
-                procedure.unit_under_test.part_number = part["number"]
-                procedure.unit_under_test.revision = part["revision"]
-                procedure.unit_under_test.part_name = part["name"]
-                await broker.publish(dumps([asdict(procedure),"RUNNING"]))
-            else:
-                procedure.run_passed = False
-                await broker.publish(dumps([asdict(procedure),"UNKNOWN"]))
-                continue  # restart procedure
-            # accumulate phases
-            rows = get_db().execute(recipe_select_query, (part["id"],)).fetchall()
-            for temp in builder(rows, procedure):
-                procedure = temp
-                await broker.publish(dumps([asdict(procedure),"RUNNING"]))
-            # finalize results
-            if not procedure.run_passed:
-                await broker.publish(dumps([asdict(procedure),"FAIL"]))
-            else:
-                await broker.publish(dumps([asdict(procedure),"PASS"])) 
-            archive(procedure)
-            
+            await prepare(message)
 
     try:
         task = ensure_future(_receive())
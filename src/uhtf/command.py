@@ -17,10 +17,32 @@ from quart import url_for
 
 from .authorize import login_required
 from .database import get_db
+from .models.sync import Sync
 
 command = Blueprint("command", __name__)
 
 
+def sync_defaults(form: dict) -> dict:
+    """
+    Fill optional synchronization parameters, raising ValueError for
+    an unknown strategy or a status byte wait without a 1-255 mask
+    (which would never be satisfied).
+    """
+
+    form["sync"] = form.get("sync") or None
+    if form.get("sync_timeout") in (None, ""):
+        form["sync_timeout"] = 5000
+    form["sync_mask"] = form.get("sync_mask") or None
+    if form["sync"] is not None:
+        Sync(form["sync"])
+    if form["sync"] == Sync.STB and not (
+        form["sync_mask"] is not None and 1 <= int(form["sync_mask"]) <= 255
+    ):
+        raise ValueError("status byte sync needs a 1-255 mask")
+    form["sync_tolerance"] = form.get("sync_tolerance") or None
+    return form
+
+
 @command.get("/command")
 @login_required
 async def read() -> tuple:
@@ -42,7 +64,11 @@ async def read() -> tuple:
 async def create() -> tuple:
     """Create command callback."""
 
-    form = (await request.form).copy().to_dict()
+    try:
+        form = sync_defaults((await request.form).copy().to_dict())
+    except ValueError:
+        await flash("Invalid parameter(s).", "warning")
+        return redirect(url_for(".read"))
     try:
         db = get_db()
         db.execute("PRAGMA foreign_keys = ON")
@@ -51,11 +77,19 @@ async def create() -> tuple:
             INSERT INTO command (
                 name,
                 scpi,
-                delay
+                delay,
+                sync,
+                sync_timeout,
+                sync_mask,
+                sync_tolerance
             ) VALUES (
                 :name,
                 :scpi,
-                :delay
+                :delay,
+                :sync,
+                :sync_timeout,
+                :sync_mask,
+                :sync_tolerance
             )
             """,
             form,
@@ -92,7 +126,11 @@ async def delete():
 async def update() -> tuple:
     """Update command callback."""
 
-    form = (await request.form).copy().to_dict()
+    try:
+        form = sync_defaults((await request.form).copy().to_dict())
+    except ValueError:
+        await flash("Invalid parameter(s).", "warning")
+        return redirect(url_for(".read"))
     try:
         db = get_db()
         db.execute("PRAGMA foreign_keys = ON")
@@ -102,7 +140,11 @@ async def update() -> tuple:
                 updated_at = CURRENT_TIMESTAMP,
                 name = :name,
                 scpi = :scpi,
-                delay = :delay
+                delay = :delay,
+                sync = :sync,
+                sync_timeout = :sync_timeout,
+                sync_mask = :sync_mask,
+                sync_tolerance = :sync_tolerance
             WHERE id = :id
             """,
             form,
@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+# -*- coding: utf-8
+
+"""
+SPDX-FileCopyrightText: 2025 Michael Czigler
+SPDX-License-Identifier: BSD-3-Clause
+
+Continuous monitoring (datalog) endpoints.
+"""
+
+from datetime import datetime
+from math import inf
+from os import makedirs
+from os.path import join
+
+from click import argument
+from click import echo
+from quart import Blueprint
+from quart import current_app
+from quart import flash
+from quart import redirect
+from quart import render_template
+from quart import request
+from quart import url_for
+from quart import websocket
+
+from .authorize import login_required
+from .database import get_db
+from .manual import recipe_select_query
+from .models.broker import Broker
+from .models.datalog import datalog as logger
+from .models.datalog import read_log
+from .models.serialize import dumps
+
+broker = Broker("datalog")
+datalog = Blueprint("datalog", __name__)
+
+
+def datalog_defaults(form: dict) -> dict:
+    """
+    Fill the optional polling interval (ms) and limit window (s),
+    raising ValueError unless both are positive (and finite).
+    """
+
+    form["interval"] = int(form.get("interval") or 1000)
+    form["window"] = float(form.get("window") or 60)
+    if form["interval"] <= 0 or not 0 < form["window"] < inf:
+        raise ValueError("interval and window must be positive")
+    return form
+
+
+async def publish(points: int) -> None:
+    """Publish the status with downsampled plot points."""
+
+    await broker.publish(dumps(logger.status(points)))
+
+
+@datalog.after_app_serving
+async def shutdown() -> None:
+    logger.stop()
+
+
+@datalog.cli.command("export")
+@argument("path")
+def export_command(path: str) -> None:
+    """Print a datalog file as CSV (channel, time, value)."""
+
+    echo("channel,time,value")
+    for name, when, value in read_log(path):
+        echo(f"{name},{when!r},{value!r}")
+
+
+@datalog.get("/datalog")
+@login_required
+async def read() -> tuple:
+    """Read datalog callback."""
+
+    parts = get_db().execute("SELECT * FROM part").fetchall()
+    phases = get_db().execute("SELECT * FROM phase").fetchall()
+    return await render_template(
+        "datalog.html",
+        parts=parts,
+        phases=phases,
+        status=logger.status(),
+    )
+
+
+@datalog.get("/datalog/status")
+@login_required
+async def status() -> tuple:
+    """Read datalog status callback."""
+
+    points = request.args.get("points", 0, type=int)
+    return logger.status(points), 200
+
+
+@datalog.post("/datalog")
+@login_required
+async def start() -> tuple:
+    """Start datalog callback."""
+
+    try:
+        form = datalog_defaults((await request.form).copy().to_dict())
+    except ValueError:
+        await flash("Invalid parameter(s).", "warning")
+        return redirect(url_for(".read"))
+    if logger.running:
+        await flash("Datalog already running.", "warning")
+        return redirect(url_for(".read"))
+    try:
+        recipes = get_db().execute(recipe_select_query, form).fetchall()
+    except get_db().ProgrammingError:
+        await flash("Missing parameter(s).", "warning")
+        return redirect(url_for(".read"))
+    if not any(recipe["measurement_name"] for recipe in recipes):
+        await flash("No measurements to poll.", "warning")
+        return redirect(url_for(".read"))
+    directory = join(current_app.instance_path, "datalog")
+    makedirs(directory, exist_ok=True)
+    name = datetime.now().strftime("%Y%m%dT%H%M%S.log")
+    logger.prepare(
+        recipes,
+        form["interval"] / 1000,
+        form["window"],
+        current_app.config["DATALOG_CAPACITY"],
+        join(directory, name),
+    )
+    points = current_app.config["DATALOG_POINTS"]
+    logger.start(lambda: publish(points))
+    return redirect(url_for(".read"))
+
+
+@datalog.post("/datalog/stop")
+@login_required
+async def stop() -> tuple:
+    """Stop datalog callback."""
+
+    logger.stop()
+    await publish(current_app.config["DATALOG_POINTS"])
+    return redirect(url_for(".read"))
+
+
+@datalog.websocket("/datalog/ws")
+async def ws():
+    """Datalog status websocket callback."""
+
+    async for message in broker.subscribe():
+        await websocket.send(message)
@@ -8,7 +8,15 @@ SPDX-License-Identifier: BSD-3-Clause
 Instrument endpoints.
 """
 
+from asyncio import ensure_future
+from asyncio import run
+from asyncio import sleep
+
+from click import argument
+from click import echo
+from click import option
 from quart import Blueprint
+from quart import current_app
 from quart import flash
 from quart import redirect
 from quart import render_template
@@ -17,10 +25,103 @@ from quart import url_for
 
 from .authorize import login_required
 from .database import get_db
+from .models.breaker import breakers
+from .models.monitor import monitor
+from .models.monitor import scan
+from .models.pool import choices
+from .models.pool import pool
+from .models.serialize import to_dict
 
 instrument = Blueprint("instrument", __name__)
 
 
+def policy_defaults(form: dict) -> dict:
+    """Fill optional transport, timeout and retry policy parameters."""
+
+    form["transport"] = form.get("transport") or "tcp"
+    form["connect_timeout"] = form.get("connect_timeout") or 5000
+    form["read_timeout"] = form.get("read_timeout") or 5000
+    form["retries"] = form.get("retries") or 0
+    form["failure_threshold"] = form.get("failure_threshold") or 3
+    return form
+
+
+async def check(app) -> None:
+    """
+    Probe every configured instrument not currently in use, caching
+    identity and round trip statistics. Failed probes count towards the
+    circuit breaker so dead instruments are skipped before a unit
+    reaches them, and instruments that answer again have their circuit
+    closed. Single-session instruments refuse a second connection, so
+    raw sockets are not probed while pooled (other transports probe
+    over the pooled connection) and a refused probe is not a failure.
+    """
+
+    async with app.app_context():
+        rows = get_db().execute(
+            """
+            SELECT hostname, port, transport, failure_threshold
+            FROM instrument
+            """
+        ).fetchall()
+
+    def probed(row) -> bool:
+        address = (row["transport"], row["hostname"], row["port"])
+        if row["transport"] in (None, "tcp"):
+            return not pool.active(*address)
+        return not pool.busy(*address)
+
+    rows = list(filter(probed, rows))
+    targets = [
+        (row["hostname"], row["port"], row["transport"]) for row in rows
+    ]
+    healths = await monitor.probe_all(targets)
+    for row, health in zip(rows, healths):
+        breaker = breakers.get(
+            row["hostname"],
+            row["port"],
+            row["failure_threshold"],
+        )
+        if health.online:
+            breaker.success()
+        elif not (health.refused or health.error):
+            breaker.failure()
+
+
+async def watch(app) -> None:
+    """Periodically check instrument health while serving."""
+
+    while True:
+        try:
+            await check(app)
+        except Exception:
+            app.logger.exception("instrument health check failed")
+        await sleep(app.config["HEALTH_INTERVAL"])
+
+
+@instrument.while_app_serving
+async def health():
+    """Run the instrument health monitor while serving."""
+
+    task = ensure_future(watch(current_app._get_current_object()))
+    yield
+    task.cancel()
+
+
+@instrument.cli.command("scan")
+@argument("network")
+@option("--port", default=5025, help="SCPI socket port.")
+@option("--timeout", default=0.5, help="Connect timeout (s).")
+def scan_command(network: str, port: int, timeout: float) -> None:
+    """
+    Scan a subnet (i.e. 10.0.0.0/24) concurrently for instruments
+    answering *IDN? on the given port.
+    """
+
+    for hostname, identity in run(scan(network, port, timeout)):
+        echo(f"{hostname}:{port}\t{identity}")
+
+
 @instrument.get("/instrument")
 @login_required
 async def read() -> tuple:
@@ -34,15 +135,38 @@ async def read() -> tuple:
     return await render_template(
         "instrument.html",
         instruments=instruments,
+        breakers=breakers,
+        monitor=monitor,
+        transports=choices(),
     )
 
 
+@instrument.get("/instrument/health")
+@login_required
+async def health_status() -> tuple:
+    """Read cached instrument health callback."""
+
+    instruments = get_db().execute(
+        """
+        SELECT id, hostname, port FROM instrument
+        """
+    ).fetchall()
+    status = {}
+    for row in instruments:
+        key = (row["hostname"], row["port"])
+        status[row["id"]] = {
+            "health": to_dict(monitor.get(*key)),
+            "circuit_open": breakers.is_open(*key),
+        }
+    return status, 200
+
+
 @instrument.post("/instrument")
 @login_required
 async def create() -> tuple:
     """Create instrument callback."""
 
-    form = (await request.form).copy().to_dict()
+    form = policy_defaults((await request.form).copy().to_dict())
     try:
         db = get_db()
         db.execute("PRAGMA foreign_keys = ON")
@@ -51,11 +175,21 @@ async def create() -> tuple:
             INSERT INTO instrument (
                 name,
                 hostname,
-                port
+                port,
+                transport,
+                connect_timeout,
+                read_timeout,
+                retries,
+                failure_threshold
             ) VALUES (
                 :name,
                 :hostname,
-                :port
+                :port,
+                :transport,
+                :connect_timeout,
+                :read_timeout,
+                :retries,
+                :failure_threshold
             )
             """,
             form,
@@ -91,7 +225,7 @@ async def delete():
 async def update() -> tuple:
     """Update instrument endpoint."""
 
-    form = (await request.form).copy().to_dict()
+    form = policy_defaults((await request.form).copy().to_dict())
     try:
         db = get_db()
         db.execute("PRAGMA foreign_keys = ON")
@@ -101,7 +235,12 @@ async def update() -> tuple:
                 updated_at = CURRENT_TIMESTAMP,
                 name = :name,
                 hostname = :hostname,
-                port = :port
+                port = :port,
+                transport = :transport,
+                connect_timeout = :connect_timeout,
+                read_timeout = :read_timeout,
+                retries = :retries,
+                failure_threshold = :failure_threshold
             WHERE id = :id
             """,
             form,
@@ -9,35 +9,57 @@ Manual test endpoints.
 """
 
 from asyncio import ensure_future
-from dataclasses import asdict
-from itertools import groupby
-from json import dumps
+from asyncio import gather
+from asyncio import sleep
 from json import loads
+from math import inf
+from time import monotonic
 
 from quart import Blueprint
-from quart import Quart
+from quart import current_app
 from quart import render_template
+from quart import request
 from quart import websocket
 
 from .models.base import Procedure
 from .models.broker import Broker
 from .models.recipe import builder
+from .models.runqueue import advance
+from .models.serialize import dumps
 from .database import get_db
 
-broker = Broker()
+broker = Broker("manual")
 manual = Blueprint("manual", __name__)
 recipe_select_query = """
 SELECT
+    command.name AS command_name,
     command.scpi AS command_scpi,
     command.delay AS command_delay,
+    command.sync AS command_sync,
+    command.sync_timeout AS command_sync_timeout,
+    command.sync_mask AS command_sync_mask,
+    command.sync_tolerance AS command_sync_tolerance,
+    instrument.name AS instrument_name,
     instrument.hostname AS instrument_hostname,
     instrument.port AS instrument_port,
+    instrument.transport AS instrument_transport,
+    instrument.connect_timeout AS instrument_connect_timeout,
+    instrument.read_timeout AS instrument_read_timeout,
+    instrument.retries AS instrument_retries,
+    instrument.failure_threshold AS instrument_failure_threshold,
     measurement.name AS measurement_name,
     measurement.precision AS measurement_precision,
     measurement.units AS measurement_units,
     measurement.lower_limit AS measurement_lower_limit,
     measurement.upper_limit AS measurement_upper_limit,
-    phase.name AS phase_name
+    measurement.aggregate AS measurement_aggregate,
+    protocol.id AS protocol_id,
+    phase.name AS phase_name,
+    phase.retries AS phase_retries,
+    phase.on_failure AS phase_on_failure,
+    phase.setup AS phase_setup,
+    phase.teardown AS phase_teardown,
+    prerequisite.name AS phase_prerequisite
 FROM
     protocol
 INNER JOIN
@@ -50,9 +72,13 @@ INNER JOIN
     part ON part.id = protocol.part_id
 INNER JOIN
     phase ON phase.id = protocol.phase_id
+OUTER LEFT JOIN
+    phase AS prerequisite ON prerequisite.id = phase.prerequisite_id
 WHERE
     part.id = :part_id AND
-    phase.id = phase_id 
+    phase.id = :phase_id
+ORDER BY
+    protocol.id
 """
 
 
@@ -67,24 +93,128 @@ async def read():
     )
 
 
+def select(rows: list, first, last) -> list:
+    """
+    Steps first to last (1-based, inclusive) of a phase, raising
+    ValueError for a range outside the phase.
+    """
+
+    if not rows:
+        return rows
+    try:
+        first = int(first or 1)
+        last = int(last or len(rows))
+    except (TypeError, ValueError):
+        raise ValueError(f"invalid steps {first!r} to {last!r}") from None
+    if not 1 <= first <= last <= len(rows):
+        raise ValueError(f"invalid steps {first} to {last}")
+    return rows[first - 1:last]
+
+
+def selection(form) -> tuple[list, bool, float]:
+    """
+    Steps, loop flag and rate (Hz) of a run request, raising ValueError
+    when the request is malformed.
+    """
+
+    if not isinstance(form, dict):
+        raise ValueError("run request is not an object")
+    db = get_db()
+    try:
+        rows = db.execute(recipe_select_query, form).fetchall()
+    except db.Error:
+        raise ValueError("missing or invalid part or phase") from None
+    try:
+        rate = float(form.get("rate") or 1)
+    except (TypeError, ValueError):
+        raise ValueError(f"invalid rate {form.get('rate')!r}") from None
+    if not 0 < rate < inf:
+        raise ValueError(f"invalid rate {rate}")
+    rows = select(rows, form.get("first"), form.get("last"))
+    return rows, bool(form.get("loop")), rate
+
+
+@manual.get("/manual/steps")
+async def steps() -> tuple:
+    """Read the steps of a part's phase callback."""
+
+    rows = get_db().execute(recipe_select_query, request.args).fetchall()
+    return [
+        {
+            "step": index,
+            "command": row["command_name"],
+            "instrument": row["instrument_name"],
+            "measurement": row["measurement_name"],
+        }
+        for index, row in enumerate(rows, start=1)
+    ], 200
+
+
+async def execute(rows: list, state: str = "RUNNING") -> Procedure:
+    """Run the selected steps once, streaming every step."""
+
+    procedure = Procedure("MAN01", "Manual Test")
+    async for temp in advance(builder(rows, procedure)):
+        procedure = temp
+        await broker.publish(dumps([procedure, state]))
+    return procedure
+
+
+async def run(rows: list, loop: bool = False, rate: float = 1.0) -> None:
+    """
+    Run the selected steps once, or repeatedly at a rate (Hz) for live
+    monitoring until stopped, publishing the outcome of every iteration.
+    """
+
+    period = 1 / max(rate, 0.01)
+    iteration = 0
+    while True:
+        started = monotonic()
+        procedure = await execute(rows, "LOOP" if loop else "RUNNING")
+        iteration += 1
+        state = "PASS" if procedure.run_passed else "FAIL"
+        await broker.publish(dumps([procedure, state, iteration]))
+        if not loop:
+            return
+        await sleep(max(period - (monotonic() - started), 0))
+
+
 @manual.websocket("/manual/ws")
 async def ws():
-    """Manual test websocket callback."""
+    """
+    Manual test websocket callback. A message selects a part, a phase
+    and optionally a range of its steps (first, last) to run once, or
+    in a loop at a rate; a stop action ends the current run. A
+    malformed request publishes an ERROR state instead of closing the
+    websocket.
+    """
 
     async def _receive() -> None:
-        while True:
-            message = await websocket.receive()
-            form = loads(message)
-            rows = get_db().execute(recipe_select_query, form).fetchall()
-            procedure = Procedure("MAN01", "Manual Test")
-            await broker.publish(dumps([asdict(procedure),"RUNNING"]))
-            for temp in builder(rows, procedure):
-                procedure = temp
-                await broker.publish(dumps([asdict(temp),"RUNNING"]))
-            if not procedure.run_passed:
-                await broker.publish(dumps([asdict(procedure),"FAIL"]))
-            else:
-                await broker.publish(dumps([asdict(procedure),"PASS"]))
+        running = None
+        try:
+            while True:
+                message = await websocket.receive()
+                if running is not None:
+                    running.cancel()
+                    await gather(running, return_exceptions=True)
+                    running = None
+                procedure = Procedure("MAN01", "Manual Test")
+                try:
+                    form = loads(message)
+                    if isinstance(form, dict) \
+                            and form.get("action") == "stop":
+                        await broker.publish(dumps([procedure, "STOPPED"]))
+                        continue
+                    rows, loop, rate = selection(form)
+                except ValueError as error:
+                    current_app.logger.warning("manual run: %s", error)
+                    await broker.publish(dumps([procedure, "ERROR"]))
+                    continue
+                running = ensure_future(run(rows, loop, rate))
+        finally:
+            if running is not None:
+                running.cancel()
+                await gather(running, return_exceptions=True)
 
     try:
         task = ensure_future(_receive())
@@ -21,6 +21,13 @@ from .database import get_db
 measurement = Blueprint("measurement", __name__)
 
 
+def aggregate_defaults(form: dict) -> dict:
+    """Fill the optional multi-reading aggregate."""
+
+    form["aggregate"] = form.get("aggregate") or None
+    return form
+
+
 @measurement.get("/measurement")
 @login_required
 async def read() -> tuple:
@@ -42,7 +49,7 @@ async def read() -> tuple:
 async def create() -> tuple:
     """Create measurement callback."""
 
-    form = (await request.form).copy().to_dict()
+    form = aggregate_defaults((await request.form).copy().to_dict())
     try:
         db = get_db()
         db.execute("PRAGMA foreign_keys = ON")
@@ -53,14 +60,15 @@ async def create() -> tuple:
                 precision,
                 units,
                 lower_limit,
-                upper_limit
-                
+                upper_limit,
+                aggregate
             ) VALUES (
                 :name,
                 :precision,
                 :units,
                 :lower_limit,
-                :upper_limit
+                :upper_limit,
+                :aggregate
             )
             """,
             form,
@@ -95,7 +103,7 @@ async def delete():
 async def update() -> tuple:
     """Update measurement endpoint."""
 
-    form = (await request.form).copy().to_dict()
+    form = aggregate_defaults((await request.form).copy().to_dict())
     try:
         db = get_db()
         db.execute("PRAGMA foreign_keys = ON")
@@ -107,7 +115,8 @@ async def update() -> tuple:
                 precision = :precision,
                 units = :units,
                 lower_limit = :lower_limit,
-                upper_limit = :upper_limit 
+                upper_limit = :upper_limit,
+                aggregate = :aggregate
             WHERE id = :id
             """,
             form,
@@ -0,0 +1,26 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+SPDX-FileCopyrightText: 2025 Michael Czigler
+SPDX-License-Identifier: BSD-3-Clause
+
+Metrics endpoints.
+"""
+
+from quart import Blueprint
+
+from .models.directory import directory
+from .models.sink import fanout
+from .models.timing import metrics as registry
+
+metrics = Blueprint("metrics", __name__)
+
+
+@metrics.get("/metrics")
+async def read() -> tuple:
+    """Read metrics callback."""
+
+    headers = {"Content-Type": "text/plain; version=0.0.4"}
+    text = registry.render() + directory.render() + fanout.render()
+    return text, 200, headers
@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+SPDX-FileCopyrightText: 2025 Michael Czigler
+SPDX-License-Identifier: BSD-3-Clause
+
+Multi-reading acquisition aggregates.
+"""
+
+from enum import StrEnum
+from statistics import fmean
+from statistics import stdev
+
+
+class Aggregate(StrEnum):
+    """Multi-reading aggregate enumerated constants."""
+
+    EACH = "each"  # one measurement per reading
+    MEAN = "mean"
+    MIN = "min"
+    MAX = "max"
+    STDEV = "stdev"
+    RANGE = "range"
+
+
+STATISTICS = {
+    Aggregate.MEAN: fmean,
+    Aggregate.MIN: min,
+    Aggregate.MAX: max,
+    Aggregate.STDEV: stdev,
+    Aggregate.RANGE: lambda readings: max(readings) - min(readings),
+}
+
+
+def parse_readings(response: bytes) -> list[float]:
+    """Parse a comma separated list of readings (i.e. READ?)."""
+
+    return list(map(float, response.split(b",")))
+
+
+def summarize(aggregate: str, readings: list[float]) -> float:
+    """Reduce readings to a single statistic."""
+
+    if not readings:
+        raise ValueError("no readings")
+    return STATISTICS[Aggregate(aggregate)](readings)
@@ -0,0 +1,244 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+SPDX-FileCopyrightText: 2025 Michael Czigler
+SPDX-License-Identifier: BSD-3-Clause
+
+Recipe dry-run analyzer.
+"""
+
+from dataclasses import dataclass
+from enum import StrEnum
+from itertools import groupby
+from re import compile as compile_regex
+
+from .aggregate import Aggregate
+from .panel import CHANNEL
+from .pool import resolve
+from .serialize import to_dict
+from .state import redundant
+from .state import remember
+from .sync import Sync
+from .timing import Metrics
+
+SAMPLE = compile_regex(r'^(\w+)_(sum|count)\{(.*)\} (\S+)$')
+LABEL = compile_regex(r'(\w+)="((?:[^"\\]|\\.)*)"')
+UNTIMED = ("delay", "connect", "cached")  # spans not paid on every step
+
+
+class Severity(StrEnum):
+    """Finding severity enumerated constants."""
+
+    ERROR = "error"  # the step fails when run
+    WARNING = "warning"  # runs, but likely not as intended
+    INFO = "info"  # optimization opportunity
+
+
+@dataclass(slots=True)
+class Finding:
+    """Single analyzer finding."""
+
+    severity: Severity
+    phase: str
+    message: str
+    command: str | None = None
+    instrument: str | None = None
+    saving: float | None = None  # estimated seconds per unit
+
+
+def history(registry: Metrics) -> dict[tuple, float]:
+    """
+    Mean step latency (seconds, excluding the fixed delay, the
+    occasional connect and the cached marker) by (instrument, command)
+    from the step timing histograms.
+    """
+
+    latencies = {}
+    for (name, labels), histogram in list(registry.histograms.items()):
+        labels = dict(labels)
+        if name != "uhtf_step_seconds" or labels["span"] in UNTIMED:
+            continue
+        key = (labels["instrument"], labels["command"])
+        latencies[key] = latencies.get(key, 0.0) + histogram.mean
+    return latencies
+
+
+def parse_history(text: str) -> dict[tuple, float]:
+    """History from a Prometheus text exposition (i.e. /metrics)."""
+
+    sums, counts = {}, {}
+    for line in text.splitlines():
+        match = SAMPLE.match(line)
+        if match is None or match[1] != "uhtf_step_seconds":
+            continue
+        labels = dict(LABEL.findall(match[3]))
+        if labels.get("span", "delay") in UNTIMED:
+            continue
+        key = (labels["instrument"], labels["command"], labels["span"])
+        target = sums if match[2] == "sum" else counts
+        target[key] = float(match[4])
+    latencies = {}
+    for (instrument, command, span), total in sums.items():
+        count = counts.get((instrument, command, span))
+        if count:
+            key = (instrument, command)
+            latencies[key] = latencies.get(key, 0.0) + total / count
+    return latencies
+
+
+def validate(recipe, slotted: bool = False) -> list[tuple[Severity, str]]:
+    """
+    Problems that make a single step error or misbehave. Channel
+    placeholders are only filled in for parts with panel slots.
+    """
+
+    errors = []
+    scpi = recipe["command_scpi"] or ""
+    query = "?" in scpi
+    if not scpi.strip():
+        errors.append((Severity.ERROR, "empty command"))
+    if query and recipe["measurement_name"] is None:
+        errors.append((Severity.ERROR, "query without a measurement"))
+    if recipe["measurement_name"] is not None:
+        if not query:
+            errors.append((
+                Severity.WARNING,
+                "measurement on a command without a response",
+            ))
+        for key in ("lower_limit", "upper_limit", "precision"):
+            if recipe[f"measurement_{key}"] is None:
+                errors.append((Severity.ERROR, f"measurement {key} unset"))
+        aggregate = recipe["measurement_aggregate"]
+        if aggregate and aggregate not in tuple(Aggregate):
+            errors.append((Severity.ERROR, f"unknown aggregate {aggregate}"))
+    try:
+        resolve(recipe["instrument_transport"])
+    except ValueError as error:
+        errors.append((Severity.ERROR, str(error)))
+    if recipe["command_sync"] == Sync.STABLE and not query:
+        errors.append((Severity.WARNING, "stable sync on a setting command"))
+    if CHANNEL in scpi and not slotted:
+        errors.append((Severity.ERROR, f"{CHANNEL} without a panel slot"))
+    return errors
+
+
+def latency(recipe, latencies: dict) -> float | None:
+    return latencies.get((recipe["instrument_name"], recipe["command_name"]))
+
+
+def delay(recipe) -> float:
+    if recipe["command_sync"]:
+        return 0.0  # synchronized commands skip the fixed delay
+    return (recipe["command_delay"] or 0) / 1000
+
+
+def batches(phase: str, recipes: list, latencies: dict) -> list[Finding]:
+    """Runs of consecutive writes to one instrument."""
+
+    findings = []
+    runs = groupby(recipes, key=lambda r: r["instrument_name"])
+    for instrument, run in runs:
+        writes = []
+        for recipe in [*run, None]:
+            if recipe is not None and "?" not in recipe["command_scpi"] \
+                    and not recipe["command_sync"]:
+                writes.append(recipe)
+                continue
+            if len(writes) > 1:
+                saving = sum(latency(r, latencies) or 0.0 for r in writes[1:])
+                findings.append(Finding(
+                    Severity.INFO,
+                    phase,
+                    f"{len(writes)} consecutive writes could be sent as "
+                    "one ';' separated message",
+                    writes[0]["command_name"],
+                    instrument,
+                    saving,
+                ))
+            writes = []
+    return findings
+
+
+def redundancies(recipes: list) -> list[Finding]:
+    """Setting commands repeating the state already written."""
+
+    findings = []
+    settings = {}  # settings written by instrument
+    for recipe in recipes:
+        scpi = recipe["command_scpi"].strip()
+        if not scpi:
+            continue
+        written = settings.setdefault(recipe["instrument_name"], {})
+        if redundant(written, scpi):
+            findings.append(Finding(
+                Severity.INFO,
+                recipe["phase_name"],
+                f"{scpi!r} repeats a setting already in effect",
+                recipe["command_name"],
+                recipe["instrument_name"],
+                delay(recipe),
+            ))
+        remember(written, scpi)
+    return findings
+
+
+def analyze(recipes: list, latencies: dict, slots: list = ()) -> dict:
+    """
+    Validate a part's recipes without touching an instrument and
+    estimate its cycle time from command delays and the historical
+    latency of each (instrument, command), listing optimizations.
+    """
+
+    findings = []
+    phases = []
+    total = parallel = 0.0
+    unmeasured = 0
+    slotted = any(slot["channel"] for slot in slots)
+    for phase_name, group in groupby(recipes, key=lambda r: r["phase_name"]):
+        group = list(group)
+        busy = {}  # seconds by instrument
+        for recipe in group:
+            for severity, message in validate(recipe, slotted):
+                findings.append(Finding(
+                    severity,
+                    phase_name,
+                    message,
+                    recipe["command_name"],
+                    recipe["instrument_name"],
+                ))
+            seconds = latency(recipe, latencies)
+            if seconds is None:
+                unmeasured += 1
+                seconds = 0.0
+            seconds += delay(recipe)
+            instrument = recipe["instrument_name"]
+            busy[instrument] = busy.get(instrument, 0.0) + seconds
+        estimate = sum(busy.values())
+        retries = group[0]["phase_retries"] or 0
+        phases.append({
+            "name": phase_name,
+            "steps": len(group),
+            "estimate": estimate,
+            "worst_case": estimate * (retries + 1),
+        })
+        total += estimate
+        parallel += max(busy.values())
+        if len(busy) > 1 and estimate > max(busy.values()):
+            findings.append(Finding(
+                Severity.INFO,
+                phase_name,
+                f"steps on {len(busy)} instruments could run concurrently",
+                saving=estimate - max(busy.values()),
+            ))
+        findings.extend(batches(phase_name, group, latencies))
+    findings.extend(redundancies(recipes))
+    return {
+        "valid": not any(f.severity == Severity.ERROR for f in findings),
+        "steps": len(recipes),
+        "unmeasured": unmeasured,
+        "estimate": total,
+        "parallel_estimate": parallel,
+        "phases": phases,
+        "findings": to_dict(findings),
+    }
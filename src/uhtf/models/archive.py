@@ -8,21 +8,36 @@ SPDX-License-Identifier: BSD-3-Clause
 Archive client handler.
 """
 
-from dataclasses import asdict
-from json import dumps
-from urllib.parse import urlencode
+from asyncio import IncompleteReadError
+from asyncio import open_connection
+from asyncio import Semaphore
+from asyncio import wait_for
+from gzip import compress
+from ssl import create_default_context
+from urllib.parse import urlsplit
 from urllib.request import Request
 from urllib.request import urlopen
 
 from .base import Procedure
+from .serialize import encode
+
+
+class ArchiveError(Exception):
+    """Archive server rejected an upload."""
+
+    def __init__(self, status: int, body: bytes) -> None:
+        super().__init__(f"archive responded {status}: {body[:200]!r}")
+        self.status = status
+        self.body = body
 
 
 class ArchiveClient:
     """Archive client."""
 
-    def __init__(self, url: str, token: str) -> None:
+    def __init__(self, url: str, token: str, timeout: float = 30.0) -> None:
         self.url = url
         self.token = token
+        self.timeout = timeout
 
     def headers(self) -> dict:
         return {
@@ -33,13 +48,136 @@ class ArchiveClient:
     def post(self, procedure: Procedure) -> None:
         if not isinstance(procedure, Procedure):
             raise TypeError(procedure)
-        form = asdict(procedure)
         request = Request(
             url=self.url,
             headers=self.headers(),
-            data=dumps(form).encode(),
+            data=encode(procedure),
             method="POST",
         )
-        with urlopen(request) as response:
+        with urlopen(request, timeout=self.timeout) as response:
             message = response.read()
         return message.decode()
+
+
+class AsyncArchiveClient(ArchiveClient):
+    """
+    Asyncio HTTP/1.1 archive client reusing keep-alive connections,
+    optionally gzip compressing request bodies, with connect and read
+    timeouts and at most limit uploads in flight at once.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        token: str,
+        limit: int = 8,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 30.0,
+        gzip: bool = False,
+    ) -> None:
+        super().__init__(url, token, read_timeout)
+        parts = urlsplit(url)
+        self.hostname = parts.hostname
+        self.secure = parts.scheme == "https"
+        self.port = parts.port or (443 if self.secure else 80)
+        self.target = parts.path or "/"
+        if parts.query:
+            self.target += f"?{parts.query}"
+        self.semaphore = Semaphore(limit)
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.gzip = gzip
+        self.idle = []  # keep-alive (reader, writer) pairs
+        self.connections = 0  # opened, for diagnostics
+
+    async def connect(self) -> tuple:
+        context = create_default_context() if self.secure else None
+        connection = await wait_for(
+            open_connection(self.hostname, self.port, ssl=context),
+            self.connect_timeout,
+        )
+        self.connections += 1
+        return connection
+
+    def request(self, body: bytes) -> bytes:
+        headers = {
+            "Host": self.hostname,
+            **self.headers(),
+            "Connection": "keep-alive",
+        }
+        if self.gzip:
+            body = compress(body)
+            headers["Content-Encoding"] = "gzip"
+        headers["Content-Length"] = str(len(body))
+        lines = [f"POST {self.target} HTTP/1.1"]
+        lines.extend(f"{key}: {value}" for key, value in headers.items())
+        return ("\r\n".join(lines) + "\r\n\r\n").encode() + body
+
+    async def response(self, reader) -> tuple[int, dict, bytes]:
+        """Read a status, headers and (sized or chunked) body."""
+
+        line = await reader.readline()
+        if not line:
+            raise ConnectionResetError("connection closed")
+        status = int(line.split()[1])
+        headers = {}
+        while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+            key, _, value = line.decode("latin-1").partition(":")
+            headers[key.strip().lower()] = value.strip()
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while size := int((await reader.readline()).split(b";")[0], 16):
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+            await reader.readline()  # trailer
+            body = b"".join(chunks)
+        elif "content-length" in headers:
+            body = await reader.readexactly(int(headers["content-length"]))
+        else:
+            body = await reader.read()  # delimited by close
+            headers["connection"] = "close"
+        return status, headers, body
+
+    async def exchange(self, data: bytes, reused: bool) -> bytes:
+        """One request and response on an idle or new connection."""
+
+        reader, writer = self.idle.pop() if reused else await self.connect()
+        try:
+            writer.write(data)
+            await writer.drain()
+            status, headers, body = await wait_for(
+                self.response(reader),
+                self.read_timeout,
+            )
+        except BaseException:
+            writer.close()
+            raise
+        if headers.get("connection", "").lower() == "close":
+            writer.close()
+        else:
+            self.idle.append((reader, writer))
+        if status >= 400:
+            raise ArchiveError(status, body)
+        return body
+
+    async def post(self, procedure: Procedure) -> str:
+        if not isinstance(procedure, Procedure):
+            raise TypeError(procedure)
+        return await self.send(encode(procedure))
+
+    async def send(self, body: bytes) -> str:
+        """Upload an already serialized procedure (i.e. spooled)."""
+
+        data = self.request(body)
+        async with self.semaphore:
+            while self.idle:
+                try:
+                    return (await self.exchange(data, True)).decode()
+                except (ConnectionError, IncompleteReadError):
+                    pass  # closed by the server while idle
+            return (await self.exchange(data, False)).decode()
+
+    async def close(self) -> None:
+        while self.idle:
+            _, writer = self.idle.pop()
+            writer.close()
@@ -23,6 +23,13 @@ class PhaseResult(StrEnum):
     STOP = "STOP"
 
 
+class RunMode(StrEnum):
+    """Run mode enumerated constants."""
+
+    DIAGNOSTIC = "DIAGNOSTIC"
+    FAIL_FAST = "FAIL_FAST"
+
+
 class MeasurementOutcome(StrEnum):
     """Measurement enumerated constants."""
  
@@ -40,7 +47,7 @@ class PhaseOutcome(StrEnum):
     ERROR = "ERROR"
 
 
-@dataclass
+@dataclass(slots=True)
 class Measurement:
     """Measurement dataclass."""
 
@@ -54,7 +61,16 @@ class Measurement:
     docstring: str | None = None 
 
 
-@dataclass
+@dataclass(slots=True)
+class Step:
+    """Step dataclass."""
+
+    command: str
+    instrument: str
+    spans: dict[str, int] = field(default_factory=dict)  # nanoseconds
+
+
+@dataclass(slots=True)
 class Phase:
     """Phase dataclass."""
 
@@ -63,10 +79,11 @@ class Phase:
     start_time_millis: int
     end_time_millis: int
     measurements: list[Measurement] | None = None
+    steps: list[Step] | None = None
     docstring: str | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class UnitUnderTest:
     """Unit under test dataclass."""
 
@@ -79,7 +96,7 @@ class UnitUnderTest:
     manufacture_date: str  | None = None  # temp
 
 
-@dataclass
+@dataclass(slots=True)
 class Procedure:
     """Procedure dataclass."""
 
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+SPDX-FileCopyrightText: 2025 Michael Czigler
+SPDX-License-Identifier: BSD-3-Clause
+
+Instrument circuit breaker.
+"""
+
+from threading import Lock
+from time import time
+
+
+class CircuitOpenError(ConnectionError):
+    """Raised when an instrument circuit is open."""
+
+
+class Breaker:
+    """Circuit breaker for a single instrument."""
+
+    def __init__(self, threshold: int = 3) -> None:
+        self.threshold = threshold
+        self.failures = 0
+        self.opened_at = None
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def check(self) -> None:
+        """Fail fast while the circuit is open."""
+
+        if self.is_open:
+            message = f"circuit open after {self.failures} failures"
+            raise CircuitOpenError(message)
+
+    def success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+
+    def failure(self) -> None:
+        self.failures += 1
+        if self.threshold > 0 and self.failures >= self.threshold:
+            self.opened_at = self.opened_at or time()
+
+
+class Breakers:
+    """Circuit breaker registry keyed by hostname and port."""
+
+    def __init__(self) -> None:
+        self.breakers = {}
+        self.lock = Lock()
+
+    def get(self, hostname: str, port: int, threshold: int = 3) -> Breaker:
+        with self.lock:
+            breaker = self.breakers.get((hostname, port))
+            if breaker is None:
+                breaker = self.breakers[(hostname, port)] = Breaker()
+            breaker.threshold = threshold
+            return breaker
+
+    def is_open(self, hostname: str, port: int) -> bool:
+        breaker = self.breakers.get((hostname, port))
+        return breaker is not None and breaker.is_open
+
+    def opened(self) -> list[tuple]:
+        with self.lock:
+            return [
+                (key, breaker)
+                for key, breaker in self.breakers.items()
+                if breaker.is_open
+            ]
+
+
+breakers = Breakers()
@@ -11,18 +11,29 @@ Websocket broker.
 from asyncio import Queue
 from collections.abc import AsyncGenerator
 
+from .timing import metrics
+from .timing import timer
+
 
 class Broker:
     """Websocket broker."""
  
-    def __init__(self) -> None:
+    def __init__(self, name: str = "broker") -> None:
+        self.name = name
         self.connections = set()
 
     async def publish(self, message: str) -> None:
         """Publish message to websocket."""
  
-        for connection in self.connections:
-            await connection.put(message)
+        spans = {}
+        with timer(spans, "publish"):
+            for connection in self.connections:
+                await connection.put(message)
+        metrics.observe(
+            "uhtf_publish_seconds",
+            {"broker": self.name},
+            spans["publish"] / 1e9,
+        )
 
     async def subscribe(self) -> AsyncGenerator[str, None]:
         """Subscribe to websocket."""
@@ -0,0 +1,222 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+SPDX-FileCopyrightText: 2025 Michael Czigler
+SPDX-License-Identifier: BSD-3-Clause
+
+Compact result models for long-lived procedures.
+"""
+
+from array import array
+from dataclasses import dataclass
+from sys import intern
+from weakref import WeakValueDictionary
+
+from .base import Measurement
+from .base import MeasurementOutcome
+from .base import Phase
+from .base import Procedure
+from .base import Step
+from .serialize import to_dict
+
+OUTCOMES = tuple(MeasurementOutcome)
+
+
+@dataclass(frozen=True, slots=True, weakref_slot=True)
+class Definition:
+    """Shared measurement definition."""
+
+    name: str
+    units: str | None = None
+    lower_limit: float | None = None
+    upper_limit: float | None = None
+    validators: tuple[str, ...] | None = None
+    docstring: str | None = None
+
+
+_definitions = WeakValueDictionary()
+
+
+def define(measurement: Measurement) -> Definition:
+    """Interned definition shared by every result of a measurement."""
+
+    key = (
+        measurement.name,
+        measurement.units,
+        measurement.lower_limit,
+        measurement.upper_limit,
+        tuple(measurement.validators or ()) or None,
+        measurement.docstring,
+    )
+    definition = _definitions.get(key)
+    if definition is None:
+        definition = Definition(
+            intern(key[0]),
+            intern(key[1]) if isinstance(key[1], str) else key[1],
+            *key[2:],
+        )
+        _definitions[key] = definition
+    return definition
+
+
+class CompactPhase:
+    """Phase storing measured values in a typed array."""
+
+    __slots__ = (
+        "name",
+        "outcome",
+        "start_time_millis",
+        "end_time_millis",
+        "definitions",
+        "values",
+        "outcomes",
+        "extras",
+        "steps",
+        "docstring",
+    )
+
+    def __init__(self, phase: Phase) -> None:
+        measurements = phase.measurements or []
+        self.name = intern(phase.name)
+        self.outcome = phase.outcome
+        self.start_time_millis = phase.start_time_millis
+        self.end_time_millis = phase.end_time_millis
+        self.definitions = tuple(map(define, measurements))
+        if phase.measurements is None:
+            self.definitions = None  # as opposed to none measured
+        self.values = array("d")
+        self.outcomes = bytes(
+            OUTCOMES.index(m.outcome) for m in measurements
+        )
+        self.extras = None  # non-float values (and None) by index
+        for index, measurement in enumerate(measurements):
+            value = measurement.measured_value
+            if type(value) is float:  # NaN included, kept as measured
+                self.values.append(value)
+                continue
+            self.values.append(0.0)
+            self.extras = self.extras or {}
+            self.extras[index] = value
+        self.steps = None  # (command, instrument, spans) tuples
+        if phase.steps is not None:
+            self.steps = tuple(
+                (
+                    intern(step.command),
+                    intern(step.instrument),
+                    tuple(step.spans.items()),
+                )
+                for step in phase.steps
+            )
+        self.docstring = phase.docstring
+
+    def measured_value(self, index: int) -> float | str | None:
+        if self.extras and index in self.extras:
+            return self.extras[index]
+        return self.values[index]
+
+    def measurements(self) -> list[Measurement] | None:
+        if self.definitions is None:
+            return None
+        return [
+            Measurement(
+                name=definition.name,
+                outcome=OUTCOMES[self.outcomes[index]],
+                measured_value=self.measured_value(index),
+                units=definition.units,
+                lower_limit=definition.lower_limit,
+                upper_limit=definition.upper_limit,
+                validators=list(definition.validators)
+                if definition.validators is not None else None,
+                docstring=definition.docstring,
+            )
+            for index, definition in enumerate(self.definitions)
+        ]
+
+    def expand_steps(self) -> list[Step] | None:
+        if self.steps is None:
+            return None
+        return [
+            Step(command, instrument, dict(spans))
+            for command, instrument, spans in self.steps
+        ]
+
+    def expand(self) -> Phase:
+        return Phase(
+            name=self.name,
+            outcome=self.outcome,
+            start_time_millis=self.start_time_millis,
+            end_time_millis=self.end_time_millis,
+            measurements=self.measurements(),
+            steps=self.expand_steps(),
+            docstring=self.docstring,
+        )
+
+    def to_dict(self) -> dict:
+        measurements = None if self.definitions is None else []
+        for index, definition in enumerate(self.definitions or ()):
+            measurements.append({
+                "name": definition.name,
+                "outcome": OUTCOMES[self.outcomes[index]],
+                "measured_value": self.measured_value(index),
+                "units": definition.units,
+                "lower_limit": definition.lower_limit,
+                "upper_limit": definition.upper_limit,
+                "validators": list(definition.validators)
+                if definition.validators is not None else None,
+                "docstring": definition.docstring,
+            })
+        return {
+            "name": self.name,
+            "outcome": self.outcome,
+            "start_time_millis": self.start_time_millis,
+            "end_time_millis": self.end_time_millis,
+            "measurements": measurements,
+            "steps": to_dict(self.expand_steps()),
+            "docstring": self.docstring,
+        }
+
+
+class CompactProcedure:
+    """Procedure built from compact phases."""
+
+    __slots__ = (
+        "procedure_id",
+        "procedure_name",
+        "unit_under_test",
+        "phases",
+        "run_passed",
+    )
+
+    def __init__(self, procedure: Procedure) -> None:
+        self.procedure_id = intern(procedure.procedure_id)
+        self.procedure_name = intern(procedure.procedure_name)
+        self.unit_under_test = procedure.unit_under_test
+        self.phases = tuple(map(CompactPhase, procedure.phases))
+        self.run_passed = procedure.run_passed
+
+    def expand(self) -> Procedure:
+        return Procedure(
+            procedure_id=self.procedure_id,
+            procedure_name=self.procedure_name,
+            unit_under_test=self.unit_under_test,
+            phases=[phase.expand() for phase in self.phases],
+            run_passed=self.run_passed,
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "procedure_id": self.procedure_id,
+            "procedure_name": self.procedure_name,
+            "unit_under_test": to_dict(self.unit_under_test),
+            "phases": [phase.to_dict() for phase in self.phases],
+            "run_passed": self.run_passed,
+        }
+
+
+def compact(procedure: Procedure) -> CompactProcedure:
+    """Compact a completed procedure for long-lived storage."""
+
+    if not isinstance(procedure, Procedure):
+        raise TypeError(procedure)
+    return CompactProcedure(procedure)
@@ -0,0 +1,354 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+SPDX-FileCopyrightText: 2025 Michael Czigler
+SPDX-License-Identifier: BSD-3-Clause
+
+Continuous monitoring (datalog) models.
+"""
+
+from array import array
+from asyncio import ensure_future
+from asyncio import gather
+from asyncio import sleep
+from asyncio import to_thread
+from collections.abc import Generator
+from itertools import groupby
+from json import dumps
+from json import loads
+from math import ceil
+from struct import Struct
+from time import monotonic
+from time import time
+
+from .aggregate import Aggregate
+from .aggregate import parse_readings
+from .aggregate import summarize
+from .base import MeasurementOutcome
+from .recipe import attempt
+from .recipe import in_range
+
+MAGIC = b"UHTFLOG1"
+HEADER = Struct("<I")  # JSON header length
+RECORD = Struct("<Hdd")  # channel index, epoch seconds, value
+ADDRESS = ("instrument_transport", "instrument_hostname", "instrument_port")
+
+
+class Ring:
+    """Fixed-size ring buffer of (time, value) samples."""
+
+    def __init__(self, size: int) -> None:
+        self.times = array("d", bytes(8 * size))
+        self.values = array("d", bytes(8 * size))
+        self.size = size
+        self.index = 0  # next slot written
+        self.count = 0
+
+    def append(self, when: float, value: float) -> None:
+        self.times[self.index] = when
+        self.values[self.index] = value
+        self.index = (self.index + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+
+    def items(self, since: float | None = None) -> list[tuple]:
+        """Samples oldest first, optionally only those after a time."""
+
+        start = (self.index - self.count) % self.size
+        order = [(start + offset) % self.size for offset in range(self.count)]
+        items = [(self.times[i], self.values[i]) for i in order]
+        if since is not None:
+            items = [item for item in items if item[0] >= since]
+        return items
+
+    def downsample(self, points: int) -> list[tuple]:
+        """
+        At most points samples for plotting, keeping the minimum and
+        maximum of every bucket so spikes survive the reduction.
+        """
+
+        items = self.items()
+        if len(items) <= points:
+            return items
+        width = ceil(len(items) / max(points // 2, 1))
+        reduced = []
+        for start in range(0, len(items), width):
+            bucket = items[start:start + width]
+            low = min(bucket, key=lambda item: item[1])
+            high = max(bucket, key=lambda item: item[1])
+            reduced.extend(sorted({low, high}))
+        return reduced
+
+
+class Channel:
+    """Single polled measurement with its samples and limit checks."""
+
+    def __init__(self, recipe, size: int) -> None:
+        self.recipe = recipe
+        self.name = recipe["measurement_name"]
+        self.ring = Ring(size)
+        self.samples = 0
+        self.excursions = 0  # samples outside the limits
+        self.errors = 0
+
+    def add(self, when: float, value: float) -> None:
+        self.ring.append(when, value)
+        self.samples += 1
+        if self.outcome(value) == MeasurementOutcome.FAIL:
+            self.excursions += 1
+
+    def outcome(self, value: float) -> str:
+        limits = ("lower_limit", "upper_limit", "precision")
+        if any(self.recipe[f"measurement_{key}"] is None for key in limits):
+            return MeasurementOutcome.UNSET
+        return in_range(
+            value,
+            self.recipe["measurement_lower_limit"],
+            self.recipe["measurement_upper_limit"],
+            self.recipe["measurement_precision"],
+        )
+
+    def check(self, window: float, now: float) -> tuple:
+        """Mean of the samples within the window and its outcome."""
+
+        values = [value for _, value in self.ring.items(now - window)]
+        if not values:
+            return None, None
+        mean = sum(values) / len(values)
+        return mean, self.outcome(mean)
+
+    def status(self, window: float, now: float) -> dict:
+        mean, outcome = self.check(window, now)
+        last = None
+        if self.ring.count:
+            last = self.ring.values[(self.ring.index - 1) % self.ring.size]
+        return {
+            "name": self.name,
+            "units": self.recipe["measurement_units"],
+            "lower_limit": self.recipe["measurement_lower_limit"],
+            "upper_limit": self.recipe["measurement_upper_limit"],
+            "last": last,
+            "mean": mean,
+            "outcome": outcome,
+            "samples": self.samples,
+            "excursions": self.excursions,
+            "errors": self.errors,
+        }
+
+
+def value(recipe, response: bytes) -> float:
+    """Single value of a response, reducing many readings to one."""
+
+    aggregate = recipe["measurement_aggregate"]
+    if not aggregate:
+        return float(response.decode().strip())
+    if aggregate == Aggregate.EACH:
+        aggregate = Aggregate.MEAN
+    return summarize(aggregate, parse_readings(response))
+
+
+def sample(channels: list) -> list[tuple]:
+    """
+    Query the channels of one instrument in turn (blocking). Any
+    failure (i.e. a timeout, an open circuit, a synchronization error
+    or an unparsable response) counts as a channel error, so one bad
+    reading never stops the polling.
+    """
+
+    results = []
+    for channel in channels:
+        try:
+            response = attempt(channel.recipe, {})
+            results.append((channel, time(), value(channel.recipe, response)))
+        except Exception:
+            channel.errors += 1
+    return results
+
+
+class Log:
+    """
+    Compact append-only log: a JSON header describing the channels
+    followed by fixed 18 byte (channel, time, value) records.
+    """
+
+    def __init__(self, path: str, channels: list) -> None:
+        self.path = path
+        self.file = open(path, "wb")
+        header = dumps({
+            "started": time(),
+            "channels": [
+                {
+                    "name": channel.name,
+                    "units": channel.recipe["measurement_units"],
+                }
+                for channel in channels
+            ],
+        }).encode()
+        self.file.write(MAGIC + HEADER.pack(len(header)) + header)
+        self.index = {channel: index for index, channel in enumerate(channels)}
+
+    def write(self, results: list) -> None:
+        self.file.write(b"".join(
+            RECORD.pack(self.index[channel], when, value)
+            for channel, when, value in results
+        ))
+
+    def flush(self) -> None:
+        self.file.flush()
+
+    def close(self) -> None:
+        self.file.close()
+
+
+def read_log(path: str) -> Generator[tuple, None, None]:
+    """(channel name, time, value) records of a datalog file."""
+
+    with open(path, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a datalog")
+        size, = HEADER.unpack(file.read(HEADER.size))
+        header = loads(file.read(size))
+        names = [channel["name"] for channel in header["channels"]]
+        while chunk := file.read(RECORD.size * 4096):
+            for index, when, value in RECORD.iter_unpack(chunk):
+                yield names[index], when, value
+
+
+class Datalog:
+    """
+    Periodic polling of measurement queries over pooled connections.
+    Instruments are polled concurrently on a fixed schedule (missed
+    ticks are skipped, not queued), samples kept in per-channel rings
+    and appended to the log, so memory and CPU stay flat over
+    multi-day runs.
+    """
+
+    def __init__(self) -> None:
+        self.channels = []
+        self.writes = []  # setting commands sent before polling
+        self.log = None
+        self.period = 1.0
+        self.window = 60.0
+        self.started = None
+        self.ticks = 0
+        self.overruns = 0
+        self.error = None  # why polling could not start or stopped
+        self.task = None
+
+    @property
+    def running(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+    def start(self, publish=None, interval: float = 1.0) -> None:
+        self.task = ensure_future(self.poll(publish, interval))
+
+    def stop(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    def prepare(
+        self,
+        recipes: list,
+        period: float,
+        window: float,
+        size: int,
+        path: str | None = None,
+    ) -> None:
+        """
+        Set up a channel for every measured query of the recipes; their
+        setting commands are sent once before polling.
+        """
+
+        if not (period > 0 and window > 0):
+            raise ValueError("period and window must be positive")
+        self.channels = [
+            Channel(recipe, size) for recipe in recipes
+            if recipe["measurement_name"] is not None
+            and "?" in recipe["command_scpi"]
+        ]
+        self.writes = [
+            recipe for recipe in recipes if "?" not in recipe["command_scpi"]
+        ]
+        self.period = period
+        self.window = window
+        self.ticks = self.overruns = 0
+        self.error = None
+        self.log = Log(path, self.channels) if path else None
+        self.started = time()
+
+    async def poll(self, publish=None, interval: float = 1.0) -> None:
+        """
+        Poll until cancelled, awaiting publish (after flushing the log)
+        at most once per interval.
+        """
+
+        key = lambda channel: tuple(channel.recipe[k] for k in ADDRESS)
+        groups = [
+            list(channels) for _, channels
+            in groupby(sorted(self.channels, key=key), key=key)
+        ]
+        try:
+            for recipe in self.writes:
+                try:
+                    await to_thread(attempt, recipe, {})
+                except Exception as error:
+                    self.error = f"{recipe['command_name']}: {error}"
+                    return
+            start = monotonic()
+            published = 0.0
+            slot = 0  # schedule slots elapsed, polled or skipped
+            while True:
+                results = await gather(*(
+                    to_thread(sample, channels) for channels in groups
+                ))
+                results = [result for group in results for result in group]
+                for channel, when, value in results:
+                    channel.add(when, value)
+                if self.log is not None:
+                    self.log.write(results)
+                self.ticks += 1
+                slot += 1
+                now = monotonic()
+                if publish is not None and now - published >= interval:
+                    published = now
+                    if self.log is not None:
+                        self.log.flush()
+                    await publish()
+                    now = monotonic()
+                late = now - (start + slot * self.period)
+                if late > 0:  # overran, skip the missed slots
+                    missed = ceil(late / self.period)
+                    self.overruns += missed
+                    slot += missed
+                await sleep(max(start + slot * self.period - now, 0))
+        except Exception as error:  # i.e. the log disk filling up
+            self.error = str(error)
+        finally:
+            if self.log is not None:
+                self.log.close()
+
+    def status(self, points: int = 0) -> dict:
+        """Channel statistics, with downsampled plot points if asked."""
+
+        now = time()
+        channels = []
+        for channel in self.channels:
+            status = channel.status(self.window, now)
+            if points:
+                status["points"] = channel.ring.downsample(points)
+            channels.append(status)
+        return {
+            "running": self.running,
+            "started": self.started,
+            "period": self.period,
+            "window": self.window,
+            "ticks": self.ticks,
+            "overruns": self.overruns,
+            "error": self.error,
+            "path": self.log.path if self.log else None,
+            "channels": channels,
+        }
+
+
+datalog = Datalog()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+SPDX-FileCopyrightText: 2025 Michael Czigler
+SPDX-License-Identifier: BSD-3-Clause
+
+In-memory part directory.
+"""
+
+from threading import Lock
+
+from .gs1 import normalize
+
+
+class PartDirectory:
+    """
+    Parts keyed by GTIN, part number and id, so a scan resolves its
+    part without a database round trip. The directory is per process;
+    writes through the part blueprint and API refresh it in place and
+    any other write drops the cached recipe rows and settings.
+    """
+
+    def __init__(self) -> None:
+        self.by_gtin = {}
+        self.by_number = {}
+        self.by_id = {}
+        self.recipes = {}  # recipe and slot rows by part id
+        self.settings = None  # settings read on a scan, by key
+        self.loaded = False
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.lock = Lock()
+
+    def load(self, rows: list) -> None:
+        """Replace the directory contents with every part row."""
+
+        parts = [dict(row) for row in rows]
+        with self.lock:
+            self.by_gtin = {
+                normalize(part["global_trade_item_number"]): part
+                for part in parts
+            }
+            self.by_number = {part["number"]: part for part in parts}
+            self.by_id = {part["id"]: part for part in parts}
+            self.loaded = True
+            self.reloads += 1
+
+    def put(self, row) -> None:
+        """Insert or replace a single part."""
+
+        part = dict(row)
+        with self.lock:
+            self.unlink(part["id"])
+            gtin = normalize(part["global_trade_item_number"])
+            self.by_gtin[gtin] = part
+            self.by_number[part["number"]] = part
+            self.by_id[part["id"]] = part
+
+    def discard(self, id: int) -> None:
+        """Remove a part, if present."""
+
+        with self.lock:
+            self.unlink(id)
+
+    def unlink(self, id: int) -> None:
+        part = self.by_id.pop(id, None)
+        if part is not None:
+            gtin = normalize(part["global_trade_item_number"])
+            self.by_gtin.pop(gtin, None)
+            self.by_number.pop(part["number"], None)
+
+    def get_recipes(self, id: int):
+        """Cached recipes of a part, or None when not cached."""
+
+        return self.recipes.get(id)
+
+    def put_recipes(self, id: int, recipes):
+        with self.lock:
+            self.recipes[id] = recipes
+        return recipes
+
+    def get_settings(self) -> dict | None:
+        """Cached settings, or None when not cached."""
+
+        return self.settings
+
+    def put_settings(self, settings: dict) -> dict:
+        with self.lock:
+            self.settings = settings
+        return settings
+
+    def invalidate(self) -> None:
+        """
+        Drop cached recipes and settings (phases, steps, instruments
+        or settings changed).
+        """
+
+        with self.lock:
+            self.recipes.clear()
+            self.settings = None
+
+    def count(self, part: dict | None) -> dict | None:
+        if part is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return part
+
+    def get(self, gtin: str) -> dict | None:
+        """Look up a part by GTIN (any of GTIN-8/12/13/14)."""
+
+        return self.count(self.by_gtin.get(normalize(gtin)))
+
+    def get_number(self, number: str) -> dict | None:
+        return self.count(self.by_number.get(number))
+
+    def get_id(self, id: int) -> dict | None:
+        return self.count(self.by_id.get(id))
+
+    def stats(self) -> dict:
+        return {
+            "parts": len(self.by_id),
+            "recipes": len(self.recipes),
+            "hits": self.hits,
+            "misses": self.misses,
+            "reloads": self.reloads,
+        }
+
+    def render(self) -> str:
+        """Render lookup counters in the Prometheus text format."""
+
+        return "\n".join([
+            "# TYPE part_directory_lookups counter",
+            f'part_directory_lookups{{result="hit"}} {self.hits}',
+            f'part_directory_lookups{{result="miss"}} {self.misses}',
+            "# TYPE part_directory_parts gauge",
+            f"part_directory_parts {len(self.by_id)}",
+        ]) + "\n"
+
+
+directory = PartDirectory()
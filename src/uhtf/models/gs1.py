@@ -0,0 +1,200 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+SPDX-FileCopyrightText: 2025 Michael Czigler
+SPDX-License-Identifier: BSD-3-Clause
+
+GS1 element string parser.
+"""
+
+from dataclasses import dataclass
+from re import compile as compile_regex
+from re import Pattern
+
+GS = "\x1d"  # FNC1 separator after variable-length fields
+NUMERIC = "0-9"
+ALPHANUMERIC = "!\"%-/0-9:-?A-Z_a-z"  # GS1 AI encodable character set 82
+SYMBOLOGY = compile_regex(r"^\][A-Za-z][0-9]")  # i.e. ]d2, ]C1, ]Q3
+BRACKETED = compile_regex(r"\((\d{2,4})\)([^(]*)")  # human readable
+
+
+class GS1Error(ValueError):
+    """Raised when a label is not a valid GS1 element string."""
+
+
+@dataclass(frozen=True, slots=True)
+class ApplicationIdentifier:
+    """Application identifier (AI) definition."""
+
+    code: str
+    name: str
+    length: int | None  # fixed length, or None when FNC1 terminated
+    pattern: Pattern
+
+
+def ai(
+    code: str,
+    name: str,
+    charset: str,
+    low: int,
+    high: int | None = None,
+) -> ApplicationIdentifier:
+    high = low if high is None else high
+    return ApplicationIdentifier(
+        code,
+        name,
+        low if low == high else None,
+        compile_regex(f"[{charset}]{{{low},{high}}}"),
+    )
+
+
+AIS = {
+    definition.code: definition
+    for definition in (
+        ai("00", "serial_shipping_container_code", NUMERIC, 18),
+        ai("01", "global_trade_item_number", NUMERIC, 14),
+        ai("02", "content_global_trade_item_number", NUMERIC, 14),
+        ai("10", "batch_number", ALPHANUMERIC, 1, 20),
+        ai("11", "manufacture_date", NUMERIC, 6),
+        ai("12", "due_date", NUMERIC, 6),
+        ai("13", "packaging_date", NUMERIC, 6),
+        ai("15", "best_before_date", NUMERIC, 6),
+        ai("16", "sell_by_date", NUMERIC, 6),
+        ai("17", "expiration_date", NUMERIC, 6),
+        ai("20", "variant", NUMERIC, 2),
+        ai("21", "serial_number", ALPHANUMERIC, 1, 20),
+        ai("22", "consumer_product_variant", ALPHANUMERIC, 1, 20),
+        ai("30", "count", NUMERIC, 1, 8),
+        ai("37", "content_count", NUMERIC, 1, 8),
+        ai("240", "additional_item_id", ALPHANUMERIC, 1, 30),
+        ai("241", "customer_part_number", ALPHANUMERIC, 1, 30),
+        ai("242", "made_to_order_variation", NUMERIC, 1, 6),
+        ai("250", "secondary_serial_number", ALPHANUMERIC, 1, 30),
+        ai("251", "source_entity_reference", ALPHANUMERIC, 1, 30),
+        ai("400", "order_number", ALPHANUMERIC, 1, 30),
+        ai("422", "origin_country", NUMERIC, 3),
+        ai("7003", "expiration_date_time", NUMERIC, 10),
+    )
+}
+
+
+def check_digit(digits: str) -> int:
+    """GS1 mod 10 check digit of the digits preceding it."""
+
+    total = sum(
+        int(digit) * (3 if index % 2 == 0 else 1)
+        for index, digit in enumerate(reversed(digits))
+    )
+    return (10 - total % 10) % 10
+
+
+def valid_gtin(gtin: str) -> bool:
+    """Whether a GTIN-8/12/13/14 has a correct check digit."""
+
+    if not gtin.isdigit() or len(gtin) not in (8, 12, 13, 14):
+        return False
+    return check_digit(gtin[:-1]) == int(gtin[-1])
+
+
+def normalize(gtin: str) -> str:
+    """GTIN padded to 14 digits (GTIN-14 form used by AI 01)."""
+
+    return gtin.strip().zfill(14)
+
+
+def identify(data: str, position: int) -> ApplicationIdentifier:
+    for size in (2, 3, 4):  # AIs are prefix free
+        definition = AIS.get(data[position:position + size])
+        if definition is not None:
+            return definition
+    raise GS1Error(f"unknown application identifier at {position}")
+
+
+def elements(data: str):
+    """Yield (AI definition, value) pairs of a raw element string."""
+
+    position = 0
+    while position < len(data):
+        if data[position] == GS:
+            position += 1
+            continue
+        definition = identify(data, position)
+        start = position + len(definition.code)
+        if definition.length is not None:
+            end = start + definition.length
+        else:
+            end = data.find(GS, start)
+            end = len(data) if end < 0 else end
+        yield definition, data[start:end]
+        position = end
+
+
+def bracketed(data: str):
+    """Yield (AI definition, value) pairs of a bracketed string."""
+
+    for match in BRACKETED.finditer(data):
+        definition = AIS.get(match.group(1))
+        if definition is None:
+            raise GS1Error(f"unknown application identifier {match[1]}")
+        yield definition, match.group(2)
+
+
+def parse(label: str) -> dict[str, str]:
+    """
+    Parse a scanned GS1 label (raw with FNC1 separators or bracketed)
+    into values keyed by AI name, validating lengths, character sets
+    and the GTIN check digit.
+    """
+
+    data = SYMBOLOGY.sub("", label.strip())
+    pairs = bracketed(data) if data.startswith("(") else elements(data)
+    values = {}
+    for definition, value in pairs:
+        if not definition.pattern.fullmatch(value):
+            raise GS1Error(f"invalid value for AI ({definition.code})")
+        values[definition.name] = value
+    if not values:
+        raise GS1Error("empty label")
+    gtin = values.get("global_trade_item_number")
+    if gtin is not None and not valid_gtin(gtin):
+        raise GS1Error("invalid GTIN check digit")
+    return values
+
+
+def validate(labels: list[str], index) -> list[dict]:
+    """
+    Validate a batch of scanned labels (i.e. a tray) before testing:
+    each must parse, carry a GTIN of a known part and not repeat the
+    serial number of another label in the batch. The index is any
+    mapping-like object resolving a GTIN to a part (i.e. the part
+    directory).
+    """
+
+    results = []
+    seen = set()
+    for label in labels:
+        result = {"label": label, "valid": False, "error": None}
+        results.append(result)
+        try:
+            values = parse(label)
+        except GS1Error as error:
+            result["error"] = str(error)
+            continue
+        result["elements"] = values
+        gtin = values.get("global_trade_item_number")
+        if gtin is None:
+            result["error"] = "missing GTIN"
+            continue
+        part = index.get(gtin)
+        if part is None:
+            result["error"] = "unknown part"
+            continue
+        result["part"] = part
+        key = (gtin, values.get("serial_number"))
+        if key[1] is not None and key in seen:
+            result["error"] = "duplicate serial number"
+            continue
+        seen.add(key)
+        result["valid"] = True
+    return results
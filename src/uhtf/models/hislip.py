@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+SPDX-FileCopyrightText: 2025 Michael Czigler
+SPDX-License-Identifier: BSD-3-Clause
+
+HiSLIP (IVI-6.1) instrumentation transport model.
+"""
+
+from enum import IntEnum
+from struct import pack
+from struct import unpack
+
+from .transport import recv_exactly
+from .transport import Transport
+
+HEADER = ">2sBBIQ"  # prologue, type, control code, parameter, length
+PROLOGUE = b"HS"
+VERSION = 0x0100  # protocol version 1.0
+VENDOR = b"UH"
+INITIAL_MESSAGE_ID = 0xFFFFFF00
+
+
+class Message(IntEnum):
+    """HiSLIP message type enumerated constants."""
+
+    INITIALIZE = 0
+    INITIALIZE_RESPONSE = 1
+    FATAL_ERROR = 2
+    ERROR = 3
+    DATA = 6
+    DATA_END = 7
+    ASYNC_INITIALIZE = 17
+    ASYNC_INITIALIZE_RESPONSE = 18
+    ASYNC_STATUS_QUERY = 21
+    ASYNC_STATUS_RESPONSE = 22
+
+
+def encode(
+    message: int,
+    control: int = 0,
+    parameter: int = 0,
+    payload: bytes = b"",
+) -> bytes:
+    header = pack(HEADER, PROLOGUE, message, control, parameter, len(payload))
+    return header + payload
+
+
+def receive(sock) -> tuple[int, int, int, bytes]:
+    """Receive a single HiSLIP message."""
+
+    prologue, message, control, parameter, length = unpack(
+        HEADER,
+        recv_exactly(sock, 16),
+    )
+    if prologue != PROLOGUE:
+        raise ConnectionError("invalid HiSLIP prologue")
+    payload = recv_exactly(sock, length) if length else b""
+    if message in (Message.FATAL_ERROR, Message.ERROR):
+        raise ConnectionError(f"HiSLIP error {control}: {payload.decode()}")
+    return message, control, parameter, payload
+
+
+class HiSLIP(Transport):
+    """HiSLIP synchronous and asynchronous channel pair."""
+
+    label = "HiSLIP"
+
+    def __init__(self, *args, sub_address: str = "hislip0", **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sub_address = sub_address
+        self.async_sock = None
+        self.session_id = None
+        self.overlapped = False
+        self.message_id = INITIAL_MESSAGE_ID
+        self.delivered = 0  # RMT-delivered control bit
+
+    def connect(self) -> None:
+        self.sock = self.open_socket(self.port)
+        try:
+            self.initialize()
+        except BaseException:
+            self.close()  # neither channel left open on a failed handshake
+            raise
+
+    def initialize(self) -> None:
+        """Initialize the synchronous then the asynchronous channel."""
+
+        self.sock.sendall(encode(
+            Message.INITIALIZE,
+            parameter=VERSION << 16 | int.from_bytes(VENDOR, "big"),
+            payload=self.sub_address.encode(),
+        ))
+        message, control, parameter, _ = receive(self.sock)
+        if message != Message.INITIALIZE_RESPONSE:
+            raise ConnectionError("unexpected HiSLIP initialize response")
+        self.overlapped = bool(control & 1)
+        self.session_id = parameter & 0xFFFF
+        self.async_sock = self.open_socket(self.port)
+        self.async_sock.sendall(encode(
+            Message.ASYNC_INITIALIZE,
+            parameter=self.session_id,
+        ))
+        message, *_ = receive(self.async_sock)
+        if message != Message.ASYNC_INITIALIZE_RESPONSE:
+            raise ConnectionError("unexpected HiSLIP async response")
+
+    def close(self) -> None:
+        for sock in (self.async_sock, self.sock):
+            if sock is not None:
+                sock.close()
+        self.sock = self.async_sock = None
+
+    def send(self, command: bytes) -> None:
+        self.sock.sendall(encode(
+            Message.DATA_END,
+            control=self.delivered,
+            parameter=self.message_id,
+            payload=command.rstrip(b"\n"),
+        ))
+        self.delivered = 0
+        self.message_id = (self.message_id + 2) & 0xFFFFFFFF
+
+    def read(self) -> bytes:
+        buffer = bytearray()
+        while True:
+            message, _, _, payload = receive(self.sock)
+            buffer += payload
+            if message == Message.DATA_END:
+                self.delivered = 1
+                return bytes(buffer)
+
+    def status(self) -> int:
+        """Read the status byte over the asynchronous channel."""
+
+        self.async_sock.sendall(encode(
+            Message.ASYNC_STATUS_QUERY,
+            control=self.delivered,
+            parameter=self.message_id,
+        ))
+        message, control, _, _ = receive(self.async_sock)
+        if message != Message.ASYNC_STATUS_RESPONSE:
+            raise ConnectionError("unexpected HiSLIP status response")
+        return control
@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+SPDX-FileCopyrightText: 2025 Michael Czigler
+SPDX-License-Identifier: BSD-3-Clause
+
+Instrument health monitoring and discovery.
+"""
+
+from asyncio import gather
+from asyncio import open_connection
+from asyncio import Semaphore
+from asyncio import to_thread
+from asyncio import wait_for
+from dataclasses import dataclass
+from ipaddress import ip_network
+from time import perf_counter
+from time import time
+
+from .pool import pool
+
+
+@dataclass(slots=True)
+class Health:
+    """Instrument health dataclass."""
+
+    hostname: str
+    port: int
+    online: bool = False
+    identity: str | None = None
+    connect_millis: float | None = None
+    round_trip_millis: float | None = None
+    mean_round_trip_millis: float | None = None
+    probes: int = 0
+    failures: int = 0
+    refused: bool = False  # busy single-session instrument, not dead
+    error: str | None = None  # transport unusable, i.e. missing plugin
+    checked_at: float | None = None
+
+
+async def identify(
+    hostname: str,
+    port: int,
+    timeout: float,
+) -> tuple[float, float, str]:
+    """Connect, query *IDN? and return (connect, round trip, identity)."""
+
+    start = perf_counter()
+    reader, writer = await wait_for(open_connection(hostname, port), timeout)
+    connected = perf_counter()
+    try:
+        writer.write(b"*IDN?\n")
+        await writer.drain()
+        line = await wait_for(reader.readline(), timeout)
+    finally:
+        writer.close()
+    if not line:
+        raise ConnectionResetError("connection closed")
+    answered = perf_counter()
+    return (
+        (connected - start) * 1000,
+        (answered - connected) * 1000,
+        line.decode().strip(),
+    )
+
+
+def identify_transport(
+    transport: str,
+    hostname: str,
+    port: int,
+    timeout: float,
+) -> tuple[float, float, str]:
+    """
+    Blocking identify over a non-raw transport (HiSLIP, serial). The
+    pooled connection is borrowed, so a serial or USBTMC device never
+    has a second handle open or a query interleaved with a step's.
+    """
+
+    start = perf_counter()
+    borrow = pool.connection(transport, hostname, port, timeout, timeout)
+    with borrow as link:
+        connected = perf_counter()
+        line = link.query(b"*IDN?\n")
+        answered = perf_counter()
+    return (
+        (connected - start) * 1000,
+        (answered - connected) * 1000,
+        line.decode().strip(),
+    )
+
+
+class Monitor:
+    """Concurrent instrument health monitor."""
+
+    def __init__(self, timeout: float = 2.0) -> None:
+        self.timeout = timeout
+        self.health = {}
+
+    def get(self, hostname: str, port: int) -> Health | None:
+        return self.health.get((hostname, port))
+
+    async def probe(
+        self,
+        hostname: str,
+        port: int,
+        transport: str = "tcp",
+    ) -> Health:
+        """Probe a single instrument and update its statistics."""
+
+        key = (hostname, port)
+        health = self.health.get(key) or Health(hostname, port)
+        self.health[key] = health
+        health.probes += 1
+        health.checked_at = time()
+        health.refused = False
+        health.error = None
+        try:
+            if transport in (None, "tcp"):
+                result = await identify(hostname, port, self.timeout)
+            else:
+                result = await to_thread(
+                    identify_transport,
+                    transport,
+                    hostname,
+                    port,
+                    self.timeout,
+                )
+        except ConnectionRefusedError:
+            health.online = False
+            health.refused = True
+            health.failures += 1
+            return health
+        except (OSError, TimeoutError):
+            health.online = False
+            health.failures += 1
+            return health
+        except (ImportError, ValueError) as error:
+            health.online = False
+            health.error = str(error)
+            health.failures += 1
+            return health
+        connect, round_trip, identity = result
+        count = health.probes - health.failures
+        mean = health.mean_round_trip_millis or 0.0
+        health.online = True
+        health.identity = identity
+        health.connect_millis = connect
+        health.round_trip_millis = round_trip
+        health.mean_round_trip_millis = mean + (round_trip - mean) / count
+        return health
+
+    async def probe_all(self, instruments: list) -> list[Health]:
+        """Probe every (hostname, port[, transport]) concurrently."""
+
+        return await gather(*(self.probe(*target) for target in instruments))
+
+
+async def scan(
+    network: str,
+    port: int = 5025,
+    timeout: float = 0.5,
+    limit: int = 256,
+) -> list[tuple[str, str]]:
+    """Scan a subnet concurrently for SCPI instruments."""
+
+    semaphore = Semaphore(limit)
+
+    async def check(hostname: str) -> tuple[str, str] | None:
+        async with semaphore:
+            try:
+                *_, identity = await identify(hostname, port, timeout)
+            except (OSError, TimeoutError):
+                return None
+            return hostname, identity
+
+    hosts = [str(host) for host in ip_network(network, strict=False).hosts()]
+    results = await gather(*map(check, hosts))
+    return [result for result in results if result is not None]
+
+
+monitor = Monitor()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+SPDX-FileCopyrightText: 2025 Michael Czigler
+SPDX-License-Identifier: BSD-3-Clause
+
+Multi-up panel models.
+"""
+
+from dataclasses import replace
+from itertools import groupby
+
+from .base import Procedure
+
+CHANNEL = "{channel}"  # placeholder substituted in command SCPI
+ADDRESS = ("instrument_transport", "instrument_hostname", "instrument_port")
+INSTRUMENT = (
+    "instrument_name",
+    "instrument_hostname",
+    "instrument_port",
+    "instrument_transport",
+    "instrument_connect_timeout",
+    "instrument_read_timeout",
+    "instrument_retries",
+    "instrument_failure_threshold",
+)
+
+
+def positions(slots: list) -> dict[int, list]:
+    """Slot rows grouped by panel position."""
+
+    ordered = sorted(slots, key=lambda slot: slot["position"])
+    return {
+        position: list(group)
+        for position, group
+        in groupby(ordered, key=lambda slot: slot["position"])
+    }
+
+
+def split(recipes: list) -> tuple[list, list]:
+    """
+    Split recipes into the shared setup phases, run once for the whole
+    panel, and the phases run for every unit.
+    """
+
+    shared = [recipe for recipe in recipes if recipe["phase_setup"]]
+    units = [recipe for recipe in recipes if not recipe["phase_setup"]]
+    return shared, units
+
+
+def remap(recipes: list, slots: list) -> list[dict]:
+    """
+    Recipes of a single panel position: steps on a slotted instrument
+    use the mapped instrument (if any) and the slot channel replaces
+    the {channel} placeholder of the command.
+    """
+
+    mapping = {slot["instrument_id"]: slot for slot in slots}
+    remapped = []
+    for row in recipes:
+        recipe = dict(row)
+        slot = mapping.get(recipe["instrument_id"])
+        if slot is not None:
+            if slot["instrument_hostname"] is not None:
+                for key in INSTRUMENT:
+                    recipe[key] = slot[key]
+            if slot["channel"] is not None:
+                recipe["command_scpi"] = recipe["command_scpi"].replace(
+                    CHANNEL,
+                    slot["channel"],
+                )
+        remapped.append(recipe)
+    return remapped
+
+
+def lanes(units: dict[int, list]) -> list[list[int]]:
+    """
+    Panel positions grouped into lanes sharing no instrument address.
+    Positions of a lane run one after another, since another unit
+    could change the range, route or channel of a shared instrument
+    between the settings and queries of a unit; lanes run concurrently.
+    """
+
+    groups = []  # (addresses, positions)
+    for position, recipes in units.items():
+        addresses = {
+            tuple(recipe[key] for key in ADDRESS) for recipe in recipes
+        }
+        positions = [position]
+        for group in [group for group in groups if group[0] & addresses]:
+            groups.remove(group)
+            addresses |= group[0]
+            positions = group[1] + positions
+        groups.append((addresses, positions))
+    return [sorted(positions) for _, positions in groups]
+
+
+def teardowns(recipes: list) -> list:
+    return [recipe for recipe in recipes if recipe["phase_teardown"]]
+
+
+def unit(procedure: Procedure, position: int) -> Procedure:
+    """
+    Procedure of a single panel position, suffixing the panel serial
+    number and sharing the (already run) setup phases.
+    """
+
+    unit_under_test = procedure.unit_under_test
+    serial_number = f"{unit_under_test.serial_number}-{position}"
+    return replace(
+        procedure,
+        unit_under_test=replace(unit_under_test, serial_number=serial_number),
+        phases=list(procedure.phases),
+    )
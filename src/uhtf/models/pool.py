@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+SPDX-FileCopyrightText: 2025 Michael Czigler
+SPDX-License-Identifier: BSD-3-Clause
+
+Instrument connection pool.
+"""
+
+from contextlib import contextmanager
+from importlib.metadata import entry_points
+from threading import Lock
+from threading import RLock
+
+from .hislip import HiSLIP
+from .serialport import SerialPort
+from .serialport import USBTMC
+from .tcp import TCP
+from .transport import Transport
+from .unix import Unix
+from .vxi11 import VXI11
+
+GROUP = "uhtf.transports"  # plugin entry point group
+
+transports = {
+    "tcp": TCP,
+    "hislip": HiSLIP,
+    "vxi11": VXI11,
+    "serial": SerialPort,
+    "usbtmc": USBTMC,
+    "unix": Unix,
+}
+
+
+def resolve(name: str | None) -> type[Transport]:
+    """
+    Resolve a transport class by name, loading plugins registered
+    under the uhtf.transports entry point group on first use.
+    """
+
+    name = name or "tcp"
+    if name not in transports:
+        for entry_point in entry_points(group=GROUP, name=name):
+            transports[name] = entry_point.load()
+            break
+        else:
+            raise ValueError(f"unknown transport {name!r}")
+    return transports[name]
+
+
+def choices() -> dict[str, str]:
+    """
+    Labels of the built-in and installed plugin transports by name,
+    skipping plugins that fail to load.
+    """
+
+    for entry_point in entry_points(group=GROUP):
+        try:
+            resolve(entry_point.name)
+        except Exception:
+            continue
+    return {
+        name: getattr(transport, "label", "") or name
+        for name, transport in transports.items()
+    }
+
+
+class Pool:
+    """Reusable instrument connections keyed by transport and address."""
+
+    def __init__(self) -> None:
+        self.idle = {}
+        self.lock = Lock()
+        self.guards = {}  # one borrower per address at a time
+        self.borrowed = {}  # borrowers (holding or waiting) by address
+
+    def create(
+        self,
+        transport: str,
+        hostname: str,
+        port: int,
+        connect_timeout: float,
+        read_timeout: float,
+    ) -> Transport:
+        return resolve(transport)(hostname, port, connect_timeout, read_timeout)
+
+    def guard(self, key: tuple) -> RLock:
+        with self.lock:
+            return self.guards.setdefault(key, RLock())
+
+    def active(self, transport: str, hostname: str, port: int) -> bool:
+        """Whether a connection to an address is borrowed or idle."""
+
+        key = (transport or "tcp", hostname, port)
+        with self.lock:
+            return bool(self.idle.get(key) or self.borrowed.get(key))
+
+    def busy(self, transport: str, hostname: str, port: int) -> bool:
+        """Whether a connection to an address is borrowed."""
+
+        key = (transport or "tcp", hostname, port)
+        with self.lock:
+            return bool(self.borrowed.get(key))
+
+    def take(self, key: tuple) -> Transport | None:
+        """Take a live idle connection, discarding stale ones."""
+
+        while True:
+            with self.lock:
+                connections = self.idle.get(key)
+                if not connections:
+                    return None
+                connection = connections.pop()
+            if not connection.stale():
+                return connection
+            connection.close()
+
+    @contextmanager
+    def connection(
+        self,
+        transport: str,
+        hostname: str,
+        port: int,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 5.0,
+        on_connect=None,
+    ):
+        """
+        Borrow an open connection, connecting when none is idle. The
+        connection is returned to the pool on success and closed on
+        error, since its state is then unknown. Concurrent borrowers of
+        one address (i.e. panel units sharing an instrument) take turns
+        on a single connection instead of opening competing sessions.
+        """
+
+        key = (transport or "tcp", hostname, port)
+        with self.lock:
+            self.borrowed[key] = self.borrowed.get(key, 0) + 1
+        try:
+            with self.guard(key):
+                connection = self.take(key)
+                if connection is None:
+                    connection = self.create(
+                        *key, connect_timeout, read_timeout
+                    )
+                    if on_connect is not None:
+                        with on_connect():
+                            connection.connect()
+                    else:
+                        connection.connect()
+                try:
+                    yield connection
+                except BaseException:
+                    connection.close()
+                    raise
+                with self.lock:
+                    self.idle.setdefault(key, []).append(connection)
+        finally:
+            with self.lock:
+                self.borrowed[key] -= 1
+
+    def clear(self) -> None:
+        """Close every idle connection."""
+
+        with self.lock:
+            connections = [c for idle in self.idle.values() for c in idle]
+            self.idle.clear()
+        for connection in connections:
+            connection.close()
+
+
+pool = Pool()
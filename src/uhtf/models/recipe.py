@@ -13,14 +13,35 @@ from decimal import Decimal
 from decimal import getcontext
 from decimal import ROUND_HALF_EVEN
 from itertools import groupby
+from time import monotonic
 from time import sleep
 
-from .tcp import TCP
+from .aggregate import Aggregate
+from .aggregate import parse_readings
+from .aggregate import summarize
 from .base import Measurement
 from .base import MeasurementOutcome
 from .base import Phase
+from .base import PhaseResult
 from .base import PhaseOutcome
 from .base import Procedure
+from .base import RunMode
+from .base import Step
+from .breaker import breakers
+from .pool import pool
+from .state import Cache
+from .state import cacheable
+from .state import redundant
+from .state import remember
+from .sync import Sync
+from .sync import synchronize
+from .sync import wait_stable
+from .timing import metrics
+from .timing import timer
+from .tuning import probe
+from .tuning import stabilize
+from .tuning import tuner
+from .tuning import Tuning
 
 
 def get_millis() -> float:
@@ -37,61 +58,336 @@ def in_range(value: float, ll: float, ul: float, prec: int):
     return MeasurementOutcome.FAIL
 
 
-def run(procedure: Procedure, recipe: list) -> Procedure:
+def borrow(recipe, spans: dict):
+    """Borrow a pooled connection to the instrument of a recipe."""
+
+    return pool.connection(
+        recipe["instrument_transport"],
+        recipe["instrument_hostname"],
+        recipe["instrument_port"],
+        connect_timeout=recipe["instrument_connect_timeout"] / 1000,
+        read_timeout=recipe["instrument_read_timeout"] / 1000,
+        on_connect=lambda: timer(spans, "connect"),
+    )
+
+
+def tolerance(recipe) -> float:
+    """
+    Agreement of two consecutive readings to call them stable: the
+    command's sync tolerance, or one unit of the measurement precision.
+    """
+
+    if recipe["command_sync_tolerance"] is not None:
+        return recipe["command_sync_tolerance"]
+    return 10 ** -int(recipe["measurement_precision"] or 0)
+
+
+def exchange(recipe, spans: dict, cache: bool = False) -> bytes | None:
+    """
+    Send a command and return the response of a query. With the cache,
+    setting commands already in effect on the connection are skipped.
+    """
+
+    response = None
+    with borrow(recipe, spans) as connection:
+        if cache and redundant(connection.settings, recipe["command_scpi"]):
+            spans["cached"] = 0  # instrument already in this state
+            return None
+        scpi = recipe["command_scpi"].encode() + b"\n"
+        with timer(spans, "send"):
+            connection.send(scpi)
+        if b"?" in scpi:
+            with timer(spans, "wait"):
+                response = connection.read()
+            if recipe["command_sync"] == Sync.STABLE:
+                with timer(spans, "sync"):
+                    response = wait_stable(
+                        connection,
+                        scpi,
+                        response,
+                        tolerance(recipe),
+                        recipe["command_sync_timeout"],
+                    )
+        if recipe["command_sync"] in (Sync.OPC, Sync.STB):
+            with timer(spans, "sync"):
+                synchronize(connection, recipe)
+        remember(connection.settings, recipe["command_scpi"])
+    return response
+
+
+def attempt(recipe, spans: dict, cache: bool = False) -> bytes | None:
+    """Exchange a command through the instrument circuit breaker."""
+
+    breaker = breakers.get(
+        recipe["instrument_hostname"],
+        recipe["instrument_port"],
+        recipe["instrument_failure_threshold"],
+    )
+    breaker.check()
+    retries = recipe["instrument_retries"] or 0
+    for count in range(retries + 1):
+        try:
+            response = exchange(recipe, spans, cache)
+        except OSError:
+            breaker.failure()
+            if count == retries or breaker.is_open:
+                raise
+        else:
+            breaker.success()
+            return response
+
+
+def parse(recipe, response: bytes) -> list[tuple]:
+    """
+    Parse a response into (name, value, docstring) readings. Without
+    an aggregate the response is a single reading; otherwise it holds
+    many, kept individually or reduced to one statistic.
+    """
+
+    name = recipe["measurement_name"]
+    aggregate = recipe["measurement_aggregate"]
+    if not aggregate:
+        return [(name, float(response.decode().strip()), None)]
+    readings = parse_readings(response)
+    if aggregate == Aggregate.EACH:
+        return [
+            (f"{name}[{index}]", value, None)
+            for index, value in enumerate(readings)
+        ]
+    docstring = f"{aggregate} of {len(readings)} readings"
+    return [(name, summarize(aggregate, readings), docstring)]
+
+
+def settle(recipe, query, budget: float) -> None:
+    """
+    Sleep out the delay of a write while observing how soon repeated
+    readings of the following query settle.
+    """
+
+    start = monotonic()
+    try:
+        with borrow(query, {}) as connection:
+            seconds = stabilize(
+                connection,
+                query["command_scpi"].encode() + b"\n",
+                tolerance(query),
+                budget,
+            )
+    except (OSError, ValueError):
+        pass  # observation only, the step itself succeeded
+    else:
+        tuner.observe(
+            recipe["instrument_name"],
+            recipe["command_name"],
+            "settle",
+            seconds,
+        )
+    remaining = budget - (monotonic() - start)
+    if remaining > 0:
+        sleep(remaining)
+
+
+def measure(
+    recipe,
+    name: str,
+    value: float,
+    docstring: str | None = None,
+) -> Measurement:
+    """Apply the measurement limits to a single value."""
+
+    return Measurement(
+        name=name,
+        outcome=in_range(
+            value=value,
+            ll=recipe["measurement_lower_limit"],
+            ul=recipe["measurement_upper_limit"],
+            prec=recipe["measurement_precision"],
+        ),
+        measured_value=value,
+        units=recipe["measurement_units"],
+        lower_limit=recipe["measurement_lower_limit"],
+        upper_limit=recipe["measurement_upper_limit"],
+        docstring=docstring,
+    )
+
+
+def run(
+    procedure: Procedure,
+    recipe: list,
+    cache: str = Cache.OFF,
+    tuning: str = Tuning.OFF,
+    query=None,
+) -> Procedure:
+    step = Step(
+        command=recipe["command_name"],
+        instrument=recipe["instrument_name"],
+    )
+    procedure.phases[-1].steps.append(step)
+    spans = step.spans
     try:
-        hostname = recipe["instrument_hostname"]
-        port = recipe["instrument_port"]
-        with TCP(hostname, port) as tcp:
-            scpi = recipe["command_scpi"].encode() + b"\n"
-            if b"?" in scpi:
-                response = tcp.query(scpi)
-                measured_value = float(response.decode().strip())
-                measurement_outcome = in_range(
-                    value=measured_value,
-                    ll=recipe["measurement_lower_limit"],
-                    ul=recipe["measurement_upper_limit"],
-                    prec=recipe["measurement_precision"],
-                )
-                measurement = Measurement(
-                    name=recipe["measurement_name"],
-                    outcome=measurement_outcome,
-                    measured_value=measured_value,
-                    units=recipe["measurement_units"],
-                    lower_limit=recipe["measurement_lower_limit"],
-                    upper_limit=recipe["measurement_upper_limit"],
-                )
-                procedure.phases[-1].measurements.append(measurement)
-                if measurement_outcome != MeasurementOutcome.PASS:
+        response = attempt(recipe, spans, cacheable(recipe, cache))
+        if "wait" in spans:
+            tuner.observe(
+                step.instrument,
+                step.command,
+                "response",
+                (spans["send"] + spans["wait"]) / 1e9,
+            )
+        if response is not None:
+            with timer(spans, "parse"):
+                readings = parse(recipe, response)
+            with timer(spans, "limit"):
+                measurements = [
+                    measure(recipe, name, value, docstring)
+                    for name, value, docstring in readings
+                ]
+            procedure.phases[-1].measurements.extend(measurements)
+            for measurement in measurements:
+                if measurement.outcome != MeasurementOutcome.PASS:
                     procedure.phases[-1].outcome = PhaseOutcome.FAIL
                     procedure.run_passed = False
-            else:
-                tcp.send(scpi)
-        if recipe["command_delay"] > 0:
-            sleep(recipe["command_delay"] / 1000)
+        delay = 0 if "cached" in spans else recipe["command_delay"]
+        if tuning == Tuning.APPLY and delay > 0:
+            proposed = tuner.propose(step.instrument, step.command, delay)
+            delay = delay if proposed is None else proposed
+        if "sync" not in spans and delay > 0:  # no sync ran, wait instead
+            with timer(spans, "delay"):
+                if tuning == Tuning.OBSERVE and query is not None:
+                    settle(recipe, query, delay / 1000)
+                else:
+                    sleep(delay / 1000)
     except Exception as exception:  # caught unknown error
         print(exception)  # temporary
         procedure.phases[-1].outcome = PhaseOutcome.ERROR
         procedure.run_passed = False
+    for name, nanos in spans.items():
+        metrics.observe(
+            "uhtf_step_seconds",
+            {
+                "instrument": step.instrument,
+                "command": step.command,
+                "span": name,
+            },
+            nanos / 1e9,
+        )
     return procedure
 
 
-def builder(recipes: list, procedure: Procedure) -> Procedure:
-    """Generator function for phase-based recipes."""
+def execute(
+    procedure: Procedure,
+    phase_name: str,
+    phase_recipes: list,
+    fail_fast: bool = False,
+    cache: str = Cache.OFF,
+    tuning: str = Tuning.OFF,
+) -> Phase:
+    """Run a phase, repeating failed attempts, yielding after each step."""
 
-    groups = groupby(recipes, key=lambda r: r["phase_name"])
-    for phase_name, phase_recipes in groups:
+    policy = phase_recipes[0]
+    teardown = bool(policy["phase_teardown"])
+    for _ in range((policy["phase_retries"] or 0) + 1):
         phase = Phase(
             name=phase_name,
             outcome=PhaseOutcome.PASS,  # assumed at start
             measurements=list(),
+            steps=list(),
             start_time_millis=get_millis(),
-            end_time_millis=None, 
+            end_time_millis=None,
         )
         procedure.phases.append(phase)
-        for recipe in phase_recipes:
-            run(procedure, recipe)
+        for index, recipe in enumerate(phase_recipes):
+            following = phase_recipes[index + 1:index + 2]
+            run(procedure, recipe, cache, tuning, probe(recipe, following))
+            yield procedure
+            if teardown:
+                continue  # safe state commands always run
+            if phase.outcome == PhaseOutcome.ERROR:
+                break
+            if fail_fast and phase.outcome == PhaseOutcome.FAIL:
+                break
+        phase.end_time_millis = get_millis()
+        if phase.outcome == PhaseOutcome.PASS:
+            break  # repeated attempts stay in the record
+    return phase
+
+
+def builder(
+    recipes: list,
+    procedure: Procedure,
+    mode: str = RunMode.DIAGNOSTIC,
+    cache: str = Cache.OFF,
+    tuning: str = Tuning.OFF,
+) -> Procedure:
+    """
+    Generator function for phase-based recipes. A failed phase is
+    repeated up to its retry count; a phase whose prerequisite did not
+    pass is skipped. The run stops on an error, on a failure of a phase
+    whose policy is STOP or, in fail fast mode, on the first failed
+    measurement. Teardown phases always run to leave a safe state, even
+    when the generator is closed early (i.e. a cancelled run). The
+    cache scope selects which setting commands may be suppressed when
+    already in effect on the pooled connection, and the tuning mode
+    whether delays observe settling or use the proposed delay.
+    """
+
+    fail_fast = mode == RunMode.FAIL_FAST
+    outcomes = {  # final outcome by phase name, i.e. shared panel setup
+        phase.name: phase.outcome for phase in procedure.phases
+    }
+    stopped = False
+    groups = [
+        (phase_name, list(phase_recipes))
+        for phase_name, phase_recipes
+        in groupby(recipes, key=lambda r: r["phase_name"])
+    ]
+    pending = {  # teardown phases not yet completed
+        index
+        for index, (_, phase_recipes) in enumerate(groups)
+        if phase_recipes[0]["phase_teardown"]
+    }
+    try:
+        for index, (phase_name, phase_recipes) in enumerate(groups):
+            policy = phase_recipes[0]
+            teardown = bool(policy["phase_teardown"])
+            if stopped and not teardown:
+                continue  # aborted
+            prerequisite = outcomes.get(policy["phase_prerequisite"])
+            if prerequisite not in (None, PhaseOutcome.PASS):
+                millis = get_millis()
+                procedure.phases.append(Phase(
+                    name=phase_name,
+                    outcome=PhaseOutcome.SKIP,
+                    measurements=list(),
+                    steps=list(),
+                    start_time_millis=millis,
+                    end_time_millis=millis,
+                ))
+                outcomes[phase_name] = PhaseOutcome.SKIP
+                pending.discard(index)
+                yield procedure
+                continue
+            phase = yield from execute(
+                procedure,
+                phase_name,
+                phase_recipes,
+                fail_fast,
+                cache,
+                tuning,
+            )
+            pending.discard(index)
+            outcomes[phase_name] = phase.outcome
+            procedure.run_passed = all(
+                outcome in (PhaseOutcome.PASS, PhaseOutcome.SKIP)
+                for outcome in outcomes.values()
+            )
             yield procedure
-            if procedure.phases[-1].outcome == PhaseOutcome.ERROR:
-                return
-        procedure.phases[-1].end_time_millis = get_millis()
-        yield procedure
+            if teardown or phase.outcome == PhaseOutcome.PASS:
+                continue
+            if phase.outcome == PhaseOutcome.ERROR or fail_fast \
+                    or policy["phase_on_failure"] == PhaseResult.STOP:
+                stopped = True
+    finally:
+        for index in sorted(pending):  # closed early or raised
+            procedure.run_passed = False
+            for _ in execute(procedure, *groups[index]):
+                pass
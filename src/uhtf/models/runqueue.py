@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+SPDX-FileCopyrightText: 2025 Michael Czigler
+SPDX-License-Identifier: BSD-3-Clause
+
+Station run queue model.
+"""
+
+from asyncio import CancelledError
+from asyncio import ensure_future
+from asyncio import Queue
+from asyncio import QueueFull
+from asyncio import shield
+from asyncio import to_thread
+from collections.abc import AsyncGenerator
+from collections.abc import Generator
+from dataclasses import dataclass
+from dataclasses import field
+from time import monotonic
+
+from .base import Procedure
+from .timing import metrics
+
+DONE = object()  # step generator exhausted
+
+
+@dataclass(slots=True)
+class Entry:
+    """Scanned unit with its recipes resolved, waiting for the fixture."""
+
+    procedure: Procedure
+    rows: list
+    mode: str
+    cache: str
+    tuning: str = "off"
+    slots: list = field(default_factory=list)  # panel positions
+    profile: str = "off"  # one-shot profiler of this run
+    queued_at: float = field(default_factory=monotonic)
+
+
+class RunQueue:
+    """Bounded queue of prepared units served by a single worker."""
+
+    def __init__(self, size: int = 4) -> None:
+        self.entries = Queue(size)
+        self.task = None
+        self.wait = 0.0  # seconds the last started unit waited
+
+    def start(self, size: int, worker, *args) -> None:
+        """Start the worker task unless it is already running."""
+
+        if self.task is not None and not self.task.done():
+            return
+        if self.entries.empty():
+            self.entries = Queue(size)
+        self.task = ensure_future(worker(*args))
+
+    def stop(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    def put(self, entry: Entry) -> bool:
+        """Queue a unit, or return False when the queue is full."""
+
+        try:
+            self.entries.put_nowait(entry)
+        except QueueFull:
+            return False
+        return True
+
+    async def get(self) -> Entry:
+        """Wait for the next unit and record how long it was queued."""
+
+        entry = await self.entries.get()
+        self.wait = monotonic() - entry.queued_at
+        metrics.observe("uhtf_queue_wait_seconds", {}, self.wait)
+        return entry
+
+    def status(self) -> dict:
+        return {
+            "depth": self.entries.qsize(),
+            "size": self.entries.maxsize,
+            "wait": round(self.wait, 3),
+        }
+
+
+async def advance(
+    steps: Generator,
+    inline: bool = False,
+) -> AsyncGenerator:
+    """
+    Advance a blocking step generator in a worker thread, keeping the
+    event loop free to accept scans. On cancellation the step in
+    flight finishes before the generator is closed (running teardown).
+    Inline mode steps on the event loop, i.e. while profiling.
+    """
+
+    try:
+        while True:
+            if inline:
+                temp = next(steps, DONE)
+            else:
+                future = ensure_future(to_thread(next, steps, DONE))
+                try:
+                    temp = await shield(future)
+                except CancelledError:
+                    await future
+                    raise
+            if temp is DONE:
+                return
+            yield temp
+    finally:
+        await to_thread(steps.close)
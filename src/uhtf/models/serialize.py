@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+SPDX-FileCopyrightText: 2025 Michael Czigler
+SPDX-License-Identifier: BSD-3-Clause
+
+Fast JSON serialization of base models.
+"""
+
+from dataclasses import fields
+from dataclasses import is_dataclass
+from json import dumps as json_dumps
+
+try:
+    from orjson import dumps as orjson_dumps
+except ImportError:  # optional backend
+    orjson_dumps = None
+
+PRIMITIVES = (str, int, float, bool, type(None))
+
+_fields = {}
+_orjson = False  # see use_backend()
+
+
+def use_backend(name: str) -> None:
+    """
+    Select the "json" (standard library, default) or "orjson" backend.
+    orjson is faster but writes compact separators and NaN or Infinity
+    as null, so its output differs from the default and is opt-in.
+    """
+
+    global _orjson
+    if name not in ("json", "orjson"):
+        raise ValueError(f"unknown JSON backend {name!r}")
+    if name == "orjson" and orjson_dumps is None:
+        raise ValueError("the orjson backend is not installed")
+    _orjson = name == "orjson"
+
+
+def field_names(cls: type) -> tuple | None:
+    """Precomputed field names of a dataclass type (None otherwise)."""
+
+    try:
+        return _fields[cls]
+    except KeyError:
+        names = None
+        if is_dataclass(cls):
+            names = tuple(f.name for f in fields(cls))
+        _fields[cls] = names
+        return names
+
+
+def to_dict(obj):
+    """
+    Convert dataclasses (and containers of them) to plain JSON types.
+
+    Equivalent to dataclasses.asdict() for JSON purposes, but without
+    its generic deep copy of every leaf value.
+    """
+
+    cls = type(obj)
+    if cls in PRIMITIVES:
+        return obj
+    names = field_names(cls)
+    if names is not None:
+        return {name: to_dict(getattr(obj, name)) for name in names}
+    if cls is list or cls is tuple:
+        return [to_dict(value) for value in obj]
+    if cls is dict:
+        return {key: to_dict(value) for key, value in obj.items()}
+    if hasattr(obj, "to_dict"):
+        return obj.to_dict()  # compact models
+    return obj  # enums and other JSON-native subclasses
+
+
+def default(obj):
+    if hasattr(obj, "to_dict"):
+        return obj.to_dict()
+    raise TypeError(obj)
+
+
+def dumps(obj) -> str:
+    """Serialize base models to a JSON string."""
+
+    if _orjson:
+        return orjson_dumps(obj, default=default).decode()
+    return json_dumps(to_dict(obj))
+
+
+def encode(obj) -> bytes:
+    """Serialize base models to UTF-8 JSON bytes."""
+
+    if _orjson:
+        return orjson_dumps(obj, default=default)
+    return json_dumps(to_dict(obj)).encode()
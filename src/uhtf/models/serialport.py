@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+SPDX-FileCopyrightText: 2025 Michael Czigler
+SPDX-License-Identifier: BSD-3-Clause
+
+Serial and USBTMC instrumentation transport models.
+"""
+
+from fcntl import ioctl
+from os import close
+from os import O_RDWR
+from os import open as open_fd
+from os import read
+from os import write
+from struct import pack
+
+from .transport import Transport
+
+USBTMC_IOCTL_SET_TIMEOUT = 0x40045B0A  # _IOW('[', 10, __u32)
+
+
+class SerialPort(Transport):
+    """
+    Newline terminated SCPI over a serial port (requires pyserial).
+    The hostname is the device (i.e. /dev/ttyUSB0) and the port is
+    the baud rate.
+    """
+
+    label = "Serial (hostname is the device, port the baud rate)"
+
+    def connect(self) -> None:
+        from serial import serial_for_url  # optional dependency
+
+        self.sock = serial_for_url(
+            self.hostname,
+            baudrate=self.port or 9600,
+            timeout=self.read_timeout,
+            write_timeout=self.read_timeout,
+        )
+
+    def close(self) -> None:
+        if self.sock is not None:
+            self.sock.close()
+        self.sock = None
+
+    def stale(self) -> bool:
+        if self.sock is None or not self.sock.is_open:
+            return True
+        if self.sock.in_waiting:
+            self.sock.reset_input_buffer()  # late response, not ours
+        return False
+
+    def set_read_timeout(self, seconds: float) -> None:
+        self.read_timeout = seconds
+        if self.sock is not None:
+            self.sock.timeout = seconds
+
+    def send(self, command: bytes) -> None:
+        self.sock.write(command)
+
+    def read(self) -> bytes:
+        response = self.sock.read_until(b"\n")
+        if response[-1:] != b"\n":
+            raise TimeoutError("serial read timeout")
+        return response
+
+
+class USBTMC(Transport):
+    """
+    SCPI over the Linux usbtmc character device. The hostname is the
+    device (i.e. /dev/usbtmc0) and the port is ignored.
+    """
+
+    label = "USBTMC (hostname is the device, i.e. /dev/usbtmc0)"
+
+    def connect(self) -> None:
+        self.sock = open_fd(self.hostname, O_RDWR)
+        self.set_read_timeout(self.read_timeout)
+
+    def set_read_timeout(self, seconds: float) -> None:
+        self.read_timeout = seconds
+        if self.sock is None:
+            return
+        try:
+            millis = int(seconds * 1000)
+            ioctl(self.sock, USBTMC_IOCTL_SET_TIMEOUT, pack("I", millis))
+        except OSError:
+            pass  # older kernels keep the driver default (5 s)
+
+    def close(self) -> None:
+        if self.sock is not None:
+            close(self.sock)
+        self.sock = None
+
+    def stale(self) -> bool:
+        return self.sock is None
+
+    def send(self, command: bytes) -> None:
+        write(self.sock, command)
+
+    def read(self) -> bytes:
+        buffer = bytearray()
+        while buffer[-1:] != b"\n":
+            chunk = read(self.sock, 4096)  # driver enforces the timeout
+            if not chunk:
+                break  # end of message without terminator
+            buffer += chunk
+        return bytes(buffer)
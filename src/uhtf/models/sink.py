@@ -0,0 +1,431 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+SPDX-FileCopyrightText: 2025 Michael Czigler
+SPDX-License-Identifier: BSD-3-Clause
+
+Archive sinks.
+"""
+
+from abc import ABC
+from abc import abstractmethod
+from asyncio import CancelledError
+from asyncio import ensure_future
+from asyncio import gather
+from asyncio import Queue
+from asyncio import QueueFull
+from asyncio import sleep
+from asyncio import to_thread
+from asyncio import wait_for
+from datetime import datetime
+from gzip import open as open_gzip
+from hashlib import sha256
+from importlib.metadata import entry_points
+from logging import getLogger
+from os import makedirs
+from os import remove
+from os import rename
+from os.path import exists
+from os.path import getsize
+from os.path import join
+from sqlite3 import connect
+
+from .archive import ArchiveError
+from .archive import AsyncArchiveClient
+from .base import Procedure
+from .compact import CompactProcedure
+from .serialize import encode
+from .timing import metrics
+from .timing import timer
+
+GROUP = "uhtf.sinks"  # plugin entry point group
+
+logger = getLogger(__name__)
+
+
+class Sink(ABC):
+    """
+    Archive destination fed through its own bounded queue, so a slow
+    or unreachable sink never delays the others. Failed writes are
+    retried with exponential backoff. Procedures still failing, left
+    queued on close or arriving while the queue is full are counted
+    and handed to lost(), which discards them unless the sink keeps
+    them (i.e. the HTTP spool). Queued procedures may be compacted,
+    and are expanded again just before they are written.
+    """
+
+    name = "sink"
+    concurrency = 1  # queue workers
+
+    def __init__(self, config: dict) -> None:
+        self.queue = Queue(config.get("ARCHIVE_QUEUE_SIZE", 1024))
+        self.retries = config.get("ARCHIVE_RETRIES", 0)
+        self.backoff = config.get("ARCHIVE_BACKOFF", 1.0)  # seconds
+        self.tasks = []
+        self.written = 0
+        self.failed = 0
+        self.dropped = 0
+        self.spooled = 0
+
+    @abstractmethod
+    async def write(self, procedure: Procedure) -> None:
+        """Write a procedure, raising when it could not be written."""
+
+    async def release(self) -> None:
+        """Free the resources of the sink once drained."""
+
+    def lost(self, procedure: Procedure) -> None:
+        """Keep a procedure that could not be written (discarded)."""
+
+    def permanent(self, error: Exception) -> bool:
+        """
+        Whether a write failed for good (i.e. a rejected upload), so
+        retrying or keeping the procedure could never succeed.
+        """
+
+        return False
+
+    async def deliver(self, procedure: Procedure) -> None:
+        """Write a procedure, retrying with exponential backoff."""
+
+        for count in range(self.retries + 1):
+            try:
+                return await self.write(procedure)
+            except Exception as error:
+                if count == self.retries or self.permanent(error):
+                    raise
+                logger.warning("%s archive sink retrying", self.name)
+                await sleep(self.backoff * 2 ** count)
+
+    def start(self) -> None:
+        if not self.tasks:
+            self.tasks = [
+                ensure_future(self.work()) for _ in range(self.concurrency)
+            ]
+
+    def put(self, procedure: Procedure) -> bool:
+        try:
+            self.queue.put_nowait(procedure)
+        except QueueFull:
+            self.dropped += 1
+            self.lost(procedure)
+            return False
+        return True
+
+    async def work(self) -> None:
+        while True:
+            procedure = await self.queue.get()
+            spans = {}
+            try:
+                with timer(spans, "archive"):
+                    if isinstance(procedure, CompactProcedure):
+                        await self.deliver(procedure.expand())
+                    else:
+                        await self.deliver(procedure)
+            except CancelledError:
+                self.lost(procedure)  # closed while writing or backing off
+                raise
+            except Exception as error:
+                self.failed += 1
+                logger.exception("%s archive sink failed", self.name)
+                if not self.permanent(error):
+                    self.lost(procedure)
+            else:
+                self.written += 1
+            finally:
+                self.queue.task_done()
+            metrics.observe(
+                "uhtf_archive_seconds",
+                {"sink": self.name},
+                spans["archive"] / 1e9,
+            )
+
+    async def close(self, timeout: float | None = None) -> None:
+        """Write the queued procedures (up to a timeout) and stop."""
+
+        try:
+            await wait_for(self.queue.join(), timeout)
+        except TimeoutError:
+            logger.warning(
+                "%s archive sink closed with %d queued",
+                self.name,
+                self.queue.qsize(),
+            )
+        for task in self.tasks:
+            task.cancel()
+        await gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+        while not self.queue.empty():
+            self.lost(self.queue.get_nowait())
+        await self.release()
+
+    def status(self) -> dict:
+        return {
+            "name": self.name,
+            "depth": self.queue.qsize(),
+            "written": self.written,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "spooled": self.spooled,
+        }
+
+
+class HTTPSink(Sink):
+    """
+    Archive server uploads over pooled keep-alive connections. Uploads
+    that fail every retry are appended to a spool file, which is
+    queued again when the sink starts and after the next successful
+    upload, so an archive outage loses no procedures. Uploads the
+    server rejects (a 4xx other than 408 and 429) are neither retried
+    nor spooled.
+    """
+
+    name = "http"
+
+    def __init__(self, config: dict) -> None:
+        super().__init__(config)
+        self.client = AsyncArchiveClient(
+            config["archive_url"],
+            config["archive_access_token"],
+            limit=config["ARCHIVE_CONCURRENCY"],
+            connect_timeout=config["ARCHIVE_CONNECT_TIMEOUT"],
+            read_timeout=config["ARCHIVE_READ_TIMEOUT"],
+            gzip=config["ARCHIVE_GZIP"],
+        )
+        self.concurrency = config["ARCHIVE_CONCURRENCY"]
+        digest = sha256(config["archive_url"].encode()).hexdigest()[:16]
+        self.directory = config["ARCHIVE_SPOOL"]
+        self.spool = join(self.directory, f"http-{digest}.ndjson")
+        self.pending = exists(self.spool)  # spooled procedures to replay
+        self.replaying = None
+
+    def start(self) -> None:
+        super().start()
+        if self.pending:
+            self.replaying = ensure_future(self.replay())
+
+    def permanent(self, error: Exception) -> bool:
+        return isinstance(error, ArchiveError) \
+            and 400 <= error.status < 500 and error.status not in (408, 429)
+
+    def lost(self, procedure: Procedure | bytes) -> None:
+        line = procedure if isinstance(procedure, bytes) \
+            else encode(procedure)
+        try:
+            makedirs(self.directory, exist_ok=True)
+            with open(self.spool, "ab") as file:
+                file.write(line + b"\n")
+        except OSError:
+            logger.exception("http archive sink failed to spool")
+            return
+        self.spooled += 1
+        self.pending = True
+
+    def unspool(self) -> list[bytes]:
+        """Take every spooled (serialized) procedure off the spool."""
+
+        path = self.spool + ".replay"
+        try:
+            rename(self.spool, path)
+        except FileNotFoundError:
+            return []
+        with open(path, "rb") as file:
+            lines = [line.rstrip(b"\n") for line in file if line.strip()]
+        remove(path)
+        return lines
+
+    async def replay(self) -> None:
+        """Queue the spooled procedures again, spooling any not queued."""
+
+        self.pending = False
+        lines = await to_thread(self.unspool)
+        index = 0
+        try:
+            for index, line in enumerate(lines):
+                await self.queue.put(line)
+            index = len(lines)
+        finally:
+            for line in lines[index:]:
+                self.lost(line)
+
+    async def write(self, procedure: Procedure | bytes) -> None:
+        if isinstance(procedure, bytes):
+            await self.client.send(procedure)
+        else:
+            await self.client.post(procedure)
+        if self.pending and (self.replaying is None or self.replaying.done()):
+            self.replaying = ensure_future(self.replay())
+
+    async def close(self, timeout: float | None = None) -> None:
+        if self.replaying is not None:
+            self.replaying.cancel()
+            await gather(self.replaying, return_exceptions=True)
+        await super().close(timeout)
+
+    async def release(self) -> None:
+        await self.client.close()
+
+
+class FileSink(Sink):
+    """
+    Newline delimited JSON files, optionally gzip compressed, rotated
+    once a file reaches a size.
+    """
+
+    name = "file"
+
+    def __init__(self, config: dict) -> None:
+        super().__init__(config)
+        self.directory = config["ARCHIVE_DIRECTORY"]
+        self.max_bytes = config["ARCHIVE_FILE_MAX_BYTES"]
+        self.compress = config["ARCHIVE_FILE_GZIP"]
+        self.path = None
+        self.file = None
+
+    def rotate(self) -> None:
+        if self.file is not None:
+            self.file.close()
+        makedirs(self.directory, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+        suffix = ".ndjson.gz" if self.compress else ".ndjson"
+        self.path = join(self.directory, f"archive-{stamp}{suffix}")
+        self.file = open_gzip(self.path, "ab") if self.compress \
+            else open(self.path, "ab")
+
+    def append(self, procedure: Procedure) -> None:
+        if self.file is None or getsize(self.path) >= self.max_bytes:
+            self.rotate()
+        self.file.write(encode(procedure) + b"\n")
+        self.file.flush()  # a complete record on disk (gzip sync flush)
+
+    async def write(self, procedure: Procedure) -> None:
+        await to_thread(self.append, procedure)
+
+    async def release(self) -> None:
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+class DatabaseSink(Sink):
+    """Rows of the local database archive table."""
+
+    name = "database"
+
+    def __init__(self, config: dict) -> None:
+        super().__init__(config)
+        self.database = config["DATABASE"]
+        self.connection = None
+
+    def insert(self, procedure: Procedure) -> None:
+        if self.connection is None:
+            self.connection = connect(self.database, check_same_thread=False)
+        unit_under_test = procedure.unit_under_test
+        self.connection.execute(
+            """
+            INSERT INTO archive (
+                serial_number,
+                part_number,
+                run_passed,
+                procedure
+            ) VALUES (?, ?, ?, ?)
+            """,
+            (
+                unit_under_test.serial_number if unit_under_test else None,
+                unit_under_test.part_number if unit_under_test else None,
+                procedure.run_passed,
+                encode(procedure).decode(),
+            ),
+        )
+        self.connection.commit()
+
+    async def write(self, procedure: Procedure) -> None:
+        await to_thread(self.insert, procedure)
+
+    async def release(self) -> None:
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+sinks = {
+    "http": HTTPSink,
+    "file": FileSink,
+    "database": DatabaseSink,
+}
+
+
+def resolve(name: str) -> type[Sink]:
+    """
+    Resolve a sink class by name, loading plugins registered under the
+    uhtf.sinks entry point group on first use.
+    """
+
+    if name not in sinks:
+        for entry_point in entry_points(group=GROUP, name=name):
+            sinks[name] = entry_point.load()
+            break
+        else:
+            raise ValueError(f"unknown archive sink {name!r}")
+    return sinks[name]
+
+
+class Fanout:
+    """Every completed procedure fanned out to the configured sinks."""
+
+    def __init__(self) -> None:
+        self.sinks = {}  # by (name, configuration key)
+        self.closing = set()  # sinks no longer wanted, still draining
+
+    def configure(self, wanted: dict[tuple, tuple]) -> list[Sink]:
+        """
+        Start the wanted sinks, by key to (name, config), reusing those
+        already running; sinks no longer wanted are drained and closed
+        in the background.
+        """
+
+        for key in set(self.sinks) - set(wanted):
+            task = ensure_future(self.sinks.pop(key).close())
+            self.closing.add(task)
+            task.add_done_callback(self.closing.discard)
+        for key, (name, config) in wanted.items():
+            if key not in self.sinks:
+                self.sinks[key] = resolve(name)(config)
+                self.sinks[key].start()
+        return [self.sinks[key] for key in wanted]
+
+    async def close(self, timeout: float | None = None) -> None:
+        sinks = list(self.sinks.values())
+        self.sinks.clear()
+        await gather(
+            *(sink.close(timeout) for sink in sinks),
+            *self.closing,
+        )
+
+    def status(self) -> list[dict]:
+        return [sink.status() for sink in self.sinks.values()]
+
+    def render(self) -> str:
+        """Render sink queue counters in the Prometheus text format."""
+
+        depths, counts = [], []
+        for status in self.status():
+            labels = f'sink="{status["name"]}"'
+            depths.append(
+                f"uhtf_archive_queue_depth{{{labels}}} {status['depth']}"
+            )
+            for result in ("written", "failed", "dropped", "spooled"):
+                counts.append(
+                    f'uhtf_archive_procedures{{{labels},result="{result}"}} '
+                    f"{status[result]}"
+                )
+        return "\n".join([
+            "# TYPE uhtf_archive_queue_depth gauge",
+            *depths,
+            "# TYPE uhtf_archive_procedures counter",
+            *counts,
+        ]) + "\n"
+
+
+fanout = Fanout()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+SPDX-FileCopyrightText: 2025 Michael Czigler
+SPDX-License-Identifier: BSD-3-Clause
+
+Instrument state cache.
+"""
+
+from enum import StrEnum
+from time import monotonic
+
+RESETS = ("*RST", "*RCL", "SYST:PRES", "SYSTEM:PRESET")
+ACTIONS = (  # events and actions, never skipped as settings
+    "INIT",
+    "*TRG",
+    "TRIG:IMM",
+    "*CLS",
+    "ABOR",
+    "*WAI",
+    "*OPC",
+    "*SAV",
+    "SYST:BEEP",
+    "DATA:DEL",
+)
+SAFE = (  # queries that never change a setting
+    "*IDN?",
+    "*OPC?",
+    "*OPT?",
+    "*STB?",
+    "*ESR?",
+    "*ESE?",
+    "*SRE?",
+    "SYST:ERR",
+    "SYSTEM:ERROR",
+    "READ?",
+    "FETC",
+)
+EXPIRY = 300.0  # seconds a remembered setting is trusted (front panel)
+
+
+class Cache(StrEnum):
+    """State cache scope enumerated constants."""
+
+    OFF = "off"
+    SETUP = "setup"  # setup phases only
+    ALL = "all"
+
+
+def split(scpi: str) -> list[str]:
+    """
+    Messages of a ';' separated program message with their headers
+    made absolute (i.e. SOUR:VOLT 3;CURR 1 is SOUR:VOLT 3, SOUR:CURR
+    1). Quoted parameters may hold a ';', so they stay whole.
+    """
+
+    scpi = scpi.strip()
+    if '"' in scpi or "'" in scpi:
+        return [scpi]
+    messages = []
+    path = ""
+    for message in scpi.split(";"):
+        message = message.strip()
+        if not message:
+            continue
+        if message.startswith("*"):
+            messages.append(message)  # common commands keep the path
+            continue
+        if message.startswith(":"):
+            message = message[1:]
+        elif path:
+            message = f"{path}:{message}"
+        path = message.split(maxsplit=1)[0].rpartition(":")[0]
+        messages.append(message)
+    return messages
+
+
+def header(scpi: str) -> str:
+    """
+    Program header (and channel list) identifying the setting a
+    single message writes.
+    """
+
+    name = scpi.split(maxsplit=1)[0].lstrip(":").upper()
+    start = scpi.find("(@")
+    if start >= 0:
+        name += scpi[start:scpi.find(")", start) + 1]
+    return name
+
+
+def setting(message: str) -> bool:
+    """
+    Whether a single message sets a value: a header with parameters
+    that is neither a query, a reset nor an event or action (i.e.
+    INIT, which must run every time).
+    """
+
+    if "?" in message or len(message.split(maxsplit=1)) < 2:
+        return False
+    return not header(message).startswith(RESETS + ACTIONS)
+
+
+def safe(scpi: str, written=()) -> bool:
+    """
+    Whether a query leaves every setting as it was: a known safe query
+    or the read back of a written setting (i.e. VOLT:RANG? after
+    VOLT:RANG 10). Any other query (i.e. MEAS?, which configures the
+    measurement first) may change settings.
+    """
+
+    name = header(scpi)
+    return name.startswith(SAFE) or name.replace("?", "") in written
+
+
+def redundant(settings: dict, scpi: str) -> bool:
+    """
+    Whether a command only writes settings already in effect, per the
+    settings last written over a pooled connection within the expiry.
+    The state lives on the connection, so a reconnect, or a timeout
+    or error that discards it, forgets it.
+    """
+
+    messages = split(scpi)
+    if not messages or not all(map(setting, messages)):
+        return False  # queries, events and actions are always sent
+    now = monotonic()
+    for message in messages:
+        written = settings.get(header(message))
+        if written is None or written[0] != message \
+                or now - written[1] >= EXPIRY:
+            return False
+    return True
+
+
+def remember(settings: dict, scpi: str) -> None:
+    """
+    Record the settings a command writes, message by message, or
+    forget every setting after a reset or a query that is not safe.
+    """
+
+    now = monotonic()
+    for message in split(scpi):
+        name = header(message)
+        if "?" in message:
+            if not safe(message, settings):
+                settings.clear()
+        elif name.startswith(RESETS):
+            settings.clear()
+        elif setting(message):
+            settings[name] = (message, now)
+
+
+def cacheable(recipe, scope: str) -> bool:
+    """Whether a step may be suppressed under the cache scope."""
+
+    if recipe["phase_teardown"]:
+        return False  # safe state commands are always sent
+    if scope == Cache.ALL:
+        return True
+    return scope == Cache.SETUP and bool(recipe["phase_setup"])
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+SPDX-FileCopyrightText: 2025 Michael Czigler
+SPDX-License-Identifier: BSD-3-Clause
+
+Instrument synchronization strategies.
+"""
+
+from enum import StrEnum
+from time import monotonic
+from time import sleep
+
+INTERVAL = 0.01  # seconds between polls
+
+
+class SyncError(RuntimeError):
+    """Raised when an instrument does not synchronize in time."""
+
+
+class Sync(StrEnum):
+    """Synchronization strategy enumerated constants."""
+
+    OPC = "opc"
+    STB = "stb"
+    STABLE = "stable"
+
+
+def deadline(timeout: int) -> float:
+    return monotonic() + timeout / 1000
+
+
+def wait_opc(tcp, timeout: int) -> None:
+    """
+    Query *OPC? until the pending operations complete. An instrument
+    only answers once they have, so each query reads with the time
+    left before the deadline instead of the transport's read timeout.
+    """
+
+    expires = deadline(timeout)
+    read_timeout = tcp.read_timeout
+    try:
+        while True:
+            tcp.set_read_timeout(max(expires - monotonic(), INTERVAL))
+            try:
+                if tcp.query(b"*OPC?\n").strip() == b"1":
+                    return
+            except TimeoutError as error:
+                raise SyncError("*OPC? timeout") from error
+            if monotonic() > expires:
+                raise SyncError("*OPC? timeout")
+            sleep(INTERVAL)
+    finally:
+        tcp.set_read_timeout(read_timeout)
+
+
+def wait_stb(tcp, mask: int, timeout: int) -> None:
+    """
+    Poll the status byte until any bit of the mask is set, using the
+    transport's out-of-band status read when it has one.
+    """
+
+    expires = deadline(timeout)
+    status = getattr(tcp, "status", None)
+    while True:
+        stb = status() if status else int(tcp.query(b"*STB?\n").strip())
+        if stb & mask:
+            return
+        if monotonic() > expires:
+            raise SyncError("*STB? timeout")
+        sleep(INTERVAL)
+
+
+def wait_stable(
+    tcp,
+    scpi: bytes,
+    response: bytes,
+    tolerance: float,
+    timeout: int,
+) -> bytes:
+    """
+    Repeat a query until two consecutive readings agree within the
+    tolerance and return the last response.
+    """
+
+    expires = deadline(timeout)
+    while True:
+        sleep(INTERVAL)
+        previous, response = response, tcp.query(scpi)
+        if abs(float(response) - float(previous)) <= tolerance:
+            return response
+        if monotonic() > expires:
+            raise SyncError("unstable reading")
+
+
+def synchronize(tcp, recipe) -> None:
+    """Wait for operation completion or a status byte mask."""
+
+    strategy = recipe["command_sync"]
+    timeout = recipe["command_sync_timeout"]
+    if strategy == Sync.OPC:
+        wait_opc(tcp, timeout)
+    elif strategy == Sync.STB:
+        wait_stb(tcp, recipe["command_sync_mask"] or 0, timeout)
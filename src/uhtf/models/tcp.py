@@ -8,37 +8,37 @@ SPDX-License-Identifier: BSD-3-Clause
 TCP Instrumentation socket model.
 """
 
-from socket import AF_INET
 from socket import SHUT_RDWR
-from socket import SOCK_STREAM
-from socket import socket
 
-class TCP:
+from .transport import Transport
+
+
+class TCP(Transport):
     """TCP instrumentation socket."""
 
-    def __init__(self, hostname: str, port: int) -> None:
-        self.hostname = hostname
-        self.port = port
-        self.sock = None
+    label = "Raw Socket (SCPI over TCP)"
 
-    def __enter__(self) -> "TCP":
-        self.sock = socket(AF_INET, SOCK_STREAM)
-        self.sock.settimeout(5)  # 5 second timeout
-        self.sock.connect((self.hostname, self.port))
-        return self
+    def connect(self) -> None:
+        self.sock = self.open_socket(self.port)
 
-    def __exit__(self, *excinfo) -> None:
-        self.sock.shutdown(SHUT_RDWR)
+    def close(self) -> None:
+        try:
+            self.sock.shutdown(SHUT_RDWR)
+        except OSError:
+            pass  # peer already closed
         self.sock.close()
+        self.sock = None
 
     def send(self, command: bytes) -> None:
         self.sock.sendall(command)
 
-    def query(self, command: bytes) -> bytes:
-        buffer = bytes(0)
-        self.sock.sendall(command)
+    def read(self) -> bytes:
+        buffer = bytearray()
         while True:
-            buffer += self.sock.recv(4096)
+            chunk = self.sock.recv(4096)
+            if not chunk:
+                raise ConnectionResetError("connection closed")
+            buffer += chunk
             if buffer[-1:] == b"\n":
                 break  # EOL found
-        return buffer
+        return bytes(buffer)
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+SPDX-FileCopyrightText: 2025 Michael Czigler
+SPDX-License-Identifier: BSD-3-Clause
+
+Timing spans, metrics and profiling models.
+"""
+
+from bisect import bisect_left
+from contextlib import contextmanager
+from cProfile import Profile
+from os import makedirs
+from os.path import dirname
+from threading import Lock
+from time import perf_counter_ns
+
+BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+@contextmanager
+def timer(spans: dict, name: str):
+    """Accumulate the monotonic duration (ns) of a block into spans."""
+
+    start = perf_counter_ns()
+    try:
+        yield
+    finally:
+        spans[name] = spans.get(name, 0) + perf_counter_ns() - start
+
+
+@contextmanager
+def profile(path: str, mode: str):
+    """Capture a cProfile or pyinstrument profile of a block."""
+
+    if mode in ("cprofile", "pyinstrument"):
+        makedirs(dirname(path), exist_ok=True)
+    if mode == "cprofile":
+        profiler = Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            profiler.dump_stats(f"{path}.prof")
+    elif mode == "pyinstrument":
+        from pyinstrument import Profiler  # optional dependency
+
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            with open(f"{path}.html", "w") as file:
+                file.write(profiler.output_html())
+    else:
+        yield
+
+
+class Histogram:
+    """Cumulative histogram."""
+
+    def __init__(self, buckets: tuple = BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+
+    @property
+    def mean(self) -> float | None:
+        if self.count == 0:
+            return None
+        return self.total / self.count
+
+
+def escape(value) -> str:
+    value = str(value).replace("\\", "\\\\")
+    return value.replace("\n", "\\n").replace('"', '\\"')
+
+
+class Metrics:
+    """Prometheus-style metrics registry."""
+
+    def __init__(self) -> None:
+        self.histograms = {}
+        self.lock = Lock()
+
+    def observe(self, name: str, labels: dict, value: float) -> None:
+        """Observe a value (seconds) for a labelled histogram."""
+
+        key = (name, tuple(labels.items()))
+        with self.lock:
+            if key not in self.histograms:
+                self.histograms[key] = Histogram()
+            self.histograms[key].observe(value)
+
+    def get(self, name: str, **labels) -> Histogram | None:
+        return self.histograms.get((name, tuple(labels.items())))
+
+    def render(self) -> str:
+        """Render metrics in the Prometheus text exposition format."""
+
+        lines = []
+        with self.lock:
+            items = sorted(self.histograms.items())
+            for (name, labels), histogram in items:
+                if f"# TYPE {name} histogram" not in lines:
+                    lines.append(f"# TYPE {name} histogram")
+                pairs = [f'{k}="{escape(v)}"' for k, v in labels]
+                cumulative = 0
+                bounds = [*map(str, histogram.buckets), "+Inf"]
+                for bound, count in zip(bounds, histogram.counts):
+                    cumulative += count
+                    le = ",".join([*pairs, f'le="{bound}"'])
+                    lines.append(f"{name}_bucket{{{le}}} {cumulative}")
+                label = "{" + ",".join(pairs) + "}" if pairs else ""
+                lines.append(f"{name}_sum{label} {histogram.total}")
+                lines.append(f"{name}_count{label} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+SPDX-FileCopyrightText: 2025 Michael Czigler
+SPDX-License-Identifier: BSD-3-Clause
+
+Instrument transport base model.
+"""
+
+from abc import ABC
+from abc import abstractmethod
+from select import select
+from socket import AF_INET
+from socket import IPPROTO_TCP
+from socket import SOCK_STREAM
+from socket import socket
+from socket import TCP_NODELAY
+
+
+class Transport(ABC):
+    """Instrument transport."""
+
+    label = ""  # shown when choosing a transport, defaults to its name
+
+    def __init__(
+        self,
+        hostname: str,
+        port: int,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 5.0,
+    ) -> None:
+        self.hostname = hostname
+        self.port = port
+        self.connect_timeout = connect_timeout  # seconds
+        self.read_timeout = read_timeout  # seconds
+        self.sock = None
+        self.settings = {}  # header -> (last setting written, when)
+
+    def __enter__(self) -> "Transport":
+        if self.sock is None:
+            self.connect()
+        return self
+
+    def __exit__(self, *excinfo) -> None:
+        self.close()
+
+    def open_socket(self, port: int) -> socket:
+        """Open a TCP socket honouring the connect and read timeouts."""
+
+        sock = socket(AF_INET, SOCK_STREAM)
+        sock.setsockopt(IPPROTO_TCP, TCP_NODELAY, 1)  # short messages
+        sock.settimeout(self.connect_timeout)
+        try:
+            sock.connect((self.hostname, port))
+        except OSError:
+            sock.close()
+            raise
+        sock.settimeout(self.read_timeout)
+        return sock
+
+    def stale(self) -> bool:
+        """
+        Whether an idle connection is unusable: closed by the instrument
+        or holding unread bytes (i.e. a late response), which the next
+        query would otherwise take for its own.
+        """
+
+        if self.sock is None:
+            return True
+        try:
+            readable, _, _ = select([self.sock], [], [], 0)
+            return bool(readable)
+        except (OSError, ValueError):
+            return True
+
+    def set_read_timeout(self, seconds: float) -> None:
+        """Change the read timeout of the open connection."""
+
+        self.read_timeout = seconds
+        if self.sock is not None:
+            self.sock.settimeout(seconds)
+
+    @abstractmethod
+    def connect(self) -> None:
+        """Open the connection (and perform any handshake)."""
+
+    @abstractmethod
+    def close(self) -> None:
+        """Close the connection."""
+
+    @abstractmethod
+    def send(self, command: bytes) -> None:
+        """Send a newline terminated command."""
+
+    @abstractmethod
+    def read(self) -> bytes:
+        """Read a complete response."""
+
+    def query(self, command: bytes) -> bytes:
+        self.send(command)
+        return self.read()
+
+
+def recv_exactly(sock: socket, size: int) -> bytes:
+    """Receive exactly size bytes from a socket."""
+
+    buffer = bytearray()
+    while len(buffer) < size:
+        chunk = sock.recv(size - len(buffer))
+        if not chunk:
+            raise ConnectionResetError("connection closed")
+        buffer += chunk
+    return bytes(buffer)
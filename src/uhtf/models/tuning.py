@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+SPDX-FileCopyrightText: 2025 Michael Czigler
+SPDX-License-Identifier: BSD-3-Clause
+
+Command latency tracking and delay tuning.
+"""
+
+from collections import deque
+from enum import StrEnum
+from math import ceil
+from threading import Lock
+from time import monotonic
+from time import sleep
+
+WINDOW = 256  # most recent samples kept per command
+MINIMUM = 20  # settle samples before a delay is proposed
+MARGIN = 1.25  # proposed delay over the p99 settling time
+INTERVAL = 0.005  # seconds between settling probes
+OBSERVABLE = ("MEAS",)  # queries repeatable without side effects
+
+
+class Tuning(StrEnum):
+    """Delay tuning mode enumerated constants."""
+
+    OFF = "off"
+    OBSERVE = "observe"  # probe settling during the configured delay
+    APPLY = "apply"  # use the proposed delay once known
+
+
+class Window:
+    """Rolling window of recent samples answering percentiles."""
+
+    def __init__(self, size: int = WINDOW) -> None:
+        self.samples = deque(maxlen=size)
+        self.count = 0  # total observed, including evicted samples
+
+    def add(self, value: float) -> None:
+        self.samples.append(value)
+        self.count += 1
+
+    def percentile(self, q: float) -> float | None:
+        """Nearest-rank percentile (0-100) of the window."""
+
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        rank = max(ceil(q / 100 * len(ordered)), 1)
+        return ordered[rank - 1]
+
+
+class Tuner:
+    """
+    Rolling response and settling times by (instrument, command),
+    proposing the minimal safe fixed delay.
+    """
+
+    def __init__(self) -> None:
+        self.windows = {}
+        self.lock = Lock()
+
+    def observe(
+        self,
+        instrument: str,
+        command: str,
+        kind: str,
+        seconds: float,
+    ) -> None:
+        key = (instrument, command, kind)
+        with self.lock:
+            if key not in self.windows:
+                self.windows[key] = Window()
+            self.windows[key].add(seconds)
+
+    def get(self, instrument: str, command: str, kind: str) -> Window | None:
+        return self.windows.get((instrument, command, kind))
+
+    def propose(self, instrument: str, command: str, delay: int) -> int | None:
+        """
+        Proposed delay (ms) from the p99 settling time with a margin,
+        never above the configured delay; None until enough samples.
+        """
+
+        window = self.get(instrument, command, "settle")
+        if window is None or len(window.samples) < MINIMUM:
+            return None
+        return min(ceil(window.percentile(99) * MARGIN * 1000), delay)
+
+    def report(self, recipes: list) -> list[dict]:
+        """Delay proposals of every delayed command in the recipes."""
+
+        occurrences = {}
+        for recipe in recipes:
+            if recipe["command_sync"] or not recipe["command_delay"]:
+                continue
+            key = (
+                recipe["instrument_name"],
+                recipe["command_name"],
+                recipe["command_delay"],
+            )
+            occurrences[key] = occurrences.get(key, 0) + 1
+        rows = []
+        for (instrument, command, delay), count in occurrences.items():
+            row = {
+                "instrument": instrument,
+                "command": command,
+                "delay": delay,
+                "occurrences": count,
+            }
+            for kind in ("response", "settle"):
+                window = self.get(instrument, command, kind)
+                row[f"{kind}_samples"] = len(window.samples) if window else 0
+                for q in (50, 99):
+                    value = window.percentile(q) if window else None
+                    row[f"{kind}_p{q}"] = value
+            proposed = self.propose(instrument, command, delay)
+            row["proposed"] = proposed
+            row["saving"] = None
+            if proposed is not None:
+                row["saving"] = (delay - proposed) * count / 1000
+            rows.append(row)
+        return rows
+
+
+def probe(recipe, following: list):
+    """
+    The query used to observe settling after a delayed write: the next
+    step, when it reads a single value from the same instrument with
+    a query known to be safe to repeat. Queries that consume readings
+    or clear registers (i.e. READ?, FETC?, SYST:ERR? or *ESR?) are
+    never observed, since the step would then see a different answer.
+    """
+
+    if not following or "?" in recipe["command_scpi"]:
+        return None
+    candidate = following[0]
+    scpi = candidate["command_scpi"].strip().upper()
+    if "?" not in scpi or ";" in scpi or not scpi.startswith(OBSERVABLE):
+        return None
+    if candidate["measurement_name"] is None \
+            or candidate["measurement_aggregate"]:
+        return None  # not a single reading
+    address = ("instrument_hostname", "instrument_port")
+    if any(candidate[key] != recipe[key] for key in address):
+        return None
+    return candidate
+
+
+def stabilize(
+    connection,
+    scpi: bytes,
+    tolerance: float,
+    budget: float,
+) -> float:
+    """
+    Seconds until two consecutive readings of a query agree within the
+    tolerance, or the whole budget when they do not settle within it.
+    """
+
+    start = monotonic()
+    previous = float(connection.query(scpi))
+    while monotonic() - start < budget:
+        sleep(INTERVAL)
+        reading = float(connection.query(scpi))
+        if abs(reading - previous) <= tolerance:
+            return monotonic() - start
+        previous = reading
+    return budget
+
+
+tuner = Tuner()
@@ -0,0 +1,35 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+SPDX-FileCopyrightText: 2025 Michael Czigler
+SPDX-License-Identifier: BSD-3-Clause
+
+Unix domain socket instrumentation transport model.
+"""
+
+from socket import AF_UNIX
+from socket import SOCK_STREAM
+from socket import socket
+
+from .tcp import TCP
+
+
+class Unix(TCP):
+    """
+    Newline terminated SCPI over a Unix domain socket. The hostname
+    is the socket path and the port is ignored.
+    """
+
+    label = "Unix Socket (hostname is the socket path)"
+
+    def connect(self) -> None:
+        sock = socket(AF_UNIX, SOCK_STREAM)
+        sock.settimeout(self.connect_timeout)
+        try:
+            sock.connect(self.hostname)
+        except OSError:
+            sock.close()
+            raise
+        sock.settimeout(self.read_timeout)
+        self.sock = sock
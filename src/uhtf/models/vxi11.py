@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+SPDX-FileCopyrightText: 2025 Michael Czigler
+SPDX-License-Identifier: BSD-3-Clause
+
+VXI-11 (ONC RPC) instrumentation transport model.
+"""
+
+from enum import IntEnum
+from itertools import count
+from struct import pack
+from struct import unpack_from
+
+from .transport import recv_exactly
+from .transport import Transport
+
+PORTMAPPER = 100000
+PORTMAPPER_GETPORT = 3
+CORE = 0x0607AF
+VERSION = 1
+IPPROTO_TCP = 6
+LAST_FRAGMENT = 0x80000000
+FLAG_END = 0x08
+REASON_END = 0x04
+
+
+class Procedure(IntEnum):
+    """VXI-11 core channel procedure enumerated constants."""
+
+    CREATE_LINK = 10
+    DEVICE_WRITE = 11
+    DEVICE_READ = 12
+    DEVICE_READSTB = 13
+    DESTROY_LINK = 23
+
+
+def opaque(data: bytes) -> bytes:
+    """XDR variable-length opaque data (also used for strings)."""
+
+    padding = b"\0" * (-len(data) % 4)
+    return pack(">I", len(data)) + data + padding
+
+
+def unpack_opaque(data: bytes, offset: int) -> tuple[bytes, int]:
+    (length,) = unpack_from(">I", data, offset)
+    start = offset + 4
+    return data[start:start + length], start + length + (-length % 4)
+
+
+class RPC:
+    """Minimal ONC RPC client over a record-marked TCP stream."""
+
+    xids = count(1)
+
+    def __init__(self, sock, program: int, version: int) -> None:
+        self.sock = sock
+        self.program = program
+        self.version = version
+
+    def call(self, procedure: int, arguments: bytes) -> bytes:
+        xid = next(self.xids) & 0xFFFFFFFF
+        message = pack(
+            ">10I",
+            xid,
+            0,  # CALL
+            2,  # RPC version
+            self.program,
+            self.version,
+            procedure,
+            0, 0,  # AUTH_NULL credentials
+            0, 0,  # AUTH_NULL verifier
+        ) + arguments
+        self.sock.sendall(pack(">I", LAST_FRAGMENT | len(message)) + message)
+        reply = bytearray()
+        while True:
+            (marker,) = unpack_from(">I", recv_exactly(self.sock, 4))
+            reply += recv_exactly(self.sock, marker & ~LAST_FRAGMENT)
+            if marker & LAST_FRAGMENT:
+                break
+        reply_xid, kind, status = unpack_from(">3I", reply)
+        if reply_xid != xid or kind != 1 or status != 0:
+            raise ConnectionError("VXI-11 RPC call rejected")
+        _, offset = unpack_opaque(reply, 16)  # verifier body
+        (accepted,) = unpack_from(">I", reply, offset)
+        if accepted != 0:
+            raise ConnectionError(f"VXI-11 RPC call failed ({accepted})")
+        return bytes(reply[offset + 4:])
+
+
+class VXI11(Transport):
+    """VXI-11 core channel. The port is the portmapper port (111)."""
+
+    label = "VXI-11 (port is the portmapper, i.e. 111)"
+
+    def __init__(self, *args, device: str = "inst0", **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.device = device
+        self.link = None
+        self.max_receive = 0
+        self.rpc = None
+
+    @property
+    def timeout_millis(self) -> int:
+        return int(self.read_timeout * 1000)
+
+    def connect(self) -> None:
+        mapper = self.open_socket(self.port)
+        try:
+            result = RPC(mapper, PORTMAPPER, 2).call(
+                PORTMAPPER_GETPORT,
+                pack(">4I", CORE, VERSION, IPPROTO_TCP, 0),
+            )
+        finally:
+            mapper.close()
+        (port,) = unpack_from(">I", result)
+        if port == 0:
+            raise ConnectionRefusedError("VXI-11 core channel unavailable")
+        self.sock = self.open_socket(port)
+        try:
+            self.rpc = RPC(self.sock, CORE, VERSION)
+            result = self.rpc.call(
+                Procedure.CREATE_LINK,
+                pack(">iiI", 0, 0, 0) + opaque(self.device.encode()),
+            )
+            error, link, _, max_receive = unpack_from(">iiII", result)
+            if error:
+                raise ConnectionError(f"VXI-11 create_link error {error}")
+        except BaseException:
+            self.close()  # no link was created, only close the socket
+            raise
+        self.link, self.max_receive = link, max_receive
+
+    def close(self) -> None:
+        if self.link is not None:
+            try:
+                self.rpc.call(Procedure.DESTROY_LINK, pack(">i", self.link))
+            except OSError:
+                pass  # best effort
+        if self.sock is not None:
+            self.sock.close()
+        self.sock = self.rpc = self.link = None
+
+    def send(self, command: bytes) -> None:
+        chunk = self.max_receive or len(command)
+        for start in range(0, len(command), chunk):
+            data = command[start:start + chunk]
+            flags = FLAG_END if start + chunk >= len(command) else 0
+            result = self.rpc.call(
+                Procedure.DEVICE_WRITE,
+                pack(">iIII", self.link, self.timeout_millis, 0, flags)
+                + opaque(data),
+            )
+            (error,) = unpack_from(">i", result)
+            if error:
+                raise ConnectionError(f"VXI-11 device_write error {error}")
+
+    def read(self) -> bytes:
+        buffer = bytearray()
+        while True:
+            arguments = pack(
+                ">iIIIII",
+                self.link,
+                0x10000,  # request size
+                self.timeout_millis,
+                0,  # lock timeout
+                0,  # flags
+                0,  # termination character
+            )
+            result = self.rpc.call(Procedure.DEVICE_READ, arguments)
+            error, reason = unpack_from(">iI", result)
+            if error:
+                raise ConnectionError(f"VXI-11 device_read error {error}")
+            data, _ = unpack_opaque(result, 8)
+            buffer += data
+            if reason & REASON_END:
+                return bytes(buffer)
+
+    def status(self) -> int:
+        """Read the status byte with device_readstb."""
+
+        result = self.rpc.call(
+            Procedure.DEVICE_READSTB,
+            pack(">iIII", self.link, 0, 0, self.timeout_millis),
+        )
+        error, stb = unpack_from(">iI", result)
+        if error:
+            raise ConnectionError(f"VXI-11 device_readstb error {error}")
+        return stb & 0xFF
@@ -17,10 +17,54 @@ from quart import url_for
 
 from .authorize import login_required
 from .database import get_db
+from .models.directory import directory
 
 part = Blueprint("part", __name__)
 
 
+def mode_defaults(form: dict) -> dict:
+    """Fill the optional run mode (inherited from the station)."""
+
+    form["run_mode"] = form.get("run_mode") or None
+    return form
+
+
+def get_directory():
+    """Part directory, loaded from the database on first use."""
+
+    if not directory.loaded:
+        directory.load(get_db().execute("SELECT * FROM part").fetchall())
+    return directory
+
+
+def refresh(db, id) -> None:
+    """Refresh a single part of the directory after a write."""
+
+    if not directory.loaded:
+        return  # loaded in full on first use
+    row = db.execute("SELECT * FROM part WHERE id = ?", (id,)).fetchone()
+    if row is None:
+        directory.discard(int(id))
+    else:
+        directory.put(row)
+
+
+@part.before_app_serving
+async def load() -> None:
+    """Load the part directory before serving the first scan."""
+
+    get_directory()
+
+
+@part.after_app_request
+async def invalidate(response):
+    """Drop cached recipes after any request that may have written."""
+
+    if request.method not in ("GET", "HEAD", "OPTIONS"):
+        directory.invalidate()
+    return response
+
+
 @part.get("/part")
 @login_required
 async def read() -> tuple:
@@ -42,27 +86,30 @@ async def read() -> tuple:
 async def create() -> tuple:
     """Create part callback."""
 
-    form = (await request.form).copy().to_dict()
+    form = mode_defaults((await request.form).copy().to_dict())
     try:
         db = get_db()
         db.execute("PRAGMA foreign_keys = ON")
-        db.execute(
+        cursor = db.execute(
             """
             INSERT INTO part (
                 name,
                 global_trade_item_number,
                 number,
-                revision
+                revision,
+                run_mode
             ) VALUES (
                 :name,
                 :global_trade_item_number,
                 :number,
-                :revision
+                :revision,
+                :run_mode
             )
             """,
             form,
         )
         db.commit()
+        refresh(db, cursor.lastrowid)
     except db.ProgrammingError:
         await flash("Missing parameter(s).", "warning")
     except db.IntegrityError:
@@ -81,6 +128,7 @@ async def delete():
     for id in part_ids:
         db.execute("DELETE FROM part WHERE id = ?", (id,))
         db.commit()
+        refresh(db, id)
     return redirect(url_for(".read"))
 
 
@@ -89,7 +137,7 @@ async def delete():
 async def update() -> tuple:
     """Update part callback."""
 
-    form = (await request.form).copy().to_dict()
+    form = mode_defaults((await request.form).copy().to_dict())
     try:
         db = get_db()
         db.execute("PRAGMA foreign_keys = ON")
@@ -100,12 +148,14 @@ async def update() -> tuple:
                 name = :name,
                 global_trade_item_number = :global_trade_item_number,
                 number = :number,
-                revision = :revision
+                revision = :revision,
+                run_mode = :run_mode
             WHERE id = :id
             """,
             form,
         )
         db.commit()
+        refresh(db, form["id"])
     except db.ProgrammingError:
         await flash("Missing parameter(s).", "warning")
     except db.IntegrityError:
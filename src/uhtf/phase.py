@@ -17,8 +17,26 @@ from quart import url_for
 
 from .authorize import login_required
 from .database import get_db
+from .models.base import PhaseResult
 
 phase = Blueprint("phase", __name__)
+policies = (PhaseResult.FAIL_AND_CONTINUE, PhaseResult.STOP)  # supported
+
+
+def result_defaults(form: dict) -> dict:
+    """
+    Fill optional phase result policy parameters, raising ValueError
+    for a failure policy the run does not act on.
+    """
+
+    form["retries"] = form.get("retries") or 0
+    form["on_failure"] = form.get("on_failure") or "FAIL_AND_CONTINUE"
+    if form["on_failure"] not in policies:
+        raise ValueError(f"unsupported failure policy {form['on_failure']}")
+    form["prerequisite_id"] = form.get("prerequisite_id") or None
+    form["setup"] = 1 if form.get("setup") else 0
+    form["teardown"] = 1 if form.get("teardown") else 0
+    return form
 
 
 @phase.get("/phase")
@@ -28,7 +46,13 @@ async def read() -> tuple:
 
     phases = get_db().execute(
         """
-        SELECT * FROM phase
+        SELECT
+            phase.*,
+            prerequisite.name AS prerequisite_name
+        FROM
+            phase
+        OUTER LEFT JOIN
+            phase AS prerequisite ON prerequisite.id = phase.prerequisite_id
         """
     ).fetchall()
     return await render_template(
@@ -42,16 +66,30 @@ async def read() -> tuple:
 async def create() -> tuple:
     """Create phase callback."""
 
-    form = (await request.form).copy().to_dict()
+    try:
+        form = result_defaults((await request.form).copy().to_dict())
+    except ValueError:
+        await flash("Invalid parameter(s).", "warning")
+        return redirect(url_for(".read"))
     try:
         db = get_db()
         db.execute("PRAGMA foreign_keys = ON")
         db.execute(
             """
             INSERT INTO phase (
-                name
+                name,
+                retries,
+                on_failure,
+                prerequisite_id,
+                setup,
+                teardown
             ) VALUES (
-                :name
+                :name,
+                :retries,
+                :on_failure,
+                :prerequisite_id,
+                :setup,
+                :teardown
             )
             """,
             form,
@@ -83,7 +121,11 @@ async def delete():
 async def update() -> tuple:
     """Update phase callback."""
 
-    form = (await request.form).copy().to_dict()
+    try:
+        form = result_defaults((await request.form).copy().to_dict())
+    except ValueError:
+        await flash("Invalid parameter(s).", "warning")
+        return redirect(url_for(".read"))
     try:
         db = get_db()
         db.execute("PRAGMA foreign_keys = ON")
@@ -91,7 +133,12 @@ async def update() -> tuple:
             """
             UPDATE phase SET
                 updated_at = CURRENT_TIMESTAMP,
-                name = :name
+                name = :name,
+                retries = :retries,
+                on_failure = :on_failure,
+                prerequisite_id = :prerequisite_id,
+                setup = :setup,
+                teardown = :teardown
             WHERE id = :id
             """,
             form,
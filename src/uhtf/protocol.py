@@ -8,15 +8,25 @@ SPDX-License-Identifier: BSD-3-Clause
 Protocol endpoints.
 """
 
+from json import dumps
+from urllib.request import urlopen
+
+from click import argument
+from click import echo
+from click import option
 from quart import Blueprint
 from quart import flash
 from quart import redirect
 from quart import render_template
 from quart import request
 from quart import url_for
+from quart.cli import with_appcontext
 
 from .authorize import login_required
+from .automatic import recipes
 from .database import get_db
+from .models.analyze import analyze
+from .models.analyze import parse_history
 
 protocol = Blueprint("protocol", __name__)
 
@@ -178,3 +188,52 @@ async def update():
     except db.IntegrityError:
         await flash("Invalid parameter(s).", "warning")
     return redirect(url_for(".read"))
+
+
+@protocol.cli.command("analyze")
+@argument("name")
+@option("--metrics", help="Station /metrics URL for latency history.")
+@option("--json", "as_json", is_flag=True, help="Print the JSON report.")
+@with_appcontext
+def analyze_command(name: str, metrics: str, as_json: bool) -> None:
+    """
+    Dry run the protocol of a part (by name): validate every step and
+    estimate its cycle time without touching an instrument.
+    """
+
+    part = get_db().execute(
+        "SELECT id FROM part WHERE name = ?",
+        (name,),
+    ).fetchone()
+    if part is None:
+        raise SystemExit(f"Part {name!r} does not exist.")
+    latencies = {}
+    if metrics:
+        with urlopen(metrics, timeout=10) as response:
+            latencies = parse_history(response.read().decode())
+    rows, slots = recipes(part["id"])
+    report = analyze(rows, latencies, slots)
+    if as_json:
+        echo(dumps(report, indent=2))
+        return
+    for phase in report["phases"]:
+        steps, estimate = phase["steps"], phase["estimate"]
+        echo(f"{phase['name']}\t{steps} steps\t{estimate:.3f} s")
+    echo(
+        f"estimate {report['estimate']:.3f} s "
+        f"({report['parallel_estimate']:.3f} s with concurrent "
+        f"instruments), {report['unmeasured']} steps without history"
+    )
+    for finding in report["findings"]:
+        where = "/".join(
+            value for value in (
+                finding["phase"],
+                finding["command"],
+                finding["instrument"],
+            ) if value
+        )
+        saving = finding["saving"]
+        suffix = f" (-{saving:.3f} s)" if saving else ""
+        echo(f"{finding['severity']}\t{where}: {finding['message']}{suffix}")
+    if not report["valid"]:
+        raise SystemExit(1)
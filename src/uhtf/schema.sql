@@ -1,6 +1,7 @@
 -- Initialize the database.
 -- Drop any existing data and create empty tables.
 
+DROP TABLE IF EXISTS archive;
 DROP TABLE IF EXISTS command;
 DROP TABLE IF EXISTS instrument;
 DROP TABLE IF EXISTS measurement;
@@ -8,6 +9,16 @@ DROP TABLE IF EXISTS part;
 DROP TABLE IF EXISTS phase;
 DROP TABLE IF EXISTS protocol;
 DROP TABLE IF EXISTS setting;
+DROP TABLE IF EXISTS slot;
+
+CREATE TABLE archive (
+    id INTEGER PRIMARY KEY,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    serial_number TEXT DEFAULT NULL,
+    part_number TEXT DEFAULT NULL,
+    run_passed INTEGER NOT NULL,
+    procedure TEXT NOT NULL
+);
 
 CREATE TABLE command (
     id INTEGER PRIMARY KEY,
@@ -15,7 +26,11 @@ CREATE TABLE command (
     updated_at DATETIME DEFAULT NULL,
     name TEXT UNIQUE NOT NULL,
     scpi TEXT UNIQUE NOT NULL,
-    delay INTEGER DEFAULT 0
+    delay INTEGER DEFAULT 0,
+    sync TEXT DEFAULT NULL,
+    sync_timeout INTEGER DEFAULT 5000,
+    sync_mask INTEGER DEFAULT NULL,
+    sync_tolerance REAL DEFAULT NULL
 );
 
 CREATE TABLE instrument (
@@ -23,8 +38,14 @@ CREATE TABLE instrument (
     created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
     updated_at DATETIME DEFAULT NULL,
     name TEXT UNIQUE NOT NULL,
-    hostname TEXT UNIQUE NOT NULL,
-    port INTEGER DEFAULT 5025
+    hostname TEXT NOT NULL,
+    port INTEGER DEFAULT 5025,
+    transport TEXT DEFAULT 'tcp',
+    connect_timeout INTEGER DEFAULT 5000,
+    read_timeout INTEGER DEFAULT 5000,
+    retries INTEGER DEFAULT 0,
+    failure_threshold INTEGER DEFAULT 3,
+    UNIQUE(hostname, port)
 );
 
 CREATE TABLE measurement (
@@ -35,7 +56,8 @@ CREATE TABLE measurement (
     precision INTEGER NOT NULL,
     units TEXT DEFAULT NULL,
     lower_limit REAL DEFAULT NULL,
-    upper_limit REAL DEFAULT NULL
+    upper_limit REAL DEFAULT NULL,
+    aggregate TEXT DEFAULT NULL
 );
 
 CREATE TABLE part (
@@ -45,14 +67,21 @@ CREATE TABLE part (
     name TEXT UNIQUE NOT NULL,
     global_trade_item_number TEXT UNIQUE NOT NULL,
     number TEXT UNIQUE NOT NULL,
-    revision TEXT NOT NULL
+    revision TEXT NOT NULL,
+    run_mode TEXT DEFAULT NULL
 );
 
 CREATE TABLE phase (
     id INTEGER PRIMARY KEY,
     created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
     updated_at DATETIME DEFAULT NULL,
-    name TEXT UNIQUE NOT NULL
+    name TEXT UNIQUE NOT NULL,
+    retries INTEGER DEFAULT 0,
+    on_failure TEXT DEFAULT 'FAIL_AND_CONTINUE',
+    prerequisite_id INTEGER DEFAULT NULL,
+    setup INTEGER DEFAULT 0,
+    teardown INTEGER DEFAULT 0,
+    FOREIGN KEY(prerequisite_id) REFERENCES phase(id) ON DELETE SET NULL ON UPDATE NO ACTION
 );
 
 CREATE TABLE protocol (
@@ -71,6 +100,21 @@ CREATE TABLE protocol (
     FOREIGN KEY(phase_id) REFERENCES phase(id) ON DELETE CASCADE ON UPDATE NO ACTION
 );
 
+CREATE TABLE slot (
+    id INTEGER PRIMARY KEY,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT NULL,
+    part_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    instrument_id INTEGER NOT NULL,
+    mapped_instrument_id INTEGER DEFAULT NULL,
+    channel TEXT DEFAULT NULL,
+    UNIQUE(part_id, position, instrument_id),
+    FOREIGN KEY(part_id) REFERENCES part(id) ON DELETE CASCADE ON UPDATE NO ACTION
+    FOREIGN KEY(instrument_id) REFERENCES instrument(id) ON DELETE CASCADE ON UPDATE NO ACTION
+    FOREIGN KEY(mapped_instrument_id) REFERENCES instrument(id) ON DELETE CASCADE ON UPDATE NO ACTION
+);
+
 CREATE TABLE setting (
     id INTEGER PRIMARY KEY,
     created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
@@ -84,6 +128,11 @@ CREATE TABLE setting (
 INSERT INTO setting (key, value) VALUES
     ("archive_url", "https://www.tofupilot.app/api/v1/runs"),
     ("archive_access_token", ""),
+    ("archive_sinks", "http"),
+    ("profile", "off"),
+    ("run_mode", "DIAGNOSTIC"),
+    ("state_cache", "off"),
+    ("delay_tuning", "off"),
     ("password", "pbkdf2:sha256:260000$gtvpYNx6qtTuY8rt$2e2a4172758fee088e20d915ac4fdef3bdb07f792e42ecb2a77aa5a72bedd5f5");
 
 
@@ -22,6 +22,18 @@ from .database import get_db
 setting = Blueprint("setting", __name__)
 
 
+def get_setting(key: str) -> str | None:
+    """Read a setting value by key."""
+
+    row = get_db().execute(
+        "SELECT value FROM setting WHERE key = ?",
+        (key,),
+    ).fetchone()
+    if not row:
+        return None
+    return row["value"]
+
+
 @setting.get("/setting")
 @login_required
 async def read() -> tuple:
@@ -0,0 +1,464 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+SPDX-FileCopyrightText: 2025 Michael Czigler
+SPDX-License-Identifier: BSD-3-Clause
+
+Simulated SCPI instrument and archive servers.
+"""
+
+from asyncio import CancelledError
+from asyncio import create_task
+from asyncio import get_running_loop
+from asyncio import IncompleteReadError
+from asyncio import Queue
+from asyncio import run
+from asyncio import sleep
+from asyncio import start_server
+from asyncio import start_unix_server
+from gzip import decompress
+from os import close
+from os import openpty
+from os import path
+from os import read
+from os import ttyname
+from os import unlink
+from os import write
+from random import Random
+from struct import pack
+from struct import unpack
+from struct import unpack_from
+from tempfile import gettempdir
+from time import monotonic
+from tty import setraw
+
+from click import Choice
+from click import command
+from click import echo
+from click import option
+
+from .models.hislip import encode
+from .models.hislip import HEADER
+from .models.hislip import Message
+from .models.hislip import VERSION
+from .models.vxi11 import CORE
+from .models.vxi11 import LAST_FRAGMENT
+from .models.vxi11 import opaque
+from .models.vxi11 import Procedure
+from .models.vxi11 import REASON_END
+from .models.vxi11 import unpack_opaque
+
+
+class Simulator:
+    """
+    Asyncio SCPI simulator emulating raw socket, HiSLIP or VXI-11
+    instruments on many ports, or local serial (pty) and Unix socket
+    instruments.
+    """
+
+    def __init__(
+        self,
+        hostname: str = "127.0.0.1",
+        port: int = 5025,
+        count: int = 1,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        payload: int = 1,
+        failure: float = 0.0,
+        value: float = 1.0,
+        seed: int | None = None,
+        protocol: str = "tcp",
+        directory: str | None = None,
+        settle: float = 0.0,
+    ) -> None:
+        self.hostname = hostname
+        self.port = port
+        self.count = count
+        self.latency = latency  # milliseconds
+        self.jitter = jitter  # milliseconds
+        self.payload = payload  # readings per response
+        self.failure = failure  # probability per command
+        self.value = value
+        self.random = Random(seed)
+        self.protocol = protocol  # tcp, hislip, vxi11, serial or unix
+        self.directory = directory or gettempdir()  # unix sockets
+        self.settle = settle  # milliseconds readings ramp after a write
+        self.written = {}  # last setting command time by instrument
+        self.servers = []
+        self.ports = []
+        self.cores = []  # VXI-11 core channel ports
+        self.ptys = []  # serial (master, slave, consumer task)
+
+    def respond(self, index: int, scpi: str) -> str:
+        """Response for a single SCPI query."""
+
+        header = scpi.split()[0].upper()
+        if header == "*IDN?":
+            return f"UHTF,SIMULATOR,{index},0.0.1"
+        if header in ("*OPC?", "*STB?", "*ESR?"):
+            return "1" if header == "*OPC?" else "0"
+        value = self.value
+        elapsed = (monotonic() - self.written.get(index, 0.0)) * 1000
+        if elapsed < self.settle:
+            value *= elapsed / self.settle  # still settling
+        readings = (
+            self.random.gauss(value, self.value * 0.001)
+            for _ in range(self.payload)
+        )
+        return ",".join(f"{reading:+.6E}" for reading in readings)
+
+    async def delay(self) -> None:
+        jitter = self.random.uniform(-self.jitter, self.jitter)
+        seconds = max(self.latency + jitter, 0.0) / 1000
+        if seconds > 0:
+            await sleep(seconds)
+
+    async def answer(self, index: int, scpi: str) -> str | None:
+        """Response for a single SCPI message, if it is a query."""
+
+        if self.random.random() < self.failure:
+            raise ConnectionResetError  # injected failure
+        if "?" not in scpi:
+            self.written[index] = monotonic()
+            return None  # setting command, no response
+        await self.delay()
+        return self.respond(index, scpi)
+
+    async def handle(self, index: int, reader, writer) -> None:
+        try:
+            while line := await reader.readline():
+                response = await self.answer(index, line.decode().strip())
+                if response is not None:
+                    writer.write(response.encode() + b"\n")
+                    await writer.drain()
+        except (ConnectionError, CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    async def handle_hislip(self, index: int, reader, writer) -> None:
+        """HiSLIP synchronous or asynchronous channel."""
+
+        try:
+            buffer = bytearray()
+            while header := await reader.readexactly(16):
+                _, message, control, parameter, length = unpack(
+                    HEADER,
+                    header,
+                )
+                payload = await reader.readexactly(length)
+                if message == Message.INITIALIZE:
+                    writer.write(encode(
+                        Message.INITIALIZE_RESPONSE,
+                        parameter=VERSION << 16 | index,
+                    ))
+                elif message == Message.ASYNC_INITIALIZE:
+                    writer.write(encode(Message.ASYNC_INITIALIZE_RESPONSE))
+                elif message == Message.ASYNC_STATUS_QUERY:
+                    writer.write(encode(Message.ASYNC_STATUS_RESPONSE))
+                elif message in (Message.DATA, Message.DATA_END):
+                    buffer += payload
+                    if message == Message.DATA:
+                        continue
+                    scpi, buffer = buffer.decode().strip(), bytearray()
+                    response = await self.answer(index, scpi)
+                    if response is None:
+                        continue
+                    writer.write(encode(
+                        Message.DATA_END,
+                        parameter=parameter,
+                        payload=response.encode() + b"\n",
+                    ))
+                await writer.drain()
+        except (ConnectionError, CancelledError, IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def handle_rpc(self, index: int, reader, writer) -> None:
+        """VXI-11 portmapper or core channel ONC RPC calls."""
+
+        pending = b""
+        try:
+            while True:
+                call = bytearray()
+                while True:
+                    (marker,) = unpack(">I", await reader.readexactly(4))
+                    call += await reader.readexactly(marker & ~LAST_FRAGMENT)
+                    if marker & LAST_FRAGMENT:
+                        break
+                xid, _, _, program, _, procedure = unpack_from(">6I", call)
+                _, offset = unpack_opaque(call, 28)  # credentials
+                _, offset = unpack_opaque(call, offset + 4)  # verifier
+                arguments = bytes(call[offset:])
+                if program != CORE:
+                    result = pack(">I", self.cores[index])  # GETPORT
+                elif procedure == Procedure.CREATE_LINK:
+                    result = pack(">iiII", 0, index, 0, 1024)
+                elif procedure == Procedure.DEVICE_WRITE:
+                    data, _ = unpack_opaque(arguments, 16)
+                    response = await self.answer(index, data.decode().strip())
+                    if response is not None:
+                        pending = response.encode() + b"\n"
+                    result = pack(">iI", 0, len(data))
+                elif procedure == Procedure.DEVICE_READ:
+                    result = pack(">iI", 0, REASON_END) + opaque(pending)
+                    pending = b""
+                elif procedure == Procedure.DEVICE_READSTB:
+                    result = pack(">iI", 0, 0)
+                else:
+                    result = pack(">i", 0)  # destroy_link
+                reply = pack(">6I", xid, 1, 0, 0, 0, 0) + result
+                writer.write(pack(">I", LAST_FRAGMENT | len(reply)) + reply)
+                await writer.drain()
+        except (ConnectionError, CancelledError, IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def listen(self, handler, index: int, port: int) -> int:
+        server = await start_server(
+            lambda r, w: handler(index, r, w),
+            self.hostname,
+            port,
+        )
+        self.servers.append(server)
+        return server.sockets[0].getsockname()[1]
+
+    async def listen_unix(self, index: int) -> str:
+        address = path.join(self.directory, f"uhtf{index}.sock")
+        if path.exists(address):
+            unlink(address)  # left over from a previous run
+        server = await start_unix_server(
+            lambda r, w: self.handle(index, r, w),
+            address,
+        )
+        self.servers.append(server)
+        return address
+
+    async def listen_pty(self, index: int) -> str:
+        """Serve a pseudo terminal and return the slave device path."""
+
+        master, slave = openpty()
+        setraw(slave)  # no echo or line editing
+        lines = Queue()
+        buffer = bytearray()
+
+        def readable() -> None:
+            buffer.extend(read(master, 4096))
+            while b"\n" in buffer:
+                line, _, rest = buffer.partition(b"\n")
+                buffer[:] = rest
+                lines.put_nowait(line.decode().strip())
+
+        async def consume() -> None:
+            while True:
+                scpi = await lines.get()
+                try:
+                    response = await self.answer(index, scpi)
+                except ConnectionError:
+                    continue  # injected failure drops the message
+                if response is not None:
+                    write(master, response.encode() + b"\n")
+
+        get_running_loop().add_reader(master, readable)
+        self.ptys.append((master, slave, create_task(consume())))
+        return ttyname(slave)
+
+    async def start(self) -> list:
+        """
+        Start one server per instrument and return the bound ports (the
+        device or socket paths for serial and unix instruments).
+        """
+
+        handlers = {
+            "tcp": self.handle,
+            "hislip": self.handle_hislip,
+            "vxi11": self.handle_rpc,  # portmapper
+        }
+        for index in range(self.count):
+            port = self.port + index if self.port else 0
+            if self.protocol == "serial":
+                port = await self.listen_pty(index)
+            elif self.protocol == "unix":
+                port = await self.listen_unix(index)
+            else:
+                if self.protocol == "vxi11":
+                    core = await self.listen(self.handle_rpc, index, 0)
+                    self.cores.append(core)
+                port = await self.listen(handlers[self.protocol], index, port)
+            self.ports.append(port)
+        return self.ports
+
+    async def close(self) -> None:
+        for server in self.servers:
+            server.close()
+            await server.wait_closed()
+        for master, slave, task in self.ptys:
+            get_running_loop().remove_reader(master)
+            task.cancel()
+            close(master)
+            close(slave)
+        if self.protocol == "unix":
+            for address in self.ports:
+                if path.exists(address):
+                    unlink(address)
+        self.servers.clear()
+        self.ports.clear()
+        self.cores.clear()
+        self.ptys.clear()
+
+    async def serve_forever(self, started=None) -> None:
+        addresses = await self.start()
+        if started is not None:
+            started(addresses)
+        try:
+            while True:
+                await sleep(3600)
+        finally:
+            await self.close()
+
+
+class ArchiveStub:
+    """
+    Local HTTP/1.1 archive server accepting (optionally gzip encoded)
+    uploads over keep-alive connections, counting what it receives.
+    """
+
+    def __init__(
+        self,
+        hostname: str = "127.0.0.1",
+        port: int = 8080,
+        latency: float = 0.0,
+        status: int = 200,
+        keep_alive: bool = True,
+    ) -> None:
+        self.hostname = hostname
+        self.port = port
+        self.latency = latency  # milliseconds per upload
+        self.status = status
+        self.keep_alive = keep_alive
+        self.server = None
+        self.connections = 0
+        self.uploads = 0
+        self.received = 0  # bytes on the wire
+        self.decoded = 0  # bytes after content decoding
+        self.last = None  # last decoded body
+
+    async def handle(self, reader, writer) -> None:
+        self.connections += 1
+        try:
+            while await reader.readline():
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b""):
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                body = await reader.readexactly(
+                    int(headers.get("content-length", 0))
+                )
+                self.received += len(body)
+                if headers.get("content-encoding") == "gzip":
+                    body = decompress(body)
+                self.decoded += len(body)
+                self.last = body
+                self.uploads += 1
+                if self.latency > 0:
+                    await sleep(self.latency / 1000)
+                payload = f'{{"id": {self.uploads}}}'.encode()
+                lines = [
+                    f"HTTP/1.1 {self.status} OK",
+                    "Content-Type: application/json",
+                    f"Content-Length: {len(payload)}",
+                ]
+                if not self.keep_alive:
+                    lines.append("Connection: close")
+                head = "\r\n".join(lines) + "\r\n\r\n"
+                writer.write(head.encode() + payload)
+                await writer.drain()
+                if not self.keep_alive:
+                    break
+        except (ConnectionError, IncompleteReadError, CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self) -> int:
+        """Start serving and return the bound port."""
+
+        self.server = await start_server(self.handle, self.hostname, self.port)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+
+
+@command("simulate")
+@option("--hostname", default="127.0.0.1", help="Bind address.")
+@option("--port", default=5025, help="First port (0 for ephemeral).")
+@option("--count", default=1, help="Number of instruments.")
+@option("--latency", default=0.0, help="Response latency (ms).")
+@option("--jitter", default=0.0, help="Response jitter (ms).")
+@option("--payload", default=1, help="Readings per response.")
+@option("--failure", default=0.0, help="Failure probability.")
+@option("--settle", default=0.0, help="Settling time after writes (ms).")
+@option(
+    "--protocol",
+    default="tcp",
+    type=Choice(["tcp", "hislip", "vxi11", "serial", "unix"]),
+    help="Instrument transport (vxi11 ports serve the portmapper).",
+)
+@option("--directory", default=None, help="Unix socket directory.")
+def simulate_command(**kwargs) -> None:
+    """
+    Serve simulated SCPI instruments on consecutive ports (or pseudo
+    terminals and Unix sockets) until interrupted.
+    """
+
+    def started(addresses: list) -> None:
+        echo(f"Simulating {len(addresses)} instrument(s) on:")
+        for address in addresses:
+            echo(f"  {address}")
+
+    simulator = Simulator(**kwargs)
+    try:
+        run(simulator.serve_forever(started))
+    except KeyboardInterrupt:
+        pass
+
+
+@command("simulate-archive")
+@option("--hostname", default="127.0.0.1", help="Bind address.")
+@option("--port", default=8080, help="Port (0 for ephemeral).")
+@option("--latency", default=0.0, help="Response latency (ms).")
+@option("--status", default=200, help="Response status code.")
+def simulate_archive_command(**kwargs) -> None:
+    """Serve a local archive endpoint accepting uploads until interrupted."""
+
+    async def serve() -> None:
+        stub = ArchiveStub(**kwargs)
+        port = await stub.start()
+        echo(f"Archiving to http://{stub.hostname}:{port}/api/v1/runs")
+        try:
+            while True:
+                await sleep(3600)
+        finally:
+            await stub.close()
+
+    try:
+        run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+def init_simulator(app) -> None:
+    """
+    Add commands to Quart application instance to serve simulated
+    instruments and a simulated archive.
+    """
+
+    app.cli.add_command(simulate_command)
+    app.cli.add_command(simulate_archive_command)
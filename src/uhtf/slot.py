@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+# -*- coding: utf-8
+
+"""
+SPDX-FileCopyrightText: 2025 Michael Czigler
+SPDX-License-Identifier: BSD-3-Clause
+
+Panel slot endpoints.
+"""
+
+from quart import Blueprint
+from quart import flash
+from quart import redirect
+from quart import render_template
+from quart import request
+from quart import url_for
+
+from .authorize import login_required
+from .database import get_db
+
+slot = Blueprint("slot", __name__)
+
+
+def slot_defaults(form: dict) -> dict:
+    """Fill the optional mapped instrument and channel of a slot."""
+
+    form["mapped_instrument_id"] = form.get("mapped_instrument_id") or None
+    form["channel"] = form.get("channel") or None
+    return form
+
+
+@slot.get("/slot")
+@login_required
+async def read() -> tuple:
+    """Read panel slots callback."""
+
+    instruments = get_db().execute(
+        """
+        SELECT * FROM instrument
+        """
+    ).fetchall()
+    parts = get_db().execute(
+        """
+        SELECT * FROM part
+        """
+    ).fetchall()
+    slots = get_db().execute(
+        """
+        SELECT
+            slot.id AS id,
+            slot.position AS position,
+            slot.channel AS channel,
+            part.id AS part_id,
+            part.name AS part,
+            instrument.id AS instrument_id,
+            instrument.name AS instrument,
+            mapped.id AS mapped_instrument_id,
+            mapped.name AS mapped_instrument
+        FROM
+            slot
+        INNER JOIN
+            part ON part.id = slot.part_id
+        INNER JOIN
+            instrument ON instrument.id = slot.instrument_id
+        OUTER LEFT JOIN
+            instrument AS mapped ON mapped.id = slot.mapped_instrument_id
+        ORDER BY
+            part.name, slot.position
+        """
+    ).fetchall()
+    return await render_template(
+        "slot.html",
+        instruments=instruments,
+        parts=parts,
+        slots=slots,
+    )
+
+
+@slot.post("/slot")
+@login_required
+async def create() -> tuple:
+    """Create panel slot callback."""
+
+    form = slot_defaults((await request.form).copy().to_dict())
+    try:
+        db = get_db()
+        db.execute("PRAGMA foreign_keys = ON")
+        db.execute(
+            """
+            INSERT INTO slot (
+                part_id,
+                position,
+                instrument_id,
+                mapped_instrument_id,
+                channel
+            ) VALUES (
+                :part_id,
+                :position,
+                :instrument_id,
+                :mapped_instrument_id,
+                :channel
+            )
+            """,
+            form,
+        )
+        db.commit()
+    except db.ProgrammingError:
+        await flash("Missing parameter(s).", "warning")
+    except db.IntegrityError:
+        await flash("Invalid parameter(s).", "warning")
+    return redirect(url_for(".read"))
+
+
+@slot.post("/slot/delete")
+@login_required
+async def delete():
+    """Delete panel slots callback."""
+
+    db = get_db()
+    form = await request.form
+    slot_ids = form.getlist("slot_id")
+    for slot_id in slot_ids:
+        db.execute("DELETE FROM slot WHERE id = ?", (slot_id,))
+        db.commit()
+    return redirect(url_for(".read"))
+
+
+@slot.post("/slot/update")
+@login_required
+async def update() -> tuple:
+    """Update panel slot callback."""
+
+    form = slot_defaults((await request.form).copy().to_dict())
+    try:
+        db = get_db()
+        db.execute("PRAGMA foreign_keys = ON")
+        db.execute(
+            """
+            UPDATE slot SET
+                updated_at = CURRENT_TIMESTAMP,
+                part_id = :part_id,
+                position = :position,
+                instrument_id = :instrument_id,
+                mapped_instrument_id = :mapped_instrument_id,
+                channel = :channel
+            WHERE id = :id
+            """,
+            form,
+        )
+        db.commit()
+    except db.ProgrammingError:
+        await flash("Missing parameter(s).", "warning")
+    except db.IntegrityError:
+        await flash("Invalid parameter(s).", "warning")
+    return redirect(url_for(".read"))
@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+SPDX-FileCopyrightText: 2025 Michael Czigler
+SPDX-License-Identifier: BSD-3-Clause
+
+Shared test fixtures.
+"""
+
+from asyncio import new_event_loop
+from asyncio import run_coroutine_threadsafe
+from threading import Thread
+
+import pytest
+
+from uhtf.simulator import Simulator
+
+
+@pytest.fixture
+def simulate(tmp_path):
+    """
+    Start simulated instruments of a protocol on a background event
+    loop (the transports under test block) and return their ports.
+    """
+
+    loop = new_event_loop()
+    thread = Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    simulators = []
+
+    def start(protocol: str = "tcp", **kwargs) -> list:
+        simulator = Simulator(
+            port=0,
+            protocol=protocol,
+            directory=str(tmp_path),
+            seed=0,
+            **kwargs,
+        )
+        simulators.append(simulator)
+        return run_coroutine_threadsafe(simulator.start(), loop).result()
+
+    yield start
+    for simulator in simulators:
+        run_coroutine_threadsafe(simulator.close(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+SPDX-FileCopyrightText: 2025 Michael Czigler
+SPDX-License-Identifier: BSD-3-Clause
+
+Archive sinks against a simulated archive server.
+"""
+
+from asyncio import run
+from os.path import exists
+
+import pytest
+
+from uhtf.models.base import Procedure
+from uhtf.models.sink import HTTPSink
+from uhtf.simulator import ArchiveStub
+
+
+def upload(tmp_path, status: int) -> tuple[dict, int, bool]:
+    """Upload a procedure to a server answering a status."""
+
+    async def main() -> tuple[dict, int, bool]:
+        stub = ArchiveStub(port=0, status=status)
+        port = await stub.start()
+        sink = HTTPSink({
+            "archive_url": f"http://127.0.0.1:{port}/",
+            "archive_access_token": "token",
+            "ARCHIVE_CONCURRENCY": 1,
+            "ARCHIVE_CONNECT_TIMEOUT": 1.0,
+            "ARCHIVE_READ_TIMEOUT": 1.0,
+            "ARCHIVE_GZIP": False,
+            "ARCHIVE_RETRIES": 2,
+            "ARCHIVE_BACKOFF": 0.01,
+            "ARCHIVE_SPOOL": str(tmp_path),
+        })
+        sink.start()
+        sink.put(Procedure("procedure", "part"))
+        await sink.queue.join()
+        await sink.close()
+        await stub.close()
+        return sink.status(), stub.uploads, exists(sink.spool)
+
+    return run(main())
+
+
+@pytest.mark.parametrize("status", [400, 401, 413, 422])
+def test_rejected_uploads_are_not_retried_or_spooled(tmp_path, status):
+    counts, uploads, spooled = upload(tmp_path, status)
+    assert uploads == 1
+    assert counts["failed"] == 1 and counts["spooled"] == 0
+    assert not spooled
+
+
+@pytest.mark.parametrize("status", [408, 429, 500, 503])
+def test_transient_failures_are_retried_and_spooled(tmp_path, status):
+    counts, uploads, spooled = upload(tmp_path, status)
+    assert uploads == 3
+    assert counts["failed"] == 1 and counts["spooled"] == 1
+    assert spooled
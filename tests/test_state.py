@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+SPDX-FileCopyrightText: 2025 Michael Czigler
+SPDX-License-Identifier: BSD-3-Clause
+
+Instrument state cache.
+"""
+
+from uhtf.models import state
+from uhtf.models.state import redundant
+from uhtf.models.state import remember
+
+
+def test_repeated_setting_is_redundant():
+    settings = {}
+    remember(settings, "VOLT:RANG 10,(@1)")
+    assert redundant(settings, "VOLT:RANG 10,(@1)")
+    assert not redundant(settings, "VOLT:RANG 100,(@1)")
+    assert not redundant(settings, "VOLT:RANG 10,(@2)")
+
+
+def test_safe_queries_keep_settings():
+    settings = {}
+    remember(settings, "VOLT:RANG 10,(@1)")
+    for query in ("READ?", "FETC?", "SYST:ERR?", "*ESR?", "VOLT:RANG? (@1)"):
+        remember(settings, query)
+    assert redundant(settings, "VOLT:RANG 10,(@1)")
+
+
+def test_other_queries_and_resets_forget_settings():
+    for scpi in ("MEAS:VOLT:DC? (@1)", "*TST?", "*RST"):
+        settings = {}
+        remember(settings, "VOLT:RANG 10,(@1)")
+        remember(settings, scpi)
+        assert not redundant(settings, "VOLT:RANG 10,(@1)")
+
+
+def test_settings_expire(monkeypatch):
+    settings = {}
+    monkeypatch.setattr(state, "monotonic", lambda: 1000.0)
+    remember(settings, "VOLT:RANG 10,(@1)")
+    monkeypatch.setattr(state, "monotonic", lambda: 1000.0 + state.EXPIRY)
+    assert not redundant(settings, "VOLT:RANG 10,(@1)")
+
+
+def test_actions_are_never_redundant():
+    settings = {}
+    for scpi in ("INIT", "*TRG", "*CLS", "ABOR", "*WAI", "*OPC", "*SAV 1"):
+        remember(settings, scpi)
+        assert not redundant(settings, scpi)
+    assert not settings
+
+
+def test_compound_messages_update_each_header():
+    settings = {}
+    remember(settings, "SOUR:VOLT 5")
+    remember(settings, "SOUR:VOLT 3;CURR 1")
+    assert not redundant(settings, "SOUR:VOLT 5")
+    assert redundant(settings, "SOUR:CURR 1")
+    assert redundant(settings, "SOUR:VOLT 3;:SOUR:CURR 1")
+    remember(settings, "SOUR:VOLT 5")
+    assert not redundant(settings, "SOUR:VOLT 3;CURR 1")
+    assert redundant(settings, "SOUR:VOLT 5;CURR 1")
+
+
+def test_compound_messages_with_actions_are_sent():
+    settings = {}
+    remember(settings, "VOLT 5;INIT")
+    assert redundant(settings, "VOLT 5")
+    assert not redundant(settings, "VOLT 5;INIT")
+    remember(settings, "VOLT 5;MEAS?")
+    assert not redundant(settings, "VOLT 5")
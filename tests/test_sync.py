@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+SPDX-FileCopyrightText: 2025 Michael Czigler
+SPDX-License-Identifier: BSD-3-Clause
+
+Instrument synchronization strategies.
+"""
+
+from socket import create_server
+from threading import Thread
+from time import monotonic
+
+import pytest
+
+from uhtf.models.sync import SyncError
+from uhtf.models.sync import wait_opc
+from uhtf.models.tcp import TCP
+
+
+def test_opc_times_out_at_the_sync_deadline():
+    server = create_server(("127.0.0.1", 0))
+    port = server.getsockname()[1]
+
+    def serve() -> None:
+        instrument, _ = server.accept()
+        instrument.recv(64)  # busy, *OPC? is never answered
+        instrument.recv(64)
+        instrument.close()
+
+    thread = Thread(target=serve, daemon=True)
+    thread.start()
+    with TCP("127.0.0.1", port, 2.0, 5.0) as transport:
+        start = monotonic()
+        with pytest.raises(SyncError):
+            wait_opc(transport, 200)
+        assert monotonic() - start < 1.0
+        assert transport.read_timeout == 5.0
+        assert transport.sock.gettimeout() == 5.0
+    thread.join(2.0)
+    server.close()
+
+
+def test_opc_returns_when_operations_complete(simulate):
+    port, = simulate()
+    with TCP("127.0.0.1", port, 2.0, 5.0) as transport:
+        wait_opc(transport, 200)
+        assert transport.sock.gettimeout() == 5.0
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+SPDX-FileCopyrightText: 2025 Michael Czigler
+SPDX-License-Identifier: BSD-3-Clause
+
+Instrument transports against simulated instruments.
+"""
+
+from socket import create_server
+from threading import Thread
+from time import sleep
+
+import pytest
+
+from uhtf.models.hislip import encode
+from uhtf.models.hislip import HiSLIP
+from uhtf.models.hislip import Message
+from uhtf.models.hislip import receive
+from uhtf.models.pool import Pool
+from uhtf.models.pool import resolve
+from uhtf.models.transport import Transport
+from uhtf.models.vxi11 import Procedure
+from uhtf.models.vxi11 import RPC
+from uhtf.models.vxi11 import VXI11
+
+PROTOCOLS = ["tcp", "hislip", "vxi11", "unix", "serial"]
+
+
+def opened(monkeypatch, cls) -> list:
+    """Record every socket a transport class opens."""
+
+    sockets = []
+    open_socket = cls.open_socket
+
+    def record(self, port):
+        sockets.append(open_socket(self, port))
+        return sockets[-1]
+
+    monkeypatch.setattr(cls, "open_socket", record)
+    return sockets
+
+
+@pytest.mark.parametrize("protocol", PROTOCOLS)
+def test_query(simulate, protocol):
+    if protocol == "serial":
+        pytest.importorskip("serial")
+    port, = simulate(protocol)
+    transport = resolve(protocol)("127.0.0.1", port, 2.0, 2.0)
+    if protocol in ("serial", "unix"):
+        transport = resolve(protocol)(port, 0, 2.0, 2.0)
+    with transport:
+        assert transport.query(b"*IDN?\n") == b"UHTF,SIMULATOR,0,0.0.1\n"
+        transport.send(b"CONF:VOLT:DC\n")  # no response
+        assert float(transport.query(b"MEAS:VOLT:DC?\n")) == \
+            pytest.approx(1.0, rel=0.01)
+    assert transport.sock is None
+
+
+def test_hislip_status(simulate):
+    port, = simulate("hislip")
+    with HiSLIP("127.0.0.1", port, 2.0, 2.0) as transport:
+        assert transport.status() == 0
+        assert transport.async_sock is not None
+
+
+def test_transport_is_abstract():
+    with pytest.raises(TypeError):
+        Transport("127.0.0.1", 5025)
+
+
+def test_stale_with_unread_response(simulate):
+    port, = simulate("tcp")
+    with resolve("tcp")("127.0.0.1", port, 2.0, 2.0) as transport:
+        assert not transport.stale()
+        transport.send(b"*IDN?\n")  # response never read
+        sleep(0.1)
+        assert transport.stale()
+
+
+def test_pool_discards_stale_connections(simulate):
+    port, = simulate("tcp")
+    pool = Pool()
+    with pool.connection("tcp", "127.0.0.1", port) as first:
+        first.send(b"*IDN?\n")
+    sleep(0.1)
+    with pool.connection("tcp", "127.0.0.1", port) as second:
+        assert second is not first
+        assert second.query(b"*IDN?\n").startswith(b"UHTF,SIMULATOR")
+    assert first.sock is None
+    pool.clear()
+
+
+def test_hislip_async_failure_closes_sockets(monkeypatch):
+    server = create_server(("127.0.0.1", 0))
+    port = server.getsockname()[1]
+
+    def serve() -> None:
+        sync, _ = server.accept()
+        receive(sync)
+        sync.sendall(encode(Message.INITIALIZE_RESPONSE, parameter=1))
+        asynchronous, _ = server.accept()
+        asynchronous.close()  # refuse the asynchronous channel
+        sync.recv(1)
+        sync.close()
+
+    thread = Thread(target=serve, daemon=True)
+    thread.start()
+    sockets = opened(monkeypatch, HiSLIP)
+    transport = HiSLIP("127.0.0.1", port, 2.0, 2.0)
+    with pytest.raises(ConnectionError):
+        transport.connect()
+    thread.join(2.0)
+    server.close()
+    assert len(sockets) == 2
+    assert all(sock.fileno() == -1 for sock in sockets)
+    assert transport.sock is None and transport.async_sock is None
+
+
+def test_vxi11_create_link_failure_closes_socket(simulate, monkeypatch):
+    port, = simulate("vxi11")
+    call = RPC.call
+
+    def reject(self, procedure, arguments):
+        if procedure == Procedure.CREATE_LINK:
+            raise ConnectionError("VXI-11 RPC call rejected")
+        return call(self, procedure, arguments)
+
+    monkeypatch.setattr(RPC, "call", reject)
+    sockets = opened(monkeypatch, VXI11)
+    transport = VXI11("127.0.0.1", port, 2.0, 2.0)
+    with pytest.raises(ConnectionError):
+        transport.connect()
+    assert len(sockets) == 2  # portmapper and core channel
+    assert all(sock.fileno() == -1 for sock in sockets)
+    assert transport.sock is None and transport.link is None